@@ -59,10 +59,14 @@ def main():
 
     # Initialize the pool of processes that will run each plugin
     if args_command_list.https_tunnel:
-        # Maximum one process to not kill the proxy
-        global_scanner  = ConcurrentScanner(args_command_list.nb_retries, args_command_list.timeout, max_processes_nb=1)
+        # Maximum one process per proxy to not kill the proxies
+        proxies_nb = len(args_command_list.https_tunnel.split(','))
+        global_scanner = ConcurrentScanner(args_command_list.nb_retries, args_command_list.timeout,
+                                           max_processes_nb=proxies_nb,
+                                           should_trace_connections=bool(args_command_list.trace_file))
     else:
-        global_scanner = ConcurrentScanner(args_command_list.nb_retries, args_command_list.timeout)
+        global_scanner = ConcurrentScanner(args_command_list.nb_retries, args_command_list.timeout,
+                                           should_trace_connections=bool(args_command_list.trace_file))
 
 
     # Figure out which hosts are up and fill the task queue with work to do
@@ -12,6 +12,7 @@
 from sslyze.cli import FailedServerScan
 from sslyze.server_connectivity import ServerConnectivityInfo, ServerConnectivityError
 from sslyze.ssl_settings import TlsWrappedProtocolEnum, ClientAuthenticationCredentials, HttpConnectTunnelingSettings
+from sslyze.ssl_settings import HttpConnectProxyPoolSettings
 from sslyze.utils.ssl_connection import SSLConnection
 
 
@@ -220,10 +221,20 @@ def parse_command_line(self):
         # HTTP CONNECT proxy
         http_tunneling_settings = None
         if args_command_list.https_tunnel:
+            if args_command_list.https_tunnel_max_connections < 1:
+                raise CommandLineParsingError('Cannot have a number smaller than 1 for --https_tunnel_max_connections.')
+
+            proxy_urls = [proxy_url.strip() for proxy_url in args_command_list.https_tunnel.split(',')]
             try:
-                http_tunneling_settings = HttpConnectTunnelingSettings.from_url(args_command_list.https_tunnel)
+                if len(proxy_urls) > 1:
+                    # Several proxies were supplied; spread the traffic across them
+                    http_tunneling_settings = HttpConnectProxyPoolSettings.from_urls(
+                        proxy_urls, args_command_list.https_tunnel_max_connections
+                    )
+                else:
+                    http_tunneling_settings = HttpConnectTunnelingSettings.from_url(proxy_urls[0])
             except ValueError as e:
-                raise CommandLineParsingError('Invalid proxy URL for --https_tunnel: {}.'.format(e[0]))
+                raise CommandLineParsingError('Invalid proxy URL for --https_tunnel: {}.'.format(e.args[0]))
 
 
         # STARTTLS
@@ -344,6 +355,25 @@ def _add_default_options(self):
             dest='json_file',
             default=None
         )
+        # Certificate table in the XML and JSON outputs
+        output_group.add_option(
+            '--dedup_certificates',
+            action='store_true',
+            help='Write each certificate only once in the XML and JSON outputs, within a top-level table of '
+                 'certificates; the certificate chains of each server then reference the certificates by their SHA-256 '
+                 'fingerprint. Useful for reducing the size of the outputs when scanning many servers.',
+            dest='dedup_certificates',
+            default=False
+        )
+        # Connections trace output
+        output_group.add_option(
+            '--trace_out',
+            help='Record the timing of every connection opened during the scans (TCP connect, StartTLS negotiation, '
+                 'TLS handshake, etc.) and write it to the file TRACE_FILE, using the Trace Event Format which can be '
+                 'loaded in chrome://tracing.',
+            dest='trace_file',
+            default=None
+        )
         # Read targets from input file
         output_group.add_option(
             '--targets_in',
@@ -388,10 +418,19 @@ def _add_default_options(self):
             '--https_tunnel',
             help='Tunnel all traffic to the target server(s) through an HTTP CONNECT proxy. HTTP_TUNNEL should be the '
                  'proxy\'s URL: \'http://USER:PW@HOST:PORT/\'. For proxies requiring authentication, only Basic '
-                 'Authentication is supported.',
+                 'Authentication is supported. A comma-separated list of proxy URLs can be supplied in order to '
+                 'spread the traffic across several proxies.',
             dest='https_tunnel',
             default=None
         )
+        connect_group.add_option(
+            '--https_tunnel_max_connections',
+            help='When tunneling the traffic through several HTTP CONNECT proxies, the maximum number of connections '
+                 'to open at the same time through each proxy, for each scanning process. Default is 5.',
+            type='int',
+            dest='https_tunnel_max_connections',
+            default=5
+        )
         # STARTTLS
         connect_group.add_option(
             '--starttls',
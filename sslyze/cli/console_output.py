@@ -7,6 +7,7 @@
 from sslyze.cli.output_generator import OutputGenerator
 from sslyze.server_connectivity import ClientAuthenticationServerConfigurationEnum
 from sslyze.server_connectivity import ServerConnectivityInfo
+from sslyze.ssl_settings import HttpConnectProxyPoolSettings
 from typing import Text
 
 
@@ -53,7 +54,9 @@ def server_connectivity_test_succeeded(self, server_connectivity_info):
             client_auth_msg = '  WARNING: Server requested optional client authentication'
 
         network_route = server_connectivity_info.ip_address
-        if server_connectivity_info.http_tunneling_settings:
+        if isinstance(server_connectivity_info.http_tunneling_settings, HttpConnectProxyPoolSettings):
+            network_route = 'Proxies at {}'.format(server_connectivity_info.http_tunneling_settings)
+        elif server_connectivity_info.http_tunneling_settings:
             # We do not know the server's IP address if going through a proxy
             network_route = 'Proxy at {}:{}'.format(server_connectivity_info.http_tunneling_settings.hostname,
                                                      server_connectivity_info.http_tunneling_settings.port)
@@ -78,7 +81,9 @@ def server_scan_completed(self, server_scan):
 
 
         network_route = server_scan.server_info.ip_address
-        if server_scan.server_info.http_tunneling_settings:
+        if isinstance(server_scan.server_info.http_tunneling_settings, HttpConnectProxyPoolSettings):
+            network_route = 'Proxies at {}'.format(server_scan.server_info.http_tunneling_settings)
+        elif server_scan.server_info.http_tunneling_settings:
             # We do not know the server's IP address if going through a proxy
             network_route = 'Proxy at {}:{}'.format(server_scan.server_info.http_tunneling_settings.hostname,
                                                      server_scan.server_info.http_tunneling_settings.port)
@@ -2,9 +2,11 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
 
+import binascii
 import json
 
 from cryptography.hazmat.backends.openssl import x509
+from cryptography.hazmat.primitives import hashes
 from cryptography.hazmat.primitives.asymmetric.ec import EllipticCurvePublicKey
 from cryptography.hazmat.primitives.serialization import Encoding
 from enum import Enum
@@ -12,7 +14,9 @@
 from sslyze.cli import CompletedServerScan
 from sslyze.cli import FailedServerScan
 from sslyze.cli.output_generator import OutputGenerator
+from sslyze.plugins.plugin_base import PluginScanResult
 from sslyze.plugins.utils.certificate_utils import CertificateUtils
+from sslyze.utils.lazy_property import LazyProperty
 from sslyze.utils.python_compatibility import IS_PYTHON_2
 
 
@@ -22,8 +26,14 @@ def __init__(self, file_to):
         super(JsonOutputGenerator, self).__init__(file_to)
         self._json_dict = {'sslyze_version': __version__,
                            'sslyze_url': PROJECT_URL}
+        # Set when certificates are only written once, in a top-level table
+        self._certificate_table = None
 
     def command_line_parsed(self, available_plugins, args_command_list):
+        if args_command_list.dedup_certificates:
+            self._certificate_table = {}
+            self._json_dict['certificates'] = self._certificate_table
+
         self._json_dict.update({'network_timeout': args_command_list.timeout,
                                 'network_max_retries': args_command_list.nb_retries,
                                 'invalid_targets': [],
@@ -43,22 +53,25 @@ def server_scan_completed(self, server_scan_result):
         # type: (CompletedServerScan) -> None
         server_scan_dict = {'server_info': server_scan_result.server_info.__dict__.copy()}
         for key, value in server_scan_dict['server_info'].items():
-            server_scan_dict['server_info'][key] = _object_to_json_dict(value)
+            server_scan_dict['server_info'][key] = _object_to_json_dict(value, self._certificate_table)
 
         dict_command_result = {}
         for plugin_result in server_scan_result.plugin_result_list:
-            dict_result = plugin_result.__dict__.copy()
+            dict_result = _get_public_attributes(plugin_result)
             # Remove the server_info node
             dict_result.pop('server_info', None)
 
             # Remove the scan_command node
             scan_command = dict_result.pop('scan_command', None)
 
+            # Remove the connection traces, which are written using --trace_out
+            dict_result.pop('connection_traces', None)
+
             if scan_command.get_cli_argument() in dict_command_result.keys():
                 raise ValueError('Received duplicate result for command {}'.format(scan_command))
 
             for key, value in dict_result.items():
-                dict_result[key] = _object_to_json_dict(value)
+                dict_result[key] = _object_to_json_dict(value, self._certificate_table)
 
             dict_command_result[scan_command.get_cli_argument()] = dict_result
 
@@ -75,12 +88,19 @@ def scans_completed(self, total_scan_time):
         self._file_to.write(json_out)
 
 
-def _object_to_json_dict(obj):
+def _object_to_json_dict(obj, certificate_table=None):
     """Convert an object to a dictionary suitable for the JSON output.
+
+    If a certificate_table is supplied, each certificate is added to it and replaced by its SHA-256 fingerprint.
     """
     if isinstance(obj, Enum):
         # Properly serialize Enums (such as OpenSslVersionEnum)
         result = obj.name
+    elif isinstance(obj, x509._Certificate) and certificate_table is not None:
+        # Only reference the certificate, which gets written once in the table
+        result = binascii.hexlify(obj.fingerprint(hashes.SHA256())).decode('ascii')
+        if result not in certificate_table:
+            certificate_table[result] = _object_to_json_dict(obj)
     elif isinstance(obj, x509._Certificate):
         # Properly serialize certificates
         certificate = obj
@@ -108,15 +128,21 @@ def _object_to_json_dict(obj):
             result['publicKey']['size'] = str(public_key.key_size)
             result['publicKey']['exponent'] = str(public_key.public_numbers().e)
 
+    elif isinstance(obj, (list, tuple)):
+        result = [_object_to_json_dict(item, certificate_table) for item in obj]
+
+    elif isinstance(obj, PluginScanResult):
+        # The result of a scan command nested within another result; only keep the attributes specific to the command
+        result = {}
+        for key, value in _get_public_attributes(obj).items():
+            if key not in ['server_info', 'scan_command', 'connection_traces']:
+                result[key] = _object_to_json_dict(value, certificate_table)
+
     elif isinstance(obj, object):
         if hasattr(obj, '__dict__'):
             result = {}
-            for key, value in obj.__dict__.items():
-                # Remove private attributes
-                if key.startswith('_'):
-                    continue
-
-                result[key] = _object_to_json_dict(value)
+            for key, value in _get_public_attributes(obj).items():
+                result[key] = _object_to_json_dict(value, certificate_table)
         else:
             # Simple object like a string
             result = obj
@@ -125,3 +151,14 @@ def _object_to_json_dict(obj):
         raise TypeError('Unknown type: {}'.format(repr(obj)))
 
     return result
+
+
+def _get_public_attributes(obj):
+    """Return the object's attributes that should be written to the JSON output, including the lazy properties that
+    have not been computed yet.
+    """
+    attributes = {key: value for key, value in obj.__dict__.items() if not key.startswith('_')}
+    for lazy_property_name in LazyProperty.get_lazy_property_names(obj.__class__):
+        if not lazy_property_name.startswith('_'):
+            attributes[lazy_property_name] = getattr(obj, lazy_property_name)
+    return attributes
@@ -6,6 +6,7 @@
 from io import open
 from sslyze.cli.console_output import ConsoleOutputGenerator
 from sslyze.cli.json_output import JsonOutputGenerator
+from sslyze.cli.trace_output import TraceOutputGenerator
 from sslyze.cli.xml_output import XmlOutputGenerator
 
 
@@ -36,6 +37,10 @@ def command_line_parsed(self, available_plugins, args_command_list):
         if xml_file_to:
             self._output_generator_list.append(XmlOutputGenerator(xml_file_to))
 
+        # Configure the connections trace output
+        if args_command_list.trace_file:
+            self._output_generator_list.append(TraceOutputGenerator(open(args_command_list.trace_file, 'wt')))
+
         # Forward the notification
         for out_generator in self._output_generator_list:
             out_generator.command_line_parsed(available_plugins, args_command_list)
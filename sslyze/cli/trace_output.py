@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import json
+
+from sslyze.cli import CompletedServerScan
+from sslyze.cli import FailedServerScan
+from sslyze.cli.output_generator import OutputGenerator
+from sslyze.utils.python_compatibility import IS_PYTHON_2
+
+
+class TraceOutputGenerator(OutputGenerator):
+    """Write the timing of every connection as a trace file, in the Trace Event Format.
+
+    The resulting file can be opened with chrome://tracing or https://ui.perfetto.dev: each server is displayed as a
+    process, each connection as a thread and each phase of the connection (TCP connect, StartTLS negotiation, TLS
+    handshake, etc.) as a slice.
+    """
+
+    def __init__(self, file_to):
+        super(TraceOutputGenerator, self).__init__(file_to)
+        self._trace_events = []
+        self._connections_nb = 0
+
+    def command_line_parsed(self, available_plugins, args_command_list):
+        pass
+
+    def server_connectivity_test_failed(self, failed_scan):
+        # type: (FailedServerScan) -> None
+        pass
+
+    def server_connectivity_test_succeeded(self, server_connectivity_info):
+        pass
+
+    def scans_started(self):
+        pass
+
+    def server_scan_completed(self, server_scan_result):
+        # type: (CompletedServerScan) -> None
+        server_info = server_scan_result.server_info
+        process_name = '{}:{}'.format(server_info.hostname, server_info.port)
+        self._trace_events.append({'name': 'process_name', 'ph': 'M', 'pid': process_name,
+                                   'args': {'name': process_name}})
+
+        for plugin_result in server_scan_result.plugin_result_list:
+            if not plugin_result.connection_traces:
+                continue
+
+            scan_command_name = plugin_result.scan_command.get_cli_argument()
+            for connection_trace in plugin_result.connection_traces:
+                if not connection_trace.phase_timings:
+                    # The connection was never opened
+                    continue
+
+                self._connections_nb += 1
+                thread_id = self._connections_nb
+                connection_start = min([timing.start_time for timing in connection_trace.phase_timings])
+                connection_end = max([timing.end_time for timing in connection_trace.phase_timings])
+
+                # One slice for the whole connection, with its counters
+                self._trace_events.append({
+                    'name': scan_command_name,
+                    'cat': 'connection',
+                    'ph': 'X',
+                    'pid': process_name,
+                    'tid': thread_id,
+                    'ts': connection_start * 1000000,
+                    'dur': (connection_end - connection_start) * 1000000,
+                    'args': {'thread': connection_trace.thread_name,
+                             'retries_nb': connection_trace.retries_nb,
+                             'bytes_sent': connection_trace.bytes_sent,
+                             'bytes_received': connection_trace.bytes_received},
+                })
+
+                # Nested slices for each phase
+                for timing in connection_trace.phase_timings:
+                    phase_event = {
+                        'name': timing.phase.name.lower(),
+                        'cat': scan_command_name,
+                        'ph': 'X',
+                        'pid': process_name,
+                        'tid': thread_id,
+                        'ts': timing.start_time * 1000000,
+                        'dur': timing.duration * 1000000,
+                    }
+                    if timing.error_message:
+                        phase_event['args'] = {'error': timing.error_message}
+                    self._trace_events.append(phase_event)
+
+    def scans_completed(self, total_scan_time):
+        # type: (float) -> None
+        json_out = json.dumps({'traceEvents': self._trace_events, 'displayTimeUnit': 'ms'}, ensure_ascii=True)
+        if IS_PYTHON_2:
+            json_out = unicode(json_out)
+        self._file_to.write(json_out)
@@ -2,13 +2,17 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
 
+import binascii
 import re
+from base64 import b64decode
+from hashlib import sha256
 from xml.dom import minidom
 
 from sslyze import PROJECT_URL, __version__
 from sslyze.cli import CompletedServerScan
 from sslyze.cli import FailedServerScan
 from sslyze.cli.output_generator import OutputGenerator
+from sslyze.ssl_settings import HttpConnectProxyPoolSettings
 from sslyze.ssl_settings import TlsWrappedProtocolEnum
 from xml.etree.ElementTree import Element, tostring
 
@@ -40,8 +44,16 @@ def __init__(self, file_to):
         self._xml_root_node.append(self._xml_results_node)
         self._xml_root_node.append(self._xml_failed_scans_node)
 
+        # Set when certificates are only written once, in a top-level table
+        self._xml_certificates_node = None
+        self._certificate_ids = set()
+
 
     def command_line_parsed(self, available_plugins, args_command_list):
+        if args_command_list.dedup_certificates:
+            self._xml_certificates_node = Element('certificates')
+            self._xml_root_node.append(self._xml_certificates_node)
+
         self._xml_results_node.attrib.update({'networkTimeout': str(args_command_list.timeout),
                                               'networkMaxRetries': str(args_command_list.nb_retries)})
 
@@ -70,7 +82,9 @@ def server_scan_completed(self, server_scan_result):
                          'tlsWrappedProtocol': self.TLS_PROTOCOL_XML_TEXT[server_info.tls_wrapped_protocol]}
 
         # Add proxy settings
-        if server_info.http_tunneling_settings:
+        if isinstance(server_info.http_tunneling_settings, HttpConnectProxyPoolSettings):
+            target_attrib['httpsTunnelProxies'] = str(server_info.http_tunneling_settings)
+        elif server_info.http_tunneling_settings:
             target_attrib['httpsTunnelHostname'] = server_info.http_tunneling_settings.hostname
             target_attrib['httpsTunnelPort'] = str(server_info.http_tunneling_settings.port)
         else:
@@ -82,11 +96,37 @@ def server_scan_completed(self, server_scan_result):
 
         # Add each plugins's XML output
         for plugin_result in server_scan_result.plugin_result_list:
-            server_scan_node.append(plugin_result.as_xml())
+            plugin_result_node = plugin_result.as_xml()
+            if self._xml_certificates_node is not None:
+                self._move_certificates_to_table(plugin_result_node)
+            server_scan_node.append(plugin_result_node)
 
         self._xml_results_node.append(server_scan_node)
 
 
+    def _move_certificates_to_table(self, xml_node):
+        # type: (Element) -> None
+        """Replace each certificate within the node with a reference to the same certificate in the top-level table.
+        """
+        for parent_node in list(xml_node.iter()):
+            for index, child_node in enumerate(list(parent_node)):
+                if child_node.tag != 'certificate':
+                    continue
+
+                pem_node = child_node.find('asPEM')
+                pem_lines = [line.strip() for line in pem_node.text.strip().splitlines()]
+                der_certificate = b64decode(''.join([line for line in pem_lines if not line.startswith('-----')]))
+                certificate_id = binascii.hexlify(sha256(der_certificate).digest()).decode('ascii')
+
+                if certificate_id not in self._certificate_ids:
+                    self._certificate_ids.add(certificate_id)
+                    child_node.attrib['id'] = certificate_id
+                    self._xml_certificates_node.append(child_node)
+
+                parent_node.remove(child_node)
+                parent_node.insert(index, Element('certificateRef', certificateId=certificate_id))
+
+
     def scans_completed(self, total_scan_time):
         self._xml_results_node.attrib['totalScanTime'] = str(total_scan_time)
 
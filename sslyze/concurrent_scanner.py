@@ -54,8 +54,9 @@ def __init__(self,
                  network_retries=SynchronousScanner.DEFAULT_NETWORK_RETRIES,
                  network_timeout=SynchronousScanner.DEFAULT_NETWORK_TIMEOUT,
                  max_processes_nb=_DEFAULT_MAX_PROCESSES_NB,
-                 max_processes_per_hostname_nb=_DEFAULT_PROCESSES_PER_HOSTNAME_NB):
-        # type: (Optional[int], Optional[int], Optional[int], Optional[int]) -> None
+                 max_processes_per_hostname_nb=_DEFAULT_PROCESSES_PER_HOSTNAME_NB,
+                 should_trace_connections=False):
+        # type: (Optional[int], Optional[int], Optional[int], Optional[int], Optional[bool]) -> None
         """Create a scanner for running scanning commands concurrently using a pool of processes.
 
         Args:
@@ -64,11 +65,15 @@ def __init__(self,
             max_processes_nb (Optional[int]): The maximum number of processes to spawn for running scans concurrently.
             max_processes_per_hostname_nb (Optional[int]): The maximum number of processes that can be used for running
                 scans concurrently against a single server. A lower value will reduce the chances of DOS-ing the server.
+            should_trace_connections (Optional[bool]): Whether to record the timing of every connection opened while
+                running each scan command, into the result's connection_traces and connection_traces_summary
+                attributes.
         """
         self._network_retries = network_retries
         self._network_timeout = network_timeout
         self._max_processes_nb = max_processes_nb
         self._max_processes_per_hostname_nb = max_processes_per_hostname_nb
+        self._should_trace_connections = should_trace_connections
 
         # Create hostname-specific queues to ensure aggressive scan commands targeting this hostname are never
         # run concurrently
@@ -114,7 +119,7 @@ def _check_and_create_process(self, hostname):
                 self._hostname_queues_dict[hostname] = hostname_queue
 
                 process = WorkerProcess(hostname_queue, self._task_queue, self._result_queue, self._network_retries,
-                                        self._network_timeout)
+                                        self._network_timeout, self._should_trace_connections)
                 process.start()
                 self._processes_dict[hostname] = [process]
             else:
@@ -129,7 +134,7 @@ def _check_and_create_process(self, hostname):
                     and self._get_current_processes_nb() < self._max_processes_nb:
                 # We can create a new process; no need to create a queue as it already exists
                 process = WorkerProcess(self._hostname_queues_dict[hostname], self._task_queue, self._result_queue,
-                                        self._network_retries, self._network_timeout)
+                                        self._network_retries, self._network_timeout, self._should_trace_connections)
                 process.start()
                 self._processes_dict[hostname].append(process)
 
@@ -3,7 +3,6 @@
 from __future__ import unicode_literals
 
 import optparse
-import os
 from ssl import CertificateError
 from xml.etree.ElementTree import Element
 
@@ -18,16 +17,19 @@
 from cryptography.hazmat.primitives.serialization import Encoding
 from cryptography.hazmat.primitives.asymmetric.ec import EllipticCurvePublicKey
 from nassl.ocsp_response import OcspResponse, OcspResponseStatusEnum
-from nassl.ocsp_response import OcspResponseNotTrustedError
 from nassl.ssl_client import ClientCertificateRequested
 from sslyze.plugins import plugin_base
 from sslyze.plugins.plugin_base import PluginScanResult, PluginScanCommand
+from sslyze.plugins.utils.certificate_inventory import CertificateInventory
+from sslyze.plugins.utils.certificate_parse_cache import CertificateParseCache
 from sslyze.plugins.utils.certificate_utils import CertificateUtils
+from sslyze.plugins.utils.ocsp_verification_cache import OcspVerificationCache
 from sslyze.plugins.utils.trust_store.trust_store import TrustStore
-from sslyze.plugins.utils.trust_store.trust_store import InvalidCertificateChainOrderError
-from sslyze.plugins.utils.trust_store.trust_store import AnchorCertificateNotInTrustStoreError
+from sslyze.plugins.utils.trust_store.trust_store import CouldNotBuildVerifiedChainError
+from sslyze.plugins.utils.trust_store.intermediate_certificates_store import IntermediateCertificatesStore
 from sslyze.plugins.utils.trust_store.trust_store_repository import TrustStoresRepository
 from sslyze.server_connectivity import ServerConnectivityInfo
+from sslyze.utils.lazy_property import LazyProperty
 from sslyze.utils.thread_pool import ThreadPool
 from typing import List
 from typing import Optional
@@ -40,16 +42,22 @@ class CertificateInfoScanCommand(PluginScanCommand):
     check for OCSP stapling support.
     """
 
-    def __init__(self, ca_file=None):
-        # type: (Optional[Text], Optional[bool]) -> None
+    def __init__(self, ca_file=None, inventory_db=None, save_intermediate_certs=False):
+        # type: (Optional[Text], Optional[Text], bool) -> None
         """
 
         Args:
             ca_file (Text): The path to a custom trust store file to use for certificate validation. The file should
                 contain PEM-formatted root certificates.
+            inventory_db (Text): The path to an SQLite database where the certificates returned by the server and their
+                expiration dates, names and keys should be recorded (see CertificateInventory).
+            save_intermediate_certs (bool): Save the intermediate certificates sent by the server in the current user's
+                ~/.sslyze folder, so that they can be used to build the verified chains of servers scanned later.
         """
         super(CertificateInfoScanCommand, self).__init__()
         self.custom_ca_file = ca_file
+        self.inventory_db = inventory_db
+        self.save_intermediate_certs = save_intermediate_certs
 
     @classmethod
     def get_title(cls):
@@ -65,7 +73,8 @@ class PathValidationResult(object):
 
     Attributes:
         trust_store (TrustStore): The trust store used for validation.
-        verify_string (Text): The string returned by OpenSSL's validation function.
+        verify_string (Text): The string returned by OpenSSL's validation function, such as "ok" or "certificate has
+            expired".
         is_certificate_trusted (bool): Whether the certificate chain is trusted when using supplied the trust_store.
     """
     def __init__(self, trust_store, verify_string):
@@ -112,6 +121,23 @@ def get_cli_option_group(cls):
                 dest='ca_file'
             )
         )
+        options.append(
+            optparse.make_option(
+                '--inventory_db',
+                help='Path to an SQLite database file where the certificates returned by the server(s) should be '
+                     'recorded, with their expiration date, names, key and the endpoints that returned them. The '
+                     'database is updated during the scan and can be re-used across scans.',
+                dest='inventory_db'
+            )
+        )
+        options.append(
+            optparse.make_option(
+                '--save_intermediate_certs',
+                help='Save the intermediate certificates sent by the server(s) in the current user\'s ~/.sslyze '
+                     'folder, to build the verified chains of servers scanned later that do not send them.',
+                action='store_true'
+            )
+        )
         return options
 
 
@@ -119,19 +145,22 @@ def process_task(self, server_info, scan_command):
         # type: (ServerConnectivityInfo, CertificateInfoScanCommand) -> CertificateInfoScanResult
         final_trust_store_list = list(TrustStoresRepository.get_all())
         if scan_command.custom_ca_file:
-            if not os.path.isfile(scan_command.custom_ca_file):
+            try:
+                custom_trust_store = TrustStoresRepository.get_custom_trust_store(scan_command.custom_ca_file,
+                                                                                  'Custom --ca_file', 'N/A')
+            except IOError:
                 raise ValueError('Could not open supplied CA file at "{}"'.format(scan_command.custom_ca_file))
-            final_trust_store_list.append(TrustStore(scan_command.custom_ca_file, 'Custom --ca_file', 'N/A'))
+            final_trust_store_list.append(custom_trust_store)
 
         # Workaround for https://github.com/pyca/cryptography/issues/3495
         default_backend()
 
         thread_pool = ThreadPool()
         for trust_store in final_trust_store_list:
-            # Try to connect with each trust store
+            # Try to connect with each trust store; OpenSSL validates the chain during the handshake
             thread_pool.add_job((self._get_and_verify_certificate_chain, (server_info, trust_store)))
 
-        # Start processing the jobs; one thread per trust
+        # Start processing the jobs; one thread per trust store
         thread_pool.start(len(final_trust_store_list))
 
         # Store the results as they come
@@ -142,9 +171,9 @@ def process_task(self, server_info, scan_command):
 
         for (job, result) in thread_pool.get_result():
             (_, (_, trust_store)) = job
-            certificate_chain, validation_result, ocsp_response = result
+            certificate_chain, verify_str, ocsp_response = result
             # Store the returned verify string for each trust store
-            path_validation_result_list.append(PathValidationResult(trust_store, validation_result))
+            path_validation_result_list.append(PathValidationResult(trust_store, verify_str))
 
         # Store thread pool errors
         last_exception = None
@@ -159,42 +188,69 @@ def process_task(self, server_info, scan_command):
             # All connections failed unexpectedly; raise an exception instead of returning a result
             raise last_exception
 
+        # Keep the intermediate certificates to complete the chains of servers that do not send them
+        if scan_command.save_intermediate_certs:
+            IntermediateCertificatesStore.set_path(IntermediateCertificatesStore.DEFAULT_PATH)
+        IntermediateCertificatesStore.add_certificates(certificate_chain[1:])
+
+        if scan_command.inventory_db:
+            CertificateInventory(scan_command.inventory_db).add_certificate_chain(
+                server_info.hostname, server_info.ip_address, server_info.port,
+                server_info.tls_server_name_indication, certificate_chain
+            )
+
+        completed_certificate_chain = []
+        if not any([path_result.is_certificate_trusted for path_result in path_validation_result_list]):
+            # The validation may have failed because the server did not send all the intermediate certificates
+            completed_certificate_chain = self._complete_certificate_chain(final_trust_store_list, certificate_chain)
+
         # All done
         return CertificateInfoScanResult(server_info, scan_command, certificate_chain, path_validation_result_list,
-                                         path_validation_error_list, ocsp_response)
+                                         path_validation_error_list, ocsp_response, completed_certificate_chain)
 
+    @staticmethod
+    def _complete_certificate_chain(trust_store_list, certificate_chain):
+        # type: (List[TrustStore], List[cryptography.x509.Certificate]) -> List[cryptography.x509.Certificate]
+        """Try to complete the certificate chain up to an anchor of one of the trust stores, using the intermediate
+        certificates sent by previously scanned servers. Returns an empty list if no intermediate certificate was
+        missing or if the chain could not be completed.
+        """
+        for trust_store in sorted(trust_store_list, key=lambda store: store.name.lower()):
+            try:
+                built_certificate_chain = trust_store.build_verified_certificate_chain(certificate_chain)
+            except CouldNotBuildVerifiedChainError:
+                continue
+            # Only report the chain if the harvested intermediate certificates were actually needed
+            if [cert for cert in built_certificate_chain[:-1] if cert not in certificate_chain]:
+                return built_certificate_chain
+        return []
 
     @staticmethod
     def _get_and_verify_certificate_chain(server_info, trust_store):
         # type: (ServerConnectivityInfo, TrustStore) -> Tuple[List[cryptography.x509.Certificate], Text, Optional[OcspResponse]]
         """Connects to the target server and uses the supplied trust store to validate the server's certificate.
-        Returns the server's certificate and OCSP response.
+        Returns the server's certificate chain, the OpenSSL verify string and the OCSP response.
         """
         ssl_connection = server_info.get_preconfigured_ssl_connection(ssl_verify_locations=trust_store.path)
 
         # Enable OCSP stapling
-        ssl_connection.ssl_client.set_tlsext_status_ocsp()
-
-        try:  # Perform the SSL handshake
-            ssl_connection.connect()
+        ssl_connection.request_ocsp_stapling()
 
-            ocsp_response = ssl_connection.ssl_client.get_tlsext_status_ocsp_resp()
-            x509_cert_chain = ssl_connection.ssl_client.get_peer_cert_chain()
-            (_, verify_str) = ssl_connection.ssl_client.get_certificate_chain_verify_result()
+        try:
+            try:  # Perform the SSL handshake
+                ssl_connection.connect()
+            except ClientCertificateRequested:  # The server asked for a client cert
+                # We can get the server cert anyway
+                pass
 
-        except ClientCertificateRequested:  # The server asked for a client cert
-            # We can get the server cert anyway
             ocsp_response = ssl_connection.ssl_client.get_tlsext_status_ocsp_resp()
-            x509_cert_chain = ssl_connection.ssl_client.get_peer_cert_chain()
+            pem_cert_chain = [x509_cert.as_pem() for x509_cert in ssl_connection.ssl_client.get_peer_cert_chain()]
             (_, verify_str) = ssl_connection.ssl_client.get_certificate_chain_verify_result()
-
         finally:
             ssl_connection.close()
 
-        # Parse the certificates using the cryptography module
-        parsed_x509_chain = [cryptography.x509.load_pem_x509_certificate(x509_cert.as_pem().encode('ascii'),
-                                                                         backend=default_backend())
-                             for x509_cert in x509_cert_chain]
+        # Parse the certificates using the cryptography module; the chain is the same for all the trust stores
+        parsed_x509_chain = [CertificateParseCache.get_certificate_from_pem(pem_cert) for pem_cert in pem_cert_chain]
         return parsed_x509_chain, verify_str, ocsp_response
 
 
@@ -218,8 +274,13 @@ class CertificateInfoScanResult(PluginScanResult):
         verified_certificate_chain (List[cryptography.x509.Certificate]): The verified certificate chain built using the
             successful_trust_store; index 0 is the leaf certificate and the last element is the anchor/CA certificate
             from the trust store. Will be empty if the validation failed with all available trust store, or the
-            verified chain could not be built. Each certificate is parsed using the cryptography module; documentation 
+            verified chain could not be built. Each certificate is parsed using the cryptography module; documentation
             is available at https://cryptography.io/en/latest/x509/reference/#x-509-certificate-object. 
+        completed_certificate_chain (List[cryptography.x509.Certificate]): If no trust store validated the server's
+            certificate chain, the chain completed up to an anchor of a trust store using the intermediate certificates
+            sent by previously scanned servers; this chain was NOT verified (the signatures, validity dates, etc. were
+            not checked). Empty if the chain was validated, if no intermediate certificate was missing, or if the chain
+            could not be completed.
         certificate_matches_hostname (bool): True if hostname validation was successful ie. the leaf certificate was
             issued for the server's hostname.
         is_leaf_certificate_ev (bool): True if the leaf certificate is Extended Validation according to Mozilla.
@@ -243,7 +304,8 @@ def __init__(
             certificate_chain,              # type: List[cryptography.x509.Certificate]
             path_validation_result_list,    # type: List[PathValidationResult]
             path_validation_error_list,     # type: List[PathValidationError]
-            ocsp_response                   # type: OcspResponse
+            ocsp_response,                  # type: OcspResponse
+            completed_certificate_chain=None  # type: Optional[List[cryptography.x509.Certificate]]
             ):
         # type: (...) -> None
         super(CertificateInfoScanResult, self).__init__(server_info, scan_command)
@@ -269,64 +331,96 @@ def sort_function(path_validation):
             # We only keep the dictionary as a nassl.OcspResponse is not pickable
             self.ocsp_response = ocsp_response.as_dict()
             if self.successful_trust_store and self.ocsp_response_status == OcspResponseStatusEnum.SUCCESSFUL:
-                try:
-                    ocsp_response.verify(self.successful_trust_store.path)
-                    self.is_ocsp_response_trusted = True
-                except OcspResponseNotTrustedError:
-                    self.is_ocsp_response_trusted = False
-
-        self.certificate_chain = certificate_chain
-
-        # Check if it is EV - we only have the EV OIDs for Mozilla
-        self.is_leaf_certificate_ev = TrustStoresRepository.get_main().is_extended_validation(self.certificate_chain[0])
-
-        # Try to build the verified chain
-        self.verified_certificate_chain = []
-        self.is_certificate_chain_order_valid = True
-        if self.successful_trust_store:
-            try:
-                self.verified_certificate_chain = self.successful_trust_store.build_verified_certificate_chain(
-                    self.certificate_chain
+                self.is_ocsp_response_trusted = OcspVerificationCache.is_response_trusted(
+                    ocsp_response, self.successful_trust_store
                 )
-            except InvalidCertificateChainOrderError:
-                self.is_certificate_chain_order_valid = False
-            except AnchorCertificateNotInTrustStoreError:
-                pass
-
-        self.has_anchor_in_certificate_chain = None
-        if self.verified_certificate_chain:
-            self.has_anchor_in_certificate_chain = self.verified_certificate_chain[-1] in self.certificate_chain
 
         self.path_validation_result_list = path_validation_result_list
         self.path_validation_error_list = path_validation_error_list
+
+        # Only the DER-encoded certificates are stored; the parsed certificates and the properties derived from them are
+        # computed the first time they get accessed
+        self._certificate_chain_as_der = [cert.public_bytes(Encoding.DER) for cert in certificate_chain]
+        self._completed_certificate_chain_as_der = [
+            cert.public_bytes(Encoding.DER) for cert in completed_certificate_chain or []
+        ]
+
+    @LazyProperty
+    def certificate_chain(self):
+        # type: () -> List[cryptography.x509.Certificate]
+        return [CertificateParseCache.get_certificate_from_der(cert_der) for cert_der in self._certificate_chain_as_der]
+
+    @LazyProperty
+    def completed_certificate_chain(self):
+        # type: () -> List[cryptography.x509.Certificate]
+        return [CertificateParseCache.get_certificate_from_der(cert_der)
+                for cert_der in self._completed_certificate_chain_as_der]
+
+    @LazyProperty
+    def is_leaf_certificate_ev(self):
+        # type: () -> bool
+        # Check if it is EV - we only have the EV OIDs for Mozilla
+        return TrustStoresRepository.get_main().is_extended_validation(self.certificate_chain[0])
+
+    @LazyProperty
+    def verified_certificate_chain(self):
+        # type: () -> List[cryptography.x509.Certificate]
+        if not self.successful_trust_store:
+            # Only chains that were validated by a trust store are reported as verified
+            return []
+        try:
+            return self.successful_trust_store.build_verified_certificate_chain(self.certificate_chain)
+        except CouldNotBuildVerifiedChainError:
+            return []
+
+    @LazyProperty
+    def is_certificate_chain_order_valid(self):
+        # type: () -> bool
+        return TrustStore.is_certificate_chain_order_valid(self.certificate_chain)
+
+    @LazyProperty
+    def has_anchor_in_certificate_chain(self):
+        # type: () -> Optional[bool]
+        if not self.verified_certificate_chain:
+            return None
+        return self.verified_certificate_chain[-1] in self.certificate_chain
+
+    @LazyProperty
+    def certificate_matches_hostname(self):
+        # type: () -> bool
         try:
-            CertificateUtils.matches_hostname(certificate_chain[0], server_info.tls_server_name_indication)
-            self.certificate_matches_hostname = True
+            CertificateUtils.matches_hostname(self.certificate_chain[0], self.server_info.tls_server_name_indication)
+            return True
         except CertificateError:
-            self.certificate_matches_hostname = False
+            return False
 
+    @LazyProperty
+    def has_sha1_in_certificate_chain(self):
+        # type: () -> Optional[bool]
         # Check if a SHA1-signed certificate is in the chain
         # Root certificates can still be signed with SHA1 so we only check leaf and intermediate certificates
-        self.has_sha1_in_certificate_chain = None
-        if self.verified_certificate_chain:
-            self.has_sha1_in_certificate_chain = False
-            for cert in self.verified_certificate_chain[:-1]:
-                if isinstance(cert.signature_hash_algorithm, hashes.SHA1):
-                    self.has_sha1_in_certificate_chain = True
-                    break
+        if not self.verified_certificate_chain:
+            return None
+        for cert in self.verified_certificate_chain[:-1]:
+            if isinstance(cert.signature_hash_algorithm, hashes.SHA1):
+                return True
+        return False
 
     def __getstate__(self):
         # This object needs to be pick-able as it gets sent through multiprocessing.Queues
         pickable_dict = self.__dict__.copy()
+        # The lazy properties that were already computed are kept; the certificates they contain are not pickable so
+        # they are sent as DER. The received and completed chains are already stored as DER
+        pickable_dict.pop('certificate_chain', None)
+        pickable_dict.pop('completed_certificate_chain', None)
+        if 'verified_certificate_chain' in pickable_dict:
+            pickable_dict['verified_certificate_chain'] = [
+                cert.public_bytes(Encoding.DER) for cert in pickable_dict['verified_certificate_chain']
+            ]
+
         # Manually handle non-pickable entries
         pickable_dict['successful_trust_store'] = pickle.dumps(pickable_dict['successful_trust_store'])
         pickable_dict['path_validation_result_list'] = pickle.dumps(pickable_dict['path_validation_result_list'])
-
-        pem_certificate_chain = [cert.public_bytes(Encoding.PEM) for cert in pickable_dict['certificate_chain']]
-        pickable_dict['certificate_chain'] = pem_certificate_chain
-
-        pem_verified_chain = [cert.public_bytes(Encoding.PEM) for cert in pickable_dict['verified_certificate_chain']]
-        pickable_dict['verified_certificate_chain'] = pem_verified_chain
         return pickable_dict
 
     def __setstate__(self, state):
@@ -334,14 +428,11 @@ def __setstate__(self, state):
         # Manually restore non-pickable entries
         self.__dict__['successful_trust_store'] = pickle.loads(self.__dict__['successful_trust_store'])
         self.__dict__['path_validation_result_list'] = pickle.loads(self.__dict__['path_validation_result_list'])
-
-        certificate_chain = [cryptography.x509.load_pem_x509_certificate(cert_pem, default_backend())
-                             for cert_pem in self.__dict__['certificate_chain']]
-        self.__dict__['certificate_chain'] = certificate_chain
-
-        verified_chain = [cryptography.x509.load_pem_x509_certificate(cert_pem, default_backend())
-                          for cert_pem in self.__dict__['verified_certificate_chain']]
-        self.__dict__['verified_certificate_chain'] = verified_chain
+        if 'verified_certificate_chain' in self.__dict__:
+            self.__dict__['verified_certificate_chain'] = [
+                CertificateParseCache.get_certificate_from_der(cert_der)
+                for cert_der in self.__dict__['verified_certificate_chain']
+            ]
 
     TRUST_FORMAT = '{store_name} CA Store ({store_version}):'
     NO_VERIFIED_CHAIN_ERROR_TXT = 'ERROR - Could not build verified chain (certificate untrusted?)'
@@ -403,6 +494,16 @@ def as_text(self):
             verified_chain_txt = self.NO_VERIFIED_CHAIN_ERROR_TXT
         text_output.append(self._format_field('Verified Chain:', verified_chain_txt))
 
+        if self.completed_certificate_chain:
+            cns_in_certificate_chain = [CertificateUtils.get_name_as_short_text(cert.subject)
+                                        for cert in self.completed_certificate_chain]
+            text_output.append(self._format_field(
+                'Completed Chain:',
+                'NOT VERIFIED - Could be completed with known intermediates: {}'.format(
+                    ' --> '.join(cns_in_certificate_chain)
+                )
+            ))
+
         if self.verified_certificate_chain:
             chain_with_anchor_txt = 'OK - Anchor certificate not sent' if not self.has_anchor_in_certificate_chain \
                 else 'WARNING - Received certificate chain contains the anchor certificate'
@@ -571,6 +672,13 @@ def as_xml(self):
                 verified_cert_chain_xml.append(cert_xml)
             trust_validation_xml.append(verified_cert_chain_xml)
 
+        # Chain completed with the intermediate certificates of previously scanned servers; it was not verified
+        if self.completed_certificate_chain:
+            completed_cert_chain_xml = Element('completedCertificateChain', {'isVerified': 'False'})
+            for cert_xml in self._certificate_chain_to_xml(self.completed_certificate_chain):
+                completed_cert_chain_xml.append(cert_xml)
+            trust_validation_xml.append(completed_cert_chain_xml)
+
         xml_output.append(trust_validation_xml)
 
 
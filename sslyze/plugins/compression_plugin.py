@@ -7,6 +7,7 @@
 from sslyze.plugins import plugin_base
 from sslyze.plugins.plugin_base import PluginScanResult, PluginScanCommand
 from sslyze.server_connectivity import ServerConnectivityInfo
+from sslyze.utils.handshake_facts_cache import HandshakeFactsCache
 from typing import Text
 
 
@@ -33,6 +34,11 @@ def get_available_commands(cls):
 
     def process_task(self, server_info, scan_command):
         # type: (ServerConnectivityInfo, CompressionScanCommand) -> CompressionScanResult
+        # Re-use the result of a handshake another plugin already did with the legacy OpenSSL client, if any
+        handshake_facts = HandshakeFactsCache.get_facts_for_server(server_info)
+        if handshake_facts and handshake_facts.are_legacy_client_facts_known:
+            return CompressionScanResult(server_info, scan_command, handshake_facts.compression_name)
+
         ssl_connection = server_info.get_preconfigured_ssl_connection(should_use_legacy_openssl=True)
 
         # Make sure OpenSSL was built with support for compression to avoid false negatives
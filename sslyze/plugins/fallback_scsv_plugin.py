@@ -2,19 +2,36 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
 
+import optparse
 from xml.etree.ElementTree import Element
 from nassl import _nassl
 from nassl.ssl_client import OpenSslVersionEnum
 from sslyze.plugins import plugin_base
 from sslyze.plugins.plugin_base import PluginScanResult, PluginScanCommand
 from sslyze.server_connectivity import ServerConnectivityInfo
+from sslyze.utils.handshake_facts_cache import HandshakeFactsCache
 from sslyze.utils.ssl_connection import SSLHandshakeRejected
+from sslyze.utils.thread_pool import ThreadPool
+from typing import List
+from typing import Optional
+from typing import Text
 
 
 class FallbackScsvScanCommand(PluginScanCommand):
     """Test the server(s) for support of the TLS_FALLBACK_SCSV cipher suite which prevents downgrade attacks.
     """
 
+    def __init__(self, fallback_matrix=False):
+        # type: (Optional[bool]) -> None
+        """
+
+        Args:
+            fallback_matrix (bool): Test every SSL/TLS version lower than the highest version supported by the server,
+                in parallel, instead of only the version right below it.
+        """
+        super(FallbackScsvScanCommand, self).__init__()
+        self.fallback_matrix = fallback_matrix
+
     @classmethod
     def get_cli_argument(cls):
         return 'fallback'
@@ -28,17 +45,83 @@ class FallbackScsvPlugin(plugin_base.Plugin):
     """Test the server(s) for support of the TLS_FALLBACK_SCSV cipher suite which prevents downgrade attacks.
     """
 
+    MAX_THREADS = 5
+
     @classmethod
     def get_available_commands(cls):
         return [FallbackScsvScanCommand]
 
+    @classmethod
+    def get_cli_option_group(cls):
+        options = super(FallbackScsvPlugin, cls).get_cli_option_group()
+
+        # Add the special optional argument for this plugin's commands
+        # They must match the names in the commands' contructor
+        options.append(
+            optparse.make_option(
+                '--fallback_matrix',
+                help='Option - For --fallback, tests every SSL/TLS version lower than the highest version supported '
+                     'by the server(s), in parallel.',
+                action='store_true'
+            )
+        )
+        return options
+
     def process_task(self, server_info, scan_command):
         # type: (ServerConnectivityInfo, FallbackScsvScanCommand) -> FallbackScsvScanResult
         if server_info.highest_ssl_version_supported.value <= OpenSslVersionEnum.SSLV3.value:
             raise ValueError('Server only supports SSLv3; no downgrade attacks are possible')
 
-        # Try to connect using a lower TLS version with the fallback cipher suite enabled
-        ssl_version_downgrade = OpenSslVersionEnum(server_info.highest_ssl_version_supported.value - 1)
+        # Skip the versions that other scan commands already found to be unsupported; TLS_FALLBACK_SCSV is not
+        # available with SSLv2
+        ssl_versions_support = HandshakeFactsCache.get_ssl_versions_support(server_info)
+        ssl_versions_downgrade = [
+            ssl_version for ssl_version in OpenSslVersionEnum
+            if OpenSslVersionEnum.SSLV3.value <= ssl_version.value < server_info.highest_ssl_version_supported.value
+            and ssl_versions_support.get(ssl_version, True)
+        ]
+
+        if not scan_command.fallback_matrix or not ssl_versions_downgrade:
+            # Try to connect using a lower TLS version with the fallback cipher suite enabled
+            ssl_version_downgrade = OpenSslVersionEnum(server_info.highest_ssl_version_supported.value - 1)
+            supports_fallback_scsv = self._test_downgrade(server_info, ssl_version_downgrade)
+            return FallbackScsvScanResult(server_info, scan_command, supports_fallback_scsv)
+
+        # Test each version in parallel; one thread per version
+        thread_pool = ThreadPool()
+        for ssl_version in ssl_versions_downgrade:
+            thread_pool.add_job((self._test_downgrade, (server_info, ssl_version)))
+        thread_pool.start(nb_threads=min(len(ssl_versions_downgrade), self.MAX_THREADS))
+
+        downgrade_results = []
+        for (job, supports_fallback_scsv) in thread_pool.get_result():
+            ssl_version = job[1][1]
+            downgrade_results.append(DowngradeResult(ssl_version, supports_fallback_scsv))
+
+        last_exception = None
+        for (job, exception) in thread_pool.get_error():
+            ssl_version = job[1][1]
+            error_message = '{} - {}'.format(str(exception.__class__.__name__), str(exception))
+            downgrade_results.append(DowngradeResult(ssl_version, None, error_message))
+            last_exception = exception
+
+        thread_pool.join()
+
+        if all([result.error_message for result in downgrade_results]):
+            # All the downgrades failed unexpectedly; raise an exception instead of returning a result
+            raise last_exception
+
+        downgrade_results.sort(key=lambda result: result.ssl_version.value, reverse=True)
+        supports_fallback_scsv = all([result.supports_fallback_scsv for result in downgrade_results
+                                      if result.error_message is None])
+        return FallbackScsvScanResult(server_info, scan_command, supports_fallback_scsv, downgrade_results)
+
+    @staticmethod
+    def _test_downgrade(server_info, ssl_version_downgrade):
+        # type: (ServerConnectivityInfo, OpenSslVersionEnum) -> bool
+        """Try to connect using the supplied lower SSL/TLS version with the fallback cipher suite enabled, and return
+        True if the server rejected the handshake.
+        """
         ssl_connection = server_info.get_preconfigured_ssl_connection(override_ssl_version=ssl_version_downgrade)
         ssl_connection.ssl_client.enable_fallback_scsv()
 
@@ -63,7 +146,24 @@ def process_task(self, server_info, scan_command):
         finally:
             ssl_connection.close()
 
-        return FallbackScsvScanResult(server_info, scan_command, supports_fallback_scsv)
+        return supports_fallback_scsv
+
+
+class DowngradeResult(object):
+    """The result of trying to downgrade the connection to a specific SSL/TLS version, with TLS_FALLBACK_SCSV enabled.
+
+    Attributes:
+        ssl_version (OpenSslVersionEnum): The lower SSL/TLS version that was used for the handshake.
+        supports_fallback_scsv (Optional[bool]): True if the server rejected the downgraded handshake. None if the
+            handshake failed with an unexpected error.
+        error_message (Optional[Text]): The error that happened during the handshake, if any.
+    """
+
+    def __init__(self, ssl_version, supports_fallback_scsv, error_message=None):
+        # type: (OpenSslVersionEnum, Optional[bool], Optional[Text]) -> None
+        self.ssl_version = ssl_version
+        self.supports_fallback_scsv = supports_fallback_scsv
+        self.error_message = error_message
 
 
 class FallbackScsvScanResult(PluginScanResult):
@@ -71,13 +171,17 @@ class FallbackScsvScanResult(PluginScanResult):
 
     Attributes:
         supports_fallback_scsv (bool): True if the server supports the TLS_FALLBACK_SCSV mechanism to block downgrade
-        attacks.
+        attacks. With --fallback_matrix, True if every downgrade that did not error was blocked; the scan fails if
+        all the downgrades errored.
+        downgrade_results (List[DowngradeResult]): With --fallback_matrix, the result for each lower SSL/TLS version
+            that was tested, from the highest to the lowest version. Empty otherwise.
     """
 
-    def __init__(self, server_info, scan_command, supports_fallback_scsv):
-        # type: (ServerConnectivityInfo, FallbackScsvScanCommand, bool) -> None
+    def __init__(self, server_info, scan_command, supports_fallback_scsv, downgrade_results=None):
+        # type: (ServerConnectivityInfo, FallbackScsvScanCommand, bool, Optional[List[DowngradeResult]]) -> None
         super(FallbackScsvScanResult, self).__init__(server_info, scan_command)
         self.supports_fallback_scsv = supports_fallback_scsv
+        self.downgrade_results = downgrade_results if downgrade_results else []
 
     def as_text(self):
         result_txt = [self._format_title(self.scan_command.get_title())]
@@ -85,9 +189,25 @@ def as_text(self):
             if self.supports_fallback_scsv \
             else 'VULNERABLE - Signaling cipher suite not supported'
         result_txt.append(self._format_field('TLS_FALLBACK_SCSV:', downgrade_txt))
+
+        for downgrade_result in self.downgrade_results:
+            if downgrade_result.error_message:
+                version_txt = 'ERROR - {}'.format(downgrade_result.error_message)
+            elif downgrade_result.supports_fallback_scsv:
+                version_txt = 'OK - Downgrade blocked'
+            else:
+                version_txt = 'VULNERABLE - Downgrade accepted'
+            result_txt.append(self._format_field('  {}:'.format(downgrade_result.ssl_version.name), version_txt))
         return result_txt
 
     def as_xml(self):
         result_xml = Element(self.scan_command.get_cli_argument(), title=self.scan_command.get_title())
         result_xml.append(Element('tlsFallbackScsv', attrib={'isSupported': str(self.supports_fallback_scsv)}))
+        for downgrade_result in self.downgrade_results:
+            downgrade_xml = Element('downgrade', attrib={'sslVersion': downgrade_result.ssl_version.name})
+            if downgrade_result.error_message:
+                downgrade_xml.set('error', downgrade_result.error_message)
+            else:
+                downgrade_xml.set('isBlocked', str(downgrade_result.supports_fallback_scsv))
+            result_xml.append(downgrade_xml)
         return result_xml
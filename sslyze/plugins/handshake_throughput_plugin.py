@@ -0,0 +1,318 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import optparse
+import time
+from xml.etree.ElementTree import Element
+
+from nassl.ssl_client import OpenSslVersionEnum
+from sslyze.plugins import plugin_base
+from sslyze.plugins.plugin_base import PluginScanCommand
+from sslyze.plugins.plugin_base import PluginScanResult
+from sslyze.server_connectivity import ServerConnectivityInfo
+from sslyze.utils.ssl_connection import SSLConnection
+from sslyze.utils.thread_pool import ThreadPool
+from typing import List
+from typing import Optional
+from typing import Text
+from typing import Tuple
+from typing import Union
+
+
+class HandshakeThroughputScanCommand(PluginScanCommand):
+    """Measure how many TLS handshakes per second the server(s) can handle, by performing handshakes with an increasing
+    number of concurrent connections until the throughput stops increasing or errors start happening.
+    """
+
+    DEFAULT_MAX_CONCURRENCY = 64
+    DEFAULT_LEVEL_DURATION = 5.0
+
+    def __init__(self, throughput_cipher=None, throughput_ssl_version=None, throughput_max_concurrency=None,
+                 throughput_level_duration=None):
+        # type: (Optional[Text], Optional[Union[Text, OpenSslVersionEnum]], Optional[int], Optional[float]) -> None
+        """
+
+        Args:
+            throughput_cipher (Text): The OpenSSL cipher string to use for the handshakes, for example
+                "ECDHE-ECDSA-AES128-GCM-SHA256"; by default the server picks the cipher suite.
+            throughput_ssl_version (Union[Text, OpenSslVersionEnum]): The SSL/TLS version to use for the handshakes,
+                for example "tlsv1_2"; by default the highest version supported by the server is used.
+            throughput_max_concurrency (int): The maximum number of concurrent handshakes to try; 64 by default. The
+                concurrency is doubled at each level, starting with one connection.
+            throughput_level_duration (float): How long to perform handshakes at each concurrency level, in seconds; 5
+                by default.
+        """
+        super(HandshakeThroughputScanCommand, self).__init__()
+        self.throughput_cipher = throughput_cipher
+
+        self.throughput_ssl_version = None  # type: Optional[OpenSslVersionEnum]
+        if isinstance(throughput_ssl_version, OpenSslVersionEnum):
+            self.throughput_ssl_version = throughput_ssl_version
+        elif throughput_ssl_version:
+            try:
+                self.throughput_ssl_version = OpenSslVersionEnum[throughput_ssl_version.upper()]
+            except KeyError:
+                raise ValueError('Invalid SSL/TLS version: {}; valid values are {}'.format(
+                    throughput_ssl_version, ', '.join([version.name.lower() for version in OpenSslVersionEnum])
+                ))
+
+        self.throughput_max_concurrency = throughput_max_concurrency if throughput_max_concurrency \
+            else self.DEFAULT_MAX_CONCURRENCY
+        self.throughput_level_duration = throughput_level_duration if throughput_level_duration \
+            else self.DEFAULT_LEVEL_DURATION
+        if self.throughput_max_concurrency < 1 or self.throughput_level_duration <= 0:
+            raise ValueError('The maximum concurrency and the duration of each level must be positive')
+
+    @classmethod
+    def get_cli_argument(cls):
+        return 'throughput'
+
+    @classmethod
+    def get_title(cls):
+        return 'Handshake Throughput'
+
+    @classmethod
+    def is_aggressive(cls):
+        return True
+
+
+class HandshakeThroughputPlugin(plugin_base.Plugin):
+    """Measure the handshake throughput of the server(s).
+    """
+
+    # Stop once doubling the concurrency increases the throughput by less than this ratio
+    PLATEAU_THRESHOLD = 0.05
+
+    # Stop once the ratio of handshakes that failed is above this
+    ERROR_RATE_THRESHOLD = 0.1
+
+    @classmethod
+    def get_available_commands(cls):
+        return [HandshakeThroughputScanCommand]
+
+    @classmethod
+    def get_cli_option_group(cls):
+        options = super(HandshakeThroughputPlugin, cls).get_cli_option_group()
+
+        # Add the special optional argument for this plugin's commands
+        # They must match the names in the commands' contructor
+        options.append(
+            optparse.make_option(
+                '--throughput_cipher',
+                help='Option - For --throughput, the OpenSSL cipher string to use for the handshakes, for example '
+                     '"ECDHE-RSA-AES128-GCM-SHA256".',
+                dest='throughput_cipher'
+            )
+        )
+        options.append(
+            optparse.make_option(
+                '--throughput_version',
+                help='Option - For --throughput, the SSL/TLS version to use for the handshakes, for example '
+                     '"tlsv1_2". Default is the highest version supported by the server(s).',
+                dest='throughput_ssl_version'
+            )
+        )
+        options.append(
+            optparse.make_option(
+                '--throughput_max_concurrency',
+                help='Option - For --throughput, the maximum number of concurrent handshakes. Default is 64.',
+                type='int',
+                dest='throughput_max_concurrency'
+            )
+        )
+        options.append(
+            optparse.make_option(
+                '--throughput_level_duration',
+                help='Option - For --throughput, how long to perform handshakes at each concurrency level, in '
+                     'seconds. Default is 5.',
+                type='float',
+                dest='throughput_level_duration'
+            )
+        )
+        return options
+
+    def process_task(self, server_info, scan_command):
+        # type: (ServerConnectivityInfo, HandshakeThroughputScanCommand) -> HandshakeThroughputScanResult
+        ssl_version = scan_command.throughput_ssl_version if scan_command.throughput_ssl_version is not None \
+            else server_info.highest_ssl_version_supported
+
+        # Make sure the server accepts the cipher and version before loading it; errors get propagated
+        ssl_connection = self._get_ssl_connection(server_info, ssl_version, scan_command.throughput_cipher)
+        try:
+            ssl_connection.connect()
+            cipher_name = ssl_connection.ssl_client.get_current_cipher_name()
+        finally:
+            ssl_connection.close()
+
+        concurrency_level_results = []  # type: List[ConcurrencyLevelResult]
+        stop_reason = 'Reached the maximum concurrency'
+        concurrency = 1
+        while concurrency <= scan_command.throughput_max_concurrency:
+            level_result = self._run_concurrency_level(server_info, ssl_version, scan_command.throughput_cipher,
+                                                       concurrency, scan_command.throughput_level_duration)
+            best_throughput = max([result.handshakes_per_second for result in concurrency_level_results] or [0])
+            concurrency_level_results.append(level_result)
+
+            if level_result.error_rate > self.ERROR_RATE_THRESHOLD:
+                stop_reason = 'Error rate above {:.0%}'.format(self.ERROR_RATE_THRESHOLD)
+                break
+            if best_throughput and level_result.handshakes_per_second < best_throughput * (1 + self.PLATEAU_THRESHOLD):
+                stop_reason = 'Throughput plateaued'
+                break
+            concurrency *= 2
+
+        return HandshakeThroughputScanResult(server_info, scan_command, ssl_version, cipher_name,
+                                             concurrency_level_results, stop_reason)
+
+    @staticmethod
+    def _get_ssl_connection(server_info, ssl_version, cipher):
+        # type: (ServerConnectivityInfo, OpenSslVersionEnum, Optional[Text]) -> SSLConnection
+        # Always override the SSL version so that these handshakes do not get recorded in the handshake facts cache
+        ssl_connection = server_info.get_preconfigured_ssl_connection(override_ssl_version=ssl_version)
+        if cipher:
+            ssl_connection.ssl_client.set_cipher_list(cipher)
+        return ssl_connection
+
+    def _run_concurrency_level(self, server_info, ssl_version, cipher, concurrency, duration):
+        # type: (ServerConnectivityInfo, OpenSslVersionEnum, Optional[Text], int, float) -> ConcurrencyLevelResult
+        """Perform handshakes using the supplied number of concurrent connections, for the supplied duration.
+        """
+        start_time = time.time()
+        deadline = start_time + duration
+        thread_pool = ThreadPool()
+        for _ in range(concurrency):
+            thread_pool.add_job((self._perform_handshakes_until, (server_info, ssl_version, cipher, deadline)))
+        thread_pool.start(nb_threads=concurrency)
+
+        successful_handshakes_nb = 0
+        errored_handshakes_nb = 0
+        error_messages = []  # type: List[Text]
+        for (_, (worker_successful_nb, worker_errors)) in thread_pool.get_result():
+            successful_handshakes_nb += worker_successful_nb
+            errored_handshakes_nb += len(worker_errors)
+            error_messages.extend(worker_errors)
+
+        for (_, exception) in thread_pool.get_error():
+            errored_handshakes_nb += 1
+            error_messages.append('{} - {}'.format(str(exception.__class__.__name__), str(exception)))
+
+        thread_pool.join()
+        return ConcurrencyLevelResult(concurrency, time.time() - start_time, successful_handshakes_nb,
+                                      errored_handshakes_nb, sorted(set(error_messages)))
+
+    def _perform_handshakes_until(self, server_info, ssl_version, cipher, deadline):
+        # type: (ServerConnectivityInfo, OpenSslVersionEnum, Optional[Text], float) -> Tuple[int, List[Text]]
+        successful_handshakes_nb = 0
+        error_messages = []
+        while time.time() < deadline:
+            ssl_connection = self._get_ssl_connection(server_info, ssl_version, cipher)
+            try:
+                # Do not retry on timeouts, as this would hide the server being overloaded
+                ssl_connection.connect(network_max_retries=1)
+                successful_handshakes_nb += 1
+            except Exception as e:
+                error_messages.append('{} - {}'.format(str(e.__class__.__name__), str(e)))
+            finally:
+                ssl_connection.close()
+        return successful_handshakes_nb, error_messages
+
+
+class ConcurrencyLevelResult(object):
+    """The throughput measured with a specific number of concurrent connections.
+
+    Attributes:
+        concurrency (int): The number of connections that were performing handshakes simultaneously.
+        duration (float): How long the handshakes were performed for, in seconds.
+        successful_handshakes_nb (int): The number of handshakes that were successful.
+        errored_handshakes_nb (int): The number of handshakes that failed.
+        handshakes_per_second (float): The number of successful handshakes per second.
+        error_rate (float): The ratio of handshakes that failed, between 0 and 1.
+        error_messages (List[Text]): The distinct errors that were triggered by the failed handshakes.
+    """
+
+    def __init__(self, concurrency, duration, successful_handshakes_nb, errored_handshakes_nb, error_messages):
+        # type: (int, float, int, int, List[Text]) -> None
+        self.concurrency = concurrency
+        self.duration = duration
+        self.successful_handshakes_nb = successful_handshakes_nb
+        self.errored_handshakes_nb = errored_handshakes_nb
+        self.error_messages = error_messages
+
+        self.handshakes_per_second = successful_handshakes_nb / duration if duration else 0.0
+        attempted_handshakes_nb = successful_handshakes_nb + errored_handshakes_nb
+        self.error_rate = errored_handshakes_nb / float(attempted_handshakes_nb) if attempted_handshakes_nb else 0.0
+
+
+class HandshakeThroughputScanResult(PluginScanResult):
+    """The result of running a HandshakeThroughputScanCommand on a specific server.
+
+    Attributes:
+        ssl_version (OpenSslVersionEnum): The SSL/TLS version used for the handshakes.
+        cipher_name (Text): The OpenSSL name of the cipher suite negotiated for the handshakes.
+        concurrency_level_results (List[ConcurrencyLevelResult]): The throughput measured at each concurrency level,
+            by increasing concurrency.
+        max_handshakes_per_second (float): The highest throughput that was measured.
+        stop_reason (Text): Why no higher concurrency level was tried.
+    """
+
+    def __init__(
+            self,
+            server_info,                    # type: ServerConnectivityInfo
+            scan_command,                   # type: HandshakeThroughputScanCommand
+            ssl_version,                    # type: OpenSslVersionEnum
+            cipher_name,                    # type: Text
+            concurrency_level_results,      # type: List[ConcurrencyLevelResult]
+            stop_reason                     # type: Text
+    ):
+        # type: (...) -> None
+        super(HandshakeThroughputScanResult, self).__init__(server_info, scan_command)
+        self.ssl_version = ssl_version
+        self.cipher_name = cipher_name
+        self.concurrency_level_results = concurrency_level_results
+        self.max_handshakes_per_second = max([result.handshakes_per_second for result in concurrency_level_results])
+        self.stop_reason = stop_reason
+
+    LEVEL_FORMAT = '{handshakes_per_second:.1f} handshakes/s ({successful} successful, {errors} errors, ' \
+                   '{error_rate:.1%} error rate)'
+
+    def as_text(self):
+        txt_result = [self._format_title(self.scan_command.get_title())]
+        txt_result.append(self._format_field('Version:', self.ssl_version.name))
+        txt_result.append(self._format_field('Cipher Suite:', self.cipher_name))
+        txt_result.append(self._format_field('Max Throughput:',
+                                             '{:.1f} handshakes/s'.format(self.max_handshakes_per_second)))
+        txt_result.append(self._format_field('Stopped Because:', self.stop_reason))
+
+        txt_result.extend(['', self._format_subtitle('Concurrency Levels')])
+        for level_result in self.concurrency_level_results:
+            txt_result.append(self._format_field(
+                '{} connections:'.format(level_result.concurrency),
+                self.LEVEL_FORMAT.format(handshakes_per_second=level_result.handshakes_per_second,
+                                         successful=level_result.successful_handshakes_nb,
+                                         errors=level_result.errored_handshakes_nb,
+                                         error_rate=level_result.error_rate)
+            ))
+            for error_message in level_result.error_messages:
+                txt_result.append(self._format_field('', 'ERROR: {}'.format(error_message)))
+        return txt_result
+
+    def as_xml(self):
+        xml_result = Element(self.scan_command.get_cli_argument(), title=self.scan_command.get_title(),
+                             sslVersion=self.ssl_version.name, cipherSuite=self.cipher_name,
+                             maxHandshakesPerSecond='{:.1f}'.format(self.max_handshakes_per_second),
+                             stopReason=self.stop_reason)
+        for level_result in self.concurrency_level_results:
+            level_xml = Element('concurrencyLevel', attrib={
+                'concurrency': str(level_result.concurrency),
+                'duration': '{:.3f}'.format(level_result.duration),
+                'successfulHandshakes': str(level_result.successful_handshakes_nb),
+                'erroredHandshakes': str(level_result.errored_handshakes_nb),
+                'handshakesPerSecond': '{:.1f}'.format(level_result.handshakes_per_second),
+            })
+            for error_message in level_result.error_messages:
+                error_xml = Element('error')
+                error_xml.text = error_message
+                level_xml.append(error_xml)
+            xml_result.append(level_xml)
+        return xml_result
@@ -2,20 +2,19 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
 
+import functools
 import socket
-import types
 from xml.etree.ElementTree import Element
 
-from nassl._nassl import WantReadError
-
 from sslyze.plugins import plugin_base
+from sslyze.plugins.openssl_cipher_suites_plugin import TLS_OPENSSL_TO_RFC_NAMES_MAPPING
 from sslyze.plugins.plugin_base import PluginScanResult, PluginScanCommand
 from sslyze.server_connectivity import ServerConnectivityInfo
+from sslyze.utils.tls_client_hello import ClientHelloCache, ClientHelloSpec
+from sslyze.utils.tls_record_stream_reader import TlsRecordStreamReader
 from tls_parser.alert_protocol import TlsAlertRecord
-from tls_parser.exceptions import NotEnoughData
 from tls_parser.handshake_protocol import TlsHandshakeRecord, TlsHandshakeTypeByte
 from tls_parser.heartbeat_protocol import TlsHeartbeatRequestRecord
-from tls_parser.parser import TlsRecordParser
 from tls_parser.record_protocol import TlsVersionEnum
 
 
@@ -42,11 +41,22 @@ def get_available_commands(cls):
 
     def process_task(self, server_info, scan_command):
         # type: (ServerConnectivityInfo, HeartbleedScanCommand) -> HeartbleedScanResult
+        # The Client Hello only depends on the server, so it is only built once when scanning the same server again
+        client_hello = ClientHelloCache.get_client_hello(ClientHelloSpec(
+            tls_version=TlsVersionEnum[server_info.highest_ssl_version_supported.name],
+            server_name=server_info.tls_server_name_indication,
+            # Offer the cipher suite that was accepted when testing connectivity first, and then all the other ones
+            cipher_suites=ClientHelloSpec.get_default_cipher_suites(
+                TLS_OPENSSL_TO_RFC_NAMES_MAPPING.get(server_info.ssl_cipher_supported)
+            ),
+            should_include_heartbeat=True,
+        ))
+
         ssl_connection = server_info.get_preconfigured_ssl_connection()
         # Replace nassl.sslClient.do_handshake() with a heartbleed checking SSL handshake so that all the SSLyze options
         # (startTLS, proxy, etc.) still work
-        ssl_connection.ssl_client.do_handshake = types.MethodType(do_handshake_with_heartbleed,
-                                                                  ssl_connection.ssl_client)
+        ssl_connection.ssl_client.do_handshake = functools.partial(do_handshake_with_heartbleed,
+                                                                   ssl_connection.ssl_client, client_hello)
 
         is_vulnerable_to_heartbleed = False
         try:
@@ -99,21 +109,11 @@ class NotVulnerableToHeartbleed(Exception):
     """
 
 
-def do_handshake_with_heartbleed(self):
+def do_handshake_with_heartbleed(self, client_hello):
     """Modified do_handshake() to send a heartbleed payload and return the result.
     """
-    try:
-        # Start the handshake using nassl - will throw WantReadError right away
-        self._ssl.do_handshake()
-    except WantReadError:
-        # Send the Client Hello
-        len_to_read = self._network_bio.pending()
-        while len_to_read:
-            # Get the data from the SSL engine
-            handshake_data_out = self._network_bio.read(len_to_read)
-            # Send it to the peer
-            self._sock.send(handshake_data_out)
-            len_to_read = self._network_bio.pending()
+    # Send the Client Hello directly instead of having OpenSSL generate it
+    self._sock.send(client_hello)
 
     # Build the heartbleed payload - based on
     # https://blog.mozilla.org/security/2014/04/12/testing-for-heartbleed-vulnerability-without-exploiting-the-server/
@@ -134,25 +134,17 @@ def do_handshake_with_heartbleed(self):
     # Retrieve data until we get to the ServerHelloDone
     # The server may send back a ServerHello, an Alert, a CertificateRequest or may just close the connection
     did_receive_hello_done = False
-    remaining_bytes = b''
+    record_reader = TlsRecordStreamReader(self._sock)
     while not did_receive_hello_done:
         try:
-            tls_record, len_consumed = TlsRecordParser.parse_bytes(remaining_bytes)
-            remaining_bytes = remaining_bytes[len_consumed::]
-        except NotEnoughData:
-            # Try to get more data
-            try:
-                raw_ssl_bytes = self._sock.recv(16381)
-            except socket.error:
-                # Server closed the connection as soon as it received the Heartbleed payload
-                raise NotVulnerableToHeartbleed()
-
-            if not raw_ssl_bytes:
-                # No data?
-                raise NotVulnerableToHeartbleed()
+            tls_record = record_reader.read_record()
+        except socket.error:
+            # Server closed the connection as soon as it received the Heartbleed payload
+            raise NotVulnerableToHeartbleed()
 
-            remaining_bytes = remaining_bytes + raw_ssl_bytes
-            continue
+        if tls_record is None:
+            # No data?
+            raise NotVulnerableToHeartbleed()
 
         if isinstance(tls_record, TlsHandshakeRecord):
             # Does the record contain a ServerDone message?
@@ -170,17 +162,17 @@ def do_handshake_with_heartbleed(self):
     is_vulnerable_to_heartbleed = False
     if did_receive_hello_done:
         expected_heartbleed_payload = b'\x01' * 10
-        if expected_heartbleed_payload in remaining_bytes:
+        if expected_heartbleed_payload in record_reader.pending_bytes:
             # Server replied with our hearbeat payload
             is_vulnerable_to_heartbleed = True
         else:
             try:
-                raw_ssl_bytes = self._sock.recv(16381)
+                record_reader.recv_more()
             except socket.error:
                 # Server closed the connection after receiving the heartbleed payload
                 raise NotVulnerableToHeartbleed()
 
-            if expected_heartbleed_payload in raw_ssl_bytes:
+            if expected_heartbleed_payload in record_reader.pending_bytes:
                 # Server replied with our hearbeat payload
                 is_vulnerable_to_heartbleed = True
 
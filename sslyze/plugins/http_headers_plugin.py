@@ -5,10 +5,10 @@
 from xml.etree.ElementTree import Element
 
 import cryptography
-from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives.serialization import Encoding
 
 from sslyze.plugins import plugin_base
+from sslyze.plugins.utils.certificate_parse_cache import CertificateParseCache
 from sslyze.plugins.utils.certificate_utils import CertificateUtils
 from sslyze.plugins.utils.trust_store.trust_store import CouldNotBuildVerifiedChainError
 from sslyze.plugins.utils.trust_store.trust_store_repository import TrustStoresRepository
@@ -59,15 +59,15 @@ def _get_security_headers(cls, server_info):
 
         # Perform the SSL handshake
         ssl_connection = server_info.get_preconfigured_ssl_connection()
-        ssl_connection.connect()
-        certificate_chain = [
-            cryptography.x509.load_pem_x509_certificate(x509_cert.as_pem().encode('ascii'), backend=default_backend())
-            for x509_cert in ssl_connection.ssl_client.get_peer_cert_chain()
-        ]
-        # Send an HTTP GET request to the server
-        ssl_connection.write(HttpRequestGenerator.get_request(host=server_info.hostname))
-        http_resp = HttpResponseParser.parse(ssl_connection)
-        ssl_connection.close()
+        try:
+            ssl_connection.connect()
+            certificate_chain = [CertificateParseCache.get_certificate_from_pem(x509_cert.as_pem())
+                                 for x509_cert in ssl_connection.ssl_client.get_peer_cert_chain()]
+            # Send an HTTP GET request to the server
+            ssl_connection.write(HttpRequestGenerator.get_request(host=server_info.hostname))
+            http_resp = HttpResponseParser.parse(ssl_connection)
+        finally:
+            ssl_connection.close()
 
         if http_resp.version == 9:
             # HTTP 0.9 => Probably not an HTTP response
@@ -234,7 +234,7 @@ def __getstate__(self):
     def __setstate__(self, state):
         self.__dict__.update(state)
         # Manually restore non-pickable entries
-        verified_chain = [cryptography.x509.load_pem_x509_certificate(cert_pem, default_backend())
+        verified_chain = [CertificateParseCache.get_certificate_from_pem(cert_pem)
                           for cert_pem in self.__dict__['verified_certificate_chain']]
         self.__dict__['verified_certificate_chain'] = verified_chain
 
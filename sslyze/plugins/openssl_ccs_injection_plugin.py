@@ -2,20 +2,20 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
 
+import functools
 import socket
-import types
 from xml.etree.ElementTree import Element
 
-from nassl._nassl import WantReadError
 from sslyze.plugins import plugin_base
+from sslyze.plugins.openssl_cipher_suites_plugin import TLS_OPENSSL_TO_RFC_NAMES_MAPPING
 from sslyze.plugins.plugin_base import PluginScanResult
 from sslyze.server_connectivity import ServerConnectivityInfo
+from sslyze.utils.tls_client_hello import ClientHelloCache, ClientHelloSpec
+from sslyze.utils.tls_record_stream_reader import TlsRecordStreamReader
 from tls_parser.alert_protocol import TlsAlertRecord
 from tls_parser.application_data_protocol import TlsApplicationDataRecord
 from tls_parser.change_cipher_spec_protocol import TlsChangeCipherSpecRecord
-from tls_parser.exceptions import NotEnoughData
 from tls_parser.handshake_protocol import TlsHandshakeRecord, TlsHandshakeTypeByte
-from tls_parser.parser import TlsRecordParser
 from tls_parser.tls_version import TlsVersionEnum
 
 
@@ -42,11 +42,21 @@ def get_available_commands(cls):
 
     def process_task(self, server_info, scan_command):
         # type: (ServerConnectivityInfo, OpenSslCcsInjectionScanCommand) -> OpenSslCcsInjectionScanResult
+        # The Client Hello only depends on the server, so it is only built once when scanning the same server again
+        client_hello = ClientHelloCache.get_client_hello(ClientHelloSpec(
+            tls_version=TlsVersionEnum[server_info.highest_ssl_version_supported.name],
+            server_name=server_info.tls_server_name_indication,
+            # Offer the cipher suite that was accepted when testing connectivity first, and then all the other ones
+            cipher_suites=ClientHelloSpec.get_default_cipher_suites(
+                TLS_OPENSSL_TO_RFC_NAMES_MAPPING.get(server_info.ssl_cipher_supported)
+            ),
+        ))
+
         ssl_connection = server_info.get_preconfigured_ssl_connection()
         # Replace nassl.sslClient.do_handshake() with a CCS checking SSL handshake so that all the SSLyze options
         # (startTLS, proxy, etc.) still work
-        ssl_connection.ssl_client.do_handshake = types.MethodType(do_handshake_with_ccs_injection,
-                                                                  ssl_connection.ssl_client)
+        ssl_connection.ssl_client.do_handshake = functools.partial(do_handshake_with_ccs_injection,
+                                                                   ssl_connection.ssl_client, client_hello)
 
         is_vulnerable = False
         try:
@@ -74,40 +84,22 @@ class NotVulnerableToCcsInjection(Exception):
     """
 
 
-def do_handshake_with_ccs_injection(self):
+def do_handshake_with_ccs_injection(self, client_hello):
     """Modified do_handshake() to send a CCS injection payload and return the result.
     """
-    try:
-        # Start the handshake using nassl - will throw WantReadError right away
-        self._ssl.do_handshake()
-    except WantReadError:
-        # Send the Client Hello
-        len_to_read = self._network_bio.pending()
-        while len_to_read:
-            # Get the data from the SSL engine
-            handshake_data_out = self._network_bio.read(len_to_read)
-            # Send it to the peer
-            self._sock.send(handshake_data_out)
-            len_to_read = self._network_bio.pending()
+    # Send the Client Hello directly instead of having OpenSSL generate it
+    self._sock.send(client_hello)
 
     # Retrieve the server's response - directly read the underlying network socket
     # Retrieve data until we get to the ServerHelloDone
     # The server may send back a ServerHello, an Alert or a CertificateRequest first
     did_receive_hello_done = False
-    remaining_bytes = b''
+    record_reader = TlsRecordStreamReader(self._sock)
     while not did_receive_hello_done:
-        try:
-            tls_record, len_consumed = TlsRecordParser.parse_bytes(remaining_bytes)
-            remaining_bytes = remaining_bytes[len_consumed::]
-        except NotEnoughData:
-            # Try to get more data
-            raw_ssl_bytes = self._sock.recv(16381)
-            if not raw_ssl_bytes:
-                # No data?
-                break
-
-            remaining_bytes = remaining_bytes + raw_ssl_bytes
-            continue
+        tls_record = record_reader.read_record()
+        if tls_record is None:
+            # No data?
+            break
 
         if isinstance(tls_record, TlsHandshakeRecord):
             # Does the record contain a ServerDone message?
@@ -136,21 +128,14 @@ def do_handshake_with_ccs_injection(self):
         # Check if an alert was sent back
         while True:
             try:
-                tls_record, len_consumed = TlsRecordParser.parse_bytes(remaining_bytes)
-                remaining_bytes = remaining_bytes[len_consumed::]
-            except NotEnoughData:
-                # Try to get more data
-                try:
-                    raw_ssl_bytes = self._sock.recv(16381)
-                    if not raw_ssl_bytes:
-                        # No data?
-                        raise NotVulnerableToCcsInjection()
-                except socket.error:
-                    # Server closed the connection after receiving the CCS payload
-                    raise NotVulnerableToCcsInjection()
-
-                remaining_bytes = remaining_bytes + raw_ssl_bytes
-                continue
+                tls_record = record_reader.read_record()
+            except socket.error:
+                # Server closed the connection after receiving the CCS payload
+                raise NotVulnerableToCcsInjection()
+
+            if tls_record is None:
+                # No data?
+                raise NotVulnerableToCcsInjection()
 
             if isinstance(tls_record, TlsAlertRecord):
                 # Server returned a TLS alert but which one?
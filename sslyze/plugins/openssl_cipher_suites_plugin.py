@@ -12,6 +12,7 @@
 from sslyze.plugins.plugin_base import Plugin, PluginScanCommand
 from sslyze.plugins.plugin_base import PluginScanResult
 from sslyze.server_connectivity import ServerConnectivityInfo
+from sslyze.utils.handshake_facts_cache import HandshakeFactsCache
 from sslyze.utils.python_compatibility import IS_PYTHON_2
 from sslyze.utils.ssl_connection import SSLConnection
 from sslyze.utils.ssl_connection import SSLHandshakeRejected
@@ -195,6 +196,11 @@ def process_task(self, server_connectivity_info, scan_command):
 
         thread_pool.join()
 
+        # Share whether the version is supported with the other plugins; errors make it unknown if nothing was accepted
+        if accepted_cipher_list or not errored_cipher_list:
+            HandshakeFactsCache.record_ssl_version_support(server_connectivity_info, ssl_version,
+                                                           bool(accepted_cipher_list))
+
         # Test for the cipher suite preference
         preferred_cipher = self._get_preferred_cipher_suite(server_connectivity_info, ssl_version, accepted_cipher_list)
 
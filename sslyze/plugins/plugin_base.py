@@ -112,9 +112,16 @@ class PluginScanResult(object):
     Attributes:
         server_info (ServerConnectivityInfo):  The server against which the command was run.
         scan_command (PluginScanCommand): The scan command that was run against the server.
+        connection_traces (Optional[List[ConnectionTrace]]): The timing of each connection opened to run the scan
+            command, if connection tracing was enabled in the scanner.
+        connection_traces_summary (Optional[ConnectionTracesSummary]): The time spent in each phase, the retries and
+            the traffic of all these connections, if connection tracing was enabled in the scanner.
     """
     __metaclass__ = abc.ABCMeta
 
+    connection_traces = None
+    connection_traces_summary = None
+
     def __init__(self, server_info, scan_command):
         # type: (ServerConnectivityInfo, PluginScanCommand) -> None
         self.server_info = server_info
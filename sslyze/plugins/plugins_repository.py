@@ -5,6 +5,7 @@
 from sslyze.plugins.certificate_info_plugin import CertificateInfoPlugin
 from sslyze.plugins.compression_plugin import CompressionPlugin
 from sslyze.plugins.fallback_scsv_plugin import FallbackScsvPlugin
+from sslyze.plugins.handshake_throughput_plugin import HandshakeThroughputPlugin
 from sslyze.plugins.heartbleed_plugin import HeartbleedPlugin
 from sslyze.plugins.http_headers_plugin import HttpHeadersPlugin
 from sslyze.plugins.openssl_ccs_injection_plugin import OpenSslCcsInjectionPlugin
@@ -14,6 +15,7 @@
 
 from sslyze.plugins.session_renegotiation_plugin import SessionRenegotiationPlugin
 from sslyze.plugins.session_resumption_plugin import SessionResumptionPlugin
+from sslyze.plugins.vulnerability_sweep_plugin import VulnerabilitySweepPlugin
 from typing import List
 from typing import Type
 
@@ -24,7 +26,7 @@ class PluginsRepository(object):
 
     _PLUGIN_CLASSES = [OpenSslCipherSuitesPlugin, CertificateInfoPlugin, CompressionPlugin, FallbackScsvPlugin,
                        HeartbleedPlugin, HttpHeadersPlugin, OpenSslCcsInjectionPlugin, SessionRenegotiationPlugin,
-                       SessionResumptionPlugin]
+                       SessionResumptionPlugin, HandshakeThroughputPlugin, VulnerabilitySweepPlugin]
 
     def __init__(self, plugin_classes=_PLUGIN_CLASSES):
         # type: (List[Type[Plugin]]) -> None
@@ -2,7 +2,9 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
 
+import optparse
 import socket
+import time
 from xml.etree.ElementTree import Element
 
 from nassl._nassl import OpenSSLError
@@ -10,12 +12,31 @@
 from sslyze.plugins import plugin_base
 from sslyze.plugins.plugin_base import PluginScanResult
 from sslyze.server_connectivity import ServerConnectivityInfo
+from sslyze.utils.ssl_connection import SSLConnection
+from typing import List
+from typing import Optional
+from typing import Text
+from typing import Tuple
 
 
 class SessionRenegotiationScanCommand(plugin_base.PluginScanCommand):
     """Test the server(s) for client-initiated renegotiation and secure renegotiation support.
     """
 
+    def __init__(self, reneg_max_attempts=None):
+        # type: (Optional[int]) -> None
+        """
+
+        Args:
+            reneg_max_attempts (int): If set and the server honors client-initiated renegotiations, keep renegotiating
+                on the same connection until the server stops accepting it or this number of renegotiations is
+                reached, and measure the duration of each renegotiation.
+        """
+        super(SessionRenegotiationScanCommand, self).__init__()
+        self.reneg_max_attempts = reneg_max_attempts
+        if self.reneg_max_attempts is not None and self.reneg_max_attempts < 1:
+            raise ValueError('The maximum number of renegotiations must be positive')
+
     @classmethod
     def get_cli_argument(cls):
         return 'reneg'
@@ -33,80 +54,109 @@ class SessionRenegotiationPlugin(plugin_base.Plugin):
     def get_available_commands(cls):
         return [SessionRenegotiationScanCommand]
 
+    @classmethod
+    def get_cli_option_group(cls):
+        options = super(SessionRenegotiationPlugin, cls).get_cli_option_group()
+
+        # Add the special optional argument for this plugin's commands
+        # They must match the names in the commands' contructor
+        options.append(
+            optparse.make_option(
+                '--reneg_max_attempts',
+                help='Option - For --reneg, measures how many client-initiated renegotiations the server(s) tolerate '
+                     'on a single connection, up to the supplied number, and how long each renegotiation takes.',
+                type='int',
+                dest='reneg_max_attempts'
+            )
+        )
+        return options
 
     def process_task(self, server_info, scan_command):
         # type: (ServerConnectivityInfo, SessionRenegotiationScanCommand) -> SessionRenegotiationScanResult
-        accepts_client_renegotiation = self._test_client_renegotiation(server_info)
-        supports_secure_renegotiation = self._test_secure_renegotiation(server_info)
-        return SessionRenegotiationScanResult(server_info, scan_command, accepts_client_renegotiation,
-                                              supports_secure_renegotiation)
-
-
-    @staticmethod
-    def _test_secure_renegotiation(server_info):
-        """Check whether the server supports secure renegotiation.
-        """
+        # Both facts are retrieved using a single connection; as it uses the default settings and the legacy client, the
+        # handshake also gets recorded in the HandshakeFactsCache for the compression plugin
         ssl_connection = server_info.get_preconfigured_ssl_connection(should_use_legacy_openssl=True)
 
+        renegotiation_durations = []  # type: List[float]
         try:
             # Perform the SSL handshake
             ssl_connection.connect()
             supports_secure_renegotiation = ssl_connection.ssl_client.get_secure_renegotiation_support()
 
+            # Let's try to renegotiate
+            accepts_client_renegotiation, first_duration = self._test_client_renegotiation(ssl_connection)
+            if accepts_client_renegotiation and scan_command.reneg_max_attempts:
+                # Then keep renegotiating on the same connection
+                renegotiation_durations.append(first_duration)
+                renegotiation_durations.extend(
+                    self._measure_renegotiation_tolerance(ssl_connection, scan_command.reneg_max_attempts - 1)
+                )
         finally:
             ssl_connection.close()
 
-        return supports_secure_renegotiation
-
+        return SessionRenegotiationScanResult(server_info, scan_command, accepts_client_renegotiation,
+                                              supports_secure_renegotiation, renegotiation_durations)
 
     @staticmethod
-    def _test_client_renegotiation(server_info):
-        """Check whether the server honors session renegotiation requests.
+    def _renegotiate(ssl_connection):
+        # type: (SSLConnection) -> float
+        """Perform a client-initiated renegotiation and return how long it took, in seconds.
         """
-        ssl_connection = server_info.get_preconfigured_ssl_connection(should_use_legacy_openssl=True)
+        start_time = time.time()
+        ssl_connection.ssl_client.do_renegotiate()
+        return time.time() - start_time
 
+    @classmethod
+    def _test_client_renegotiation(cls, ssl_connection):
+        # type: (SSLConnection) -> Tuple[bool, Optional[float]]
+        """Check whether the server honors session renegotiation requests, and return how long the renegotiation took.
+        """
         try:
-            # Perform the SSL handshake
-            ssl_connection.connect()
+            return True, cls._renegotiate(ssl_connection)
+
+        # Errors caused by a server rejecting the renegotiation
+        except socket.timeout:
+            # This is how Netty rejects a renegotiation - https://github.com/nabla-c0d3/sslyze/issues/114
+            return False, None
+        except socket.error as e:
+            if 'connection was forcibly closed' in str(e.args):
+                return False, None
+            elif 'reset by peer' in str(e.args):
+                return False, None
+            else:
+                raise
+        except OpenSSLError as e:
+            if 'handshake failure' in str(e.args):
+                return False, None
+            elif 'no renegotiation' in str(e.args):
+                return False, None
+            elif 'tlsv1 unrecognized name' in str(e.args):
+                # Yahoo's very own way of rejecting a renegotiation
+                return False, None
+            else:
+                raise
+
+        # Should be last as socket errors are also IOError
+        except IOError as e:
+            if 'Nassl SSL handshake failed' in str(e.args):
+                return False, None
+            else:
+                raise
 
+    @classmethod
+    def _measure_renegotiation_tolerance(cls, ssl_connection, max_attempts):
+        # type: (SSLConnection, int) -> List[float]
+        """Keep renegotiating on a connection until the server stops accepting it or the maximum number of attempts is
+        reached, and return the duration of each successful renegotiation.
+        """
+        renegotiation_durations = []
+        for _ in range(max_attempts):
             try:
-                # Let's try to renegotiate
-                ssl_connection.ssl_client.do_renegotiate()
-                accepts_client_renegotiation = True
-
-            # Errors caused by a server rejecting the renegotiation
-            except socket.timeout:
-                # This is how Netty rejects a renegotiation - https://github.com/nabla-c0d3/sslyze/issues/114
-                    accepts_client_renegotiation = False
-            except socket.error as e:
-                if 'connection was forcibly closed' in str(e.args):
-                    accepts_client_renegotiation = False
-                elif 'reset by peer' in str(e.args):
-                    accepts_client_renegotiation = False
-                else:
-                    raise
-            except OpenSSLError as e:
-                if 'handshake failure' in str(e.args):
-                    accepts_client_renegotiation = False
-                elif 'no renegotiation' in str(e.args):
-                    accepts_client_renegotiation = False
-                elif 'tlsv1 unrecognized name' in str(e.args):
-                    # Yahoo's very own way of rejecting a renegotiation
-                    accepts_client_renegotiation = False
-                else:
-                    raise
-
-            # Should be last as socket errors are also IOError
-            except IOError as e:
-                if 'Nassl SSL handshake failed' in str(e.args):
-                    accepts_client_renegotiation = False
-                else:
-                    raise
-
-        finally:
-            ssl_connection.close()
-
-        return accepts_client_renegotiation
+                renegotiation_durations.append(cls._renegotiate(ssl_connection))
+            except (OpenSSLError, IOError):
+                # Whatever the error is, the server is no longer renegotiating on this connection
+                break
+        return renegotiation_durations
 
 
 class SessionRenegotiationScanResult(PluginScanResult):
@@ -115,13 +165,33 @@ class SessionRenegotiationScanResult(PluginScanResult):
     Attributes:
         accepts_client_renegotiation (bool): True if the server honors client-initiated renegotiation attempts.
         supports_secure_renegotiation (bool): True if the server supports secure renegotiation.
+        renegotiation_durations (List[float]): With --reneg_max_attempts, the duration in seconds of each
+            client-initiated renegotiation the server accepted on a single connection. Empty otherwise.
+        tolerated_renegotiations_nb (Optional[int]): With --reneg_max_attempts, how many client-initiated renegotiations
+            the server accepted on a single connection. None otherwise.
     """
 
-    def __init__(self, server_info, scan_command, accepts_client_renegotiation, supports_secure_renegotiation):
-        # type: (ServerConnectivityInfo, SessionRenegotiationScanCommand, bool, bool) -> None
+    def __init__(self, server_info, scan_command, accepts_client_renegotiation, supports_secure_renegotiation,
+                 renegotiation_durations=None):
+        # type: (ServerConnectivityInfo, SessionRenegotiationScanCommand, bool, bool, Optional[List[float]]) -> None
         super(SessionRenegotiationScanResult, self).__init__(server_info, scan_command)
         self.accepts_client_renegotiation = accepts_client_renegotiation
         self.supports_secure_renegotiation = supports_secure_renegotiation
+        self.renegotiation_durations = renegotiation_durations if renegotiation_durations else []
+        self.tolerated_renegotiations_nb = None  # type: Optional[int]
+        if scan_command.reneg_max_attempts:
+            self.tolerated_renegotiations_nb = len(self.renegotiation_durations)
+
+    def _format_renegotiation_tolerance(self):
+        # type: () -> Text
+        tolerance_txt = '{} renegotiations'.format(self.tolerated_renegotiations_nb)
+        if self.tolerated_renegotiations_nb == self.scan_command.reneg_max_attempts:
+            tolerance_txt += ' (maximum tested)'
+        if self.renegotiation_durations:
+            average_duration = sum(self.renegotiation_durations) / len(self.renegotiation_durations)
+            tolerance_txt += ', {:.0f} ms on average, {:.0f} ms max'.format(average_duration * 1000,
+                                                                             max(self.renegotiation_durations) * 1000)
+        return tolerance_txt
 
 
     def as_text(self):
@@ -139,6 +209,10 @@ def as_text(self):
             else 'VULNERABLE - Secure renegotiation not supported'
         result_txt.append(self._format_field('Secure Renegotiation:', secure_txt))
 
+        if self.tolerated_renegotiations_nb is not None:
+            result_txt.append(self._format_field('Renegotiations per Connection:',
+                                                 self._format_renegotiation_tolerance()))
+
         return result_txt
 
 
@@ -147,4 +221,13 @@ def as_xml(self):
         result_xml.append(Element('sessionRenegotiation',
                                   attrib={'canBeClientInitiated': str(self.accepts_client_renegotiation),
                                           'isSecure': str(self.supports_secure_renegotiation)}))
+
+        if self.tolerated_renegotiations_nb is not None:
+            tolerance_xml = Element('renegotiationTolerance',
+                                    attrib={'maxAttempts': str(self.scan_command.reneg_max_attempts),
+                                            'toleratedRenegotiations': str(self.tolerated_renegotiations_nb)})
+            for duration in self.renegotiation_durations:
+                duration_xml = Element('renegotiation', attrib={'duration': str(duration)})
+                tolerance_xml.append(duration_xml)
+            result_xml.append(tolerance_xml)
         return result_xml
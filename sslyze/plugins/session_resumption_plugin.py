@@ -2,6 +2,8 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
 
+import math
+import optparse
 from xml.etree.ElementTree import Element
 import nassl
 from enum import Enum
@@ -9,11 +11,15 @@
 from sslyze.plugins import plugin_base
 from sslyze.plugins.plugin_base import PluginScanResult
 from sslyze.server_connectivity import ServerConnectivityInfo
+from sslyze.utils.connection_trace import ConnectionPhaseEnum
+from sslyze.utils.ssl_session_info import SslSessionInfo
 from sslyze.utils.thread_pool import ThreadPool
+from typing import Callable
 from typing import List
 from typing import Optional
 from typing import Text
 from typing import Tuple
+from typing import Union
 
 
 class SessionResumptionSupportScanCommand(plugin_base.PluginScanCommand):
@@ -33,6 +39,26 @@ class SessionResumptionRateScanCommand(plugin_base.PluginScanCommand):
     """Perform 100 session ID resumptions with the server(s), in order to estimate the rate for successful resumptions.
     """
 
+    def __init__(self, seed_sessions_nb=None, ticket_resumptions_nb=None):
+        # type: (Optional[int], Optional[int]) -> None
+        """
+
+        Args:
+            seed_sessions_nb (int): If set, only establish this number of sessions with the server, and then try to
+                resume them for all the resumption attempts, instead of establishing a new session for each attempt.
+                This halves the number of handshakes, and shows whether the server's session cache is shared across
+                its backends.
+            ticket_resumptions_nb (int): If set, also perform this number of TLS ticket resumptions, in order to find
+                out how many different ticket keys are used by the server's backends.
+        """
+        super(SessionResumptionRateScanCommand, self).__init__()
+        if seed_sessions_nb is not None and seed_sessions_nb < 1:
+            raise ValueError('Invalid number of seed sessions: {}'.format(seed_sessions_nb))
+        if ticket_resumptions_nb is not None and ticket_resumptions_nb < 1:
+            raise ValueError('Invalid number of TLS ticket resumptions: {}'.format(ticket_resumptions_nb))
+        self.seed_sessions_nb = seed_sessions_nb
+        self.ticket_resumptions_nb = ticket_resumptions_nb
+
     @classmethod
     def get_cli_argument(cls):
         return 'resum_rate'
@@ -46,6 +72,48 @@ def is_aggressive(cls):
         return True
 
 
+class HandshakeLatencyScanCommand(plugin_base.PluginScanCommand):
+    """Measure the latency of full handshakes, session ID resumptions and TLS ticket resumptions with the server(s), in
+    order to find out whether session resumption actually makes handshakes faster.
+    """
+
+    DEFAULT_HANDSHAKES_NB = 20
+    DEFAULT_CONCURRENCY = 5
+
+    def __init__(self, latency_handshakes_nb=None, latency_concurrency=None):
+        # type: (Optional[int], Optional[int]) -> None
+        """
+
+        Args:
+            latency_handshakes_nb (int): The number of handshakes to perform for each kind of handshake (full, session
+                ID resumption and TLS ticket resumption); 20 by default.
+            latency_concurrency (int): The number of handshakes to perform simultaneously; 5 by default.
+        """
+        super(HandshakeLatencyScanCommand, self).__init__()
+        self.latency_handshakes_nb = latency_handshakes_nb if latency_handshakes_nb else self.DEFAULT_HANDSHAKES_NB
+        self.latency_concurrency = latency_concurrency if latency_concurrency else self.DEFAULT_CONCURRENCY
+        if self.latency_handshakes_nb < 1 or self.latency_concurrency < 1:
+            raise ValueError('The number of handshakes and the concurrency must be positive')
+
+    @classmethod
+    def get_cli_argument(cls):
+        return 'resum_latency'
+
+    @classmethod
+    def get_title(cls):
+        return 'Handshake Latency'
+
+    @classmethod
+    def is_aggressive(cls):
+        return True
+
+
+class HandshakeTypeEnum(Enum):
+    FULL_HANDSHAKE = 1
+    SESSION_ID_RESUMPTION = 2
+    TLS_TICKET_RESUMPTION = 3
+
+
 class TslSessionTicketSupportEnum(Enum):
     SUCCEEDED = 1
     FAILED_TICKET_NOT_ASSIGNED = 2
@@ -60,21 +128,65 @@ class SessionResumptionPlugin(plugin_base.Plugin):
 
     @classmethod
     def get_available_commands(cls):
-        return [SessionResumptionSupportScanCommand, SessionResumptionRateScanCommand]
+        return [SessionResumptionSupportScanCommand, SessionResumptionRateScanCommand, HandshakeLatencyScanCommand]
 
+    @classmethod
+    def get_cli_option_group(cls):
+        options = super(SessionResumptionPlugin, cls).get_cli_option_group()
+
+        # Add the special optional argument for this plugin's commands
+        # They must match the names in the commands' contructor
+        options.append(
+            optparse.make_option(
+                '--resum_rate_seeds',
+                help='Option - For --resum_rate, only establish the specified number of sessions with the server(s) '
+                     'and then perform all the resumption attempts with these sessions, reporting the resumption rate '
+                     'for each of them.',
+                type='int',
+                dest='seed_sessions_nb'
+            )
+        )
+        options.append(
+            optparse.make_option(
+                '--resum_rate_tickets',
+                help='Option - For --resum_rate, also perform the specified number of TLS ticket resumptions with the '
+                     'server(s), in order to find out how many different ticket keys are used by their backends.',
+                type='int',
+                dest='ticket_resumptions_nb'
+            )
+        )
+        options.append(
+            optparse.make_option(
+                '--resum_latency_handshakes',
+                help='Option - For --resum_latency, the number of handshakes to perform for each kind of handshake '
+                     '(full, session ID resumption and TLS ticket resumption). Default is 20.',
+                type='int',
+                dest='latency_handshakes_nb'
+            )
+        )
+        options.append(
+            optparse.make_option(
+                '--resum_latency_concurrency',
+                help='Option - For --resum_latency, the number of handshakes to perform simultaneously. Default is 5.',
+                type='int',
+                dest='latency_concurrency'
+            )
+        )
+        return options
 
     def process_task(self, server_info, scan_command):
         # type: (ServerConnectivityInfo, plugin_base.PluginScanCommand) -> PluginScanResult
         if scan_command.__class__ == SessionResumptionSupportScanCommand:
             # Test Session ID support
-            successful_resumptions_nb, errored_resumptions_list = self._test_session_resumption_rate(server_info, 5)
+            successful_resumptions_nb, errored_resumptions_list, _ = self._test_session_resumption_rate(server_info, 5)
 
             # Test TLS tickets support
             ticket_exception = None
             ticket_reason = None
             ticket_supported = False
+            ticket_sessions = []
             try:
-                ticket_result = self._resume_with_session_ticket(server_info)
+                ticket_result, ticket_sessions = self._resume_with_session_ticket(server_info)
                 if ticket_result == TslSessionTicketSupportEnum.SUCCEEDED:
                     ticket_supported = True
                 else:
@@ -84,14 +196,48 @@ def process_task(self, server_info, scan_command):
             except Exception as e:
                 ticket_exception = e
 
+            # Keep the details of the TLS tickets that were assigned by the server
+            ticket_lifetime_hint = None
+            ticket_key_names = []
+            for ticket_session in ticket_sessions:
+                if ticket_session.tls_ticket_lifetime_hint is not None and ticket_lifetime_hint is None:
+                    ticket_lifetime_hint = ticket_session.tls_ticket_lifetime_hint
+                key_name = ticket_session.tls_ticket_key_name
+                if key_name and key_name not in ticket_key_names:
+                    ticket_key_names.append(key_name)
+
             result = SessionResumptionSupportScanResult(server_info, scan_command, 5, successful_resumptions_nb,
                                                         errored_resumptions_list, ticket_supported, ticket_reason,
-                                                        ticket_exception)
+                                                        ticket_exception, ticket_lifetime_hint, ticket_key_names)
 
         elif scan_command.__class__ == SessionResumptionRateScanCommand:
-            successful_resumptions_nb, errored_resumptions_list = self._test_session_resumption_rate(server_info, 100)
+            if scan_command.seed_sessions_nb:
+                seed_session_results, resumption_attempts = self._test_session_resumption_rate_with_seed_sessions(
+                    server_info, scan_command.seed_sessions_nb, 100
+                )
+                successful_resumptions_nb = sum([seed_result.successful_resumptions_nb
+                                                 for seed_result in seed_session_results])
+                errored_resumptions_list = [error_msg for seed_result in seed_session_results
+                                            for error_msg in seed_result.errored_resumptions_list]
+            else:
+                seed_session_results = []
+                successful_resumptions_nb, errored_resumptions_list, resumption_attempts = \
+                    self._test_session_resumption_rate(server_info, 100)
+
+            ticket_errors_list = []
+            if scan_command.ticket_resumptions_nb:
+                _, ticket_errors_list, ticket_attempts = self._run_resumption_attempts(
+                    self._attempt_ticket_resumption, (server_info,), scan_command.ticket_resumptions_nb
+                )
+                resumption_attempts.extend(ticket_attempts)
+
             result = SessionResumptionRateScanResult(server_info, scan_command, 100, successful_resumptions_nb,
-                                                     errored_resumptions_list)
+                                                     errored_resumptions_list, seed_session_results,
+                                                     resumption_attempts, ticket_errors_list)
+
+        elif scan_command.__class__ == HandshakeLatencyScanCommand:
+            result = self._test_handshake_latency(server_info, scan_command)
+
         else:
             raise ValueError('PluginSessionResumption: Unknown command.')
 
@@ -99,20 +245,29 @@ def process_task(self, server_info, scan_command):
 
 
     def _test_session_resumption_rate(self, server_info, resumption_attempts_nb):
-        # type: (ServerConnectivityInfo, int) -> Tuple[int, List[Text]]
+        # type: (ServerConnectivityInfo, int) -> Tuple[int, List[Text], List[ResumptionAttempt]]
         """Attempt several session ID resumption with the server.
         """
+        return self._run_resumption_attempts(self._resume_with_session_id, (server_info, ), resumption_attempts_nb)
+
+    def _run_resumption_attempts(self, attempt_function, attempt_args, resumption_attempts_nb):
+        # type: (Callable[..., ResumptionAttempt], Tuple, int) -> Tuple[int, List[Text], List[ResumptionAttempt]]
+        """Call the attempt function several times in parallel and return the number of successful resumptions, the
+        errors, and the details of each attempt.
+        """
         thread_pool = ThreadPool()
 
         for _ in range(resumption_attempts_nb):
-            thread_pool.add_job((self._resume_with_session_id, (server_info, )))
+            thread_pool.add_job((attempt_function, attempt_args))
         thread_pool.start(nb_threads=min(resumption_attempts_nb, self.MAX_THREADS_NB))
 
         # Count successful/failed resumptions
         successful_resumptions_nb = 0
+        resumption_attempts = []
         for completed_job in thread_pool.get_result():
-            (job, was_resumption_successful) = completed_job
-            if was_resumption_successful:
+            (job, resumption_attempt) = completed_job
+            resumption_attempts.append(resumption_attempt)
+            if resumption_attempt.was_resumed:
                 successful_resumptions_nb += 1
 
         # Count errors and store error messages
@@ -123,93 +278,210 @@ def _test_session_resumption_rate(self, server_info, resumption_attempts_nb):
             errored_resumptions_list.append(error_msg)
 
         thread_pool.join()
-        return successful_resumptions_nb, errored_resumptions_list
+        return successful_resumptions_nb, errored_resumptions_list, resumption_attempts
+
+
+    def _test_session_resumption_rate_with_seed_sessions(self, server_info, seed_sessions_nb, resumption_attempts_nb):
+        # type: (ServerConnectivityInfo, int, int) -> Tuple[List[SeedSessionResumptionResult], List[ResumptionAttempt]]
+        """Establish a few sessions with the server and then spread the resumption attempts over these sessions.
+        """
+        # Establish the seed sessions; the attempts are split evenly between them
+        seed_sessions_nb = min(seed_sessions_nb, resumption_attempts_nb)
+        seed_session_results = []
+        resumption_attempts = []  # type: List[ResumptionAttempt]
+        for seed_index in range(seed_sessions_nb):
+            attempts_nb = resumption_attempts_nb // seed_sessions_nb
+            if seed_index < resumption_attempts_nb % seed_sessions_nb:
+                attempts_nb += 1
+
+            try:
+                seed_session, seed_session_info = self._resume_ssl_session(server_info)
+            except Exception as e:
+                seed_session_results.append(SeedSessionResumptionResult(
+                    attempts_nb,
+                    errored_resumptions_list=['{} - {}'.format(str(e.__class__.__name__), str(e))] * attempts_nb
+                ))
+                continue
+
+            seed_session_id = seed_session_info.session_id
+            if not seed_session_id:
+                # Session ID not assigned or empty; all the attempts for this seed session fail
+                seed_session_results.append(SeedSessionResumptionResult(attempts_nb))
+                continue
+
+            successful_resumptions_nb, errored_resumptions_list, seed_attempts = self._run_resumption_attempts(
+                self._resume_seed_session, (server_info, seed_session, seed_session_id), attempts_nb
+            )
+            seed_session_results.append(SeedSessionResumptionResult(attempts_nb, seed_session_id,
+                                                                    successful_resumptions_nb,
+                                                                    errored_resumptions_list))
+            resumption_attempts.extend(seed_attempts)
+
+        return seed_session_results, resumption_attempts
+
+    def _resume_seed_session(self, server_info, seed_session, seed_session_id):
+        # type: (ServerConnectivityInfo, nassl._nassl.SSL_SESSION, Text) -> ResumptionAttempt
+        """Perform one session resumption using the Session ID of an already-established session.
+        """
+        _, resumed_session_info = self._resume_ssl_session(server_info, seed_session)
+
+        # The server assigns a new Session ID if it did not accept the seed session
+        return ResumptionAttempt(HandshakeTypeEnum.SESSION_ID_RESUMPTION, seed_session_id,
+                                 resumed_session_info.session_id,
+                                 was_resumed=resumed_session_info.session_id == seed_session_id)
+
+    def _test_handshake_latency(self, server_info, scan_command):
+        # type: (ServerConnectivityInfo, HandshakeLatencyScanCommand) -> HandshakeLatencyScanResult
+        """Perform full and resumed handshakes with the server, all mixed together so that they happen under the same
+        load, and measure how long they took.
+        """
+        # First get the sessions to resume; these handshakes are not measured
+        seed_sessions = {}
+        seed_errors = {}
+        for handshake_type, should_enable_tls_ticket in [
+            (HandshakeTypeEnum.SESSION_ID_RESUMPTION, False),
+            (HandshakeTypeEnum.TLS_TICKET_RESUMPTION, True),
+        ]:
+            try:
+                seed_session, seed_session_info = self._resume_ssl_session(
+                    server_info, should_enable_tls_ticket=should_enable_tls_ticket
+                )
+            except Exception as e:
+                seed_errors[handshake_type] = '{} - {}'.format(str(e.__class__.__name__), str(e))
+                continue
+
+            seed_session_identifier = self._get_session_identifier(seed_session_info, handshake_type)
+            if seed_session_identifier:
+                seed_sessions[handshake_type] = (seed_session, seed_session_identifier)
+            else:
+                seed_errors[handshake_type] = 'Session ID not assigned' \
+                    if handshake_type == HandshakeTypeEnum.SESSION_ID_RESUMPTION \
+                    else 'TLS ticket not assigned'
+
+        thread_pool = ThreadPool()
+        for _ in range(scan_command.latency_handshakes_nb):
+            thread_pool.add_job((self._measure_handshake, (server_info, HandshakeTypeEnum.FULL_HANDSHAKE, None)))
+            for handshake_type, seed_session in seed_sessions.items():
+                thread_pool.add_job((self._measure_handshake, (server_info, handshake_type, seed_session)))
+        thread_pool.start(nb_threads=scan_command.latency_concurrency)
+
+        durations = {handshake_type: [] for handshake_type in HandshakeTypeEnum}
+        not_resumed_nb = {handshake_type: 0 for handshake_type in HandshakeTypeEnum}
+        for (job, (handshake_duration, was_resumed)) in thread_pool.get_result():
+            (_, (_, handshake_type, _)) = job
+            if was_resumed:
+                durations[handshake_type].append(handshake_duration)
+            else:
+                not_resumed_nb[handshake_type] += 1
+
+        errors = {handshake_type: [] for handshake_type in HandshakeTypeEnum}
+        for (job, exception) in thread_pool.get_error():
+            (_, (_, handshake_type, _)) = job
+            errors[handshake_type].append('{} - {}'.format(str(exception.__class__.__name__), str(exception)))
+
+        thread_pool.join()
+
+        latency_statistics = {}
+        for handshake_type in HandshakeTypeEnum:
+            attempted_handshakes_nb = scan_command.latency_handshakes_nb if handshake_type not in seed_errors else 0
+            latency_statistics[handshake_type] = HandshakeLatencyStatistics(
+                attempted_handshakes_nb, durations[handshake_type], not_resumed_nb[handshake_type],
+                errors[handshake_type], seed_errors.get(handshake_type)
+            )
+
+        return HandshakeLatencyScanResult(server_info, scan_command,
+                                          latency_statistics[HandshakeTypeEnum.FULL_HANDSHAKE],
+                                          latency_statistics[HandshakeTypeEnum.SESSION_ID_RESUMPTION],
+                                          latency_statistics[HandshakeTypeEnum.TLS_TICKET_RESUMPTION])
+
+    def _measure_handshake(self, server_info, handshake_type, seed_session):
+        # type: (ServerConnectivityInfo, HandshakeTypeEnum, Optional[Tuple[nassl._nassl.SSL_SESSION, Union[Text, bytes]]]) -> Tuple[float, bool]
+        """Perform one handshake and return how long it took and whether the seed session (if any) was resumed.
+        """
+        if handshake_type == HandshakeTypeEnum.FULL_HANDSHAKE:
+            _, _, handshake_duration = self._resume_ssl_session_and_time_handshake(server_info)
+            return handshake_duration, True
+
+        ssl_session, seed_session_identifier = seed_session
+        should_enable_tls_ticket = handshake_type == HandshakeTypeEnum.TLS_TICKET_RESUMPTION
+        _, new_session_info, handshake_duration = self._resume_ssl_session_and_time_handshake(
+            server_info, ssl_session, should_enable_tls_ticket=should_enable_tls_ticket
+        )
+        was_resumed = self._get_session_identifier(new_session_info, handshake_type) == seed_session_identifier
+        return handshake_duration, was_resumed
 
+    @staticmethod
+    def _get_session_identifier(ssl_session_info, handshake_type):
+        # type: (SslSessionInfo, HandshakeTypeEnum) -> Union[Text, bytes, None]
+        """Return the Session ID or the TLS ticket of the session, depending on the kind of resumption being tested.
+        """
+        if handshake_type == HandshakeTypeEnum.SESSION_ID_RESUMPTION:
+            return ssl_session_info.session_id
+        return ssl_session_info.tls_ticket
 
     def _resume_with_session_id(self, server_info):
-        # type: (ServerConnectivityInfo) -> bool
+        # type: (ServerConnectivityInfo) -> ResumptionAttempt
         """Perform one session resumption using Session IDs.
         """
-        session1 = self._resume_ssl_session(server_info)
-        try:
-            # Recover the session ID
-            session1_id = self._extract_session_id(session1)
-        except IndexError:
-            # Session ID not assigned
-            return False
-
-        if session1_id == '':
-            # Session ID empty
-            return False
+        session1, session1_info = self._resume_ssl_session(server_info)
+        if not session1_info.session_id:
+            # Session ID not assigned or empty
+            return ResumptionAttempt(HandshakeTypeEnum.SESSION_ID_RESUMPTION, None, None, was_resumed=False)
 
         # Try to resume that SSL session
-        session2 = self._resume_ssl_session(server_info, session1)
-        try:
-            # Recover the session ID
-            session2_id = self._extract_session_id(session2)
-        except IndexError:
-            # Session ID not assigned
-            return False
+        _, session2_info = self._resume_ssl_session(server_info, session1)
 
-        # Finally, compare the two Session IDs
-        if session1_id != session2_id:
-            # Session ID assigned but not accepted
-            return False
+        # Finally, compare the two Session IDs; if they are different, the Session ID was assigned but not accepted
+        return ResumptionAttempt(HandshakeTypeEnum.SESSION_ID_RESUMPTION, session1_info.session_id,
+                                 session2_info.session_id,
+                                 was_resumed=session1_info.session_id == session2_info.session_id)
 
-        return True
+    def _attempt_ticket_resumption(self, server_info):
+        # type: (ServerConnectivityInfo) -> ResumptionAttempt
+        """Perform one session resumption using TLS Session Tickets, identifying the tickets by their key name.
+        """
+        ticket_result, ticket_sessions = self._resume_with_session_ticket(server_info)
+        offered_key_name = ticket_sessions[0].tls_ticket_key_name
+        returned_key_name = ticket_sessions[1].tls_ticket_key_name if len(ticket_sessions) > 1 else None
+        return ResumptionAttempt(HandshakeTypeEnum.TLS_TICKET_RESUMPTION, offered_key_name, returned_key_name,
+                                 was_resumed=ticket_result == TslSessionTicketSupportEnum.SUCCEEDED)
 
     def _resume_with_session_ticket(self, server_info):
-        # type: (ServerConnectivityInfo) -> TslSessionTicketSupportEnum
-        """Perform one session resumption using TLS Session Tickets.
+        # type: (ServerConnectivityInfo) -> Tuple[TslSessionTicketSupportEnum, List[SslSessionInfo]]
+        """Perform one session resumption using TLS Session Tickets, and also return the sessions that were assigned
+        by the server.
         """
         # Connect to the server and keep the SSL session
-        session1 = self._resume_ssl_session(server_info, should_enable_tls_ticket=True)
-        try:
-            # Recover the TLS ticket
-            session1_tls_ticket = self._extract_tls_session_ticket(session1)
-        except IndexError:
-            return TslSessionTicketSupportEnum.FAILED_TICKET_NOT_ASSIGNED
+        session1, session1_info = self._resume_ssl_session(server_info, should_enable_tls_ticket=True)
+        if session1_info.tls_ticket is None:
+            return TslSessionTicketSupportEnum.FAILED_TICKET_NOT_ASSIGNED, [session1_info]
 
         # Try to resume that session using the TLS ticket
-        session2 = self._resume_ssl_session(server_info, session1, should_enable_tls_ticket=True)
-        try:
-            # Recover the TLS ticket
-            session2_tls_ticket = self._extract_tls_session_ticket(session2)
-        except IndexError:
-            return TslSessionTicketSupportEnum.FAILED_TICKET_NOT_ASSIGNED
+        _, session2_info = self._resume_ssl_session(server_info, session1, should_enable_tls_ticket=True)
+        if session2_info.tls_ticket is None:
+            return TslSessionTicketSupportEnum.FAILED_TICKET_NOT_ASSIGNED, [session1_info, session2_info]
 
         # Finally, compare the two TLS Tickets
-        if session1_tls_ticket != session2_tls_ticket:
-            return TslSessionTicketSupportEnum.FAILED_TICKED_IGNORED
-
-        return TslSessionTicketSupportEnum.SUCCEEDED
-
+        if session1_info.tls_ticket != session2_info.tls_ticket:
+            return TslSessionTicketSupportEnum.FAILED_TICKED_IGNORED, [session1_info, session2_info]
 
-    @staticmethod
-    def _extract_session_id(ssl_session):
-        # type: (nassl._nassl.SSL_SESSION) -> Text
-        """Extract the SSL session ID from a SSL session object or raises IndexError if the session ID was not set.
-        """
-        session_string = ((ssl_session.as_text()).split('Session-ID:'))[1]
-        session_id = (session_string.split('Session-ID-ctx:'))[0].strip()
-        return session_id
+        return TslSessionTicketSupportEnum.SUCCEEDED, [session1_info, session2_info]
 
 
-    @staticmethod
-    def _extract_tls_session_ticket(ssl_session):
-        # type: (nassl._nassl.SSL_SESSION) -> Text
-        """Extract the TLS session ticket from a SSL session object or raises IndexError if the ticket was not set.
+    @classmethod
+    def _resume_ssl_session(cls, server_info, ssl_session=None, should_enable_tls_ticket=False):
+        # type: (ServerConnectivityInfo, Optional[nassl._nassl.SSL_SESSION], bool) -> Tuple[nassl._nassl.SSL_SESSION, SslSessionInfo]
+        """Connect to the server and returns the session object that was assigned for that connection, along with its
+        content. If ssl_session is given, tries to resume that session.
         """
-        session_string = ((ssl_session.as_text()).split('TLS session ticket:'))[1]
-        session_tls_ticket = (session_string.split('Compression:'))[0]
-        return session_tls_ticket
-
+        new_session, new_session_info, _ = cls._resume_ssl_session_and_time_handshake(server_info, ssl_session,
+                                                                                       should_enable_tls_ticket)
+        return new_session, new_session_info
 
     @staticmethod
-    def _resume_ssl_session(server_info, ssl_session=None, should_enable_tls_ticket=False):
-        # type: (ServerConnectivityInfo, Optional[nassl._nassl.SSL_SESSION], bool) -> nassl._nassl.SSL_SESSION
-        """Connect to the server and returns the session object that was assigned for that connection.
-        If ssl_session is given, tries to resume that session.
+    def _resume_ssl_session_and_time_handshake(server_info, ssl_session=None, should_enable_tls_ticket=False):
+        # type: (ServerConnectivityInfo, Optional[nassl._nassl.SSL_SESSION], bool) -> Tuple[nassl._nassl.SSL_SESSION, SslSessionInfo, float]
+        """Same as _resume_ssl_session() but also return how long the TLS handshake took, in seconds.
         """
         ssl_connection = server_info.get_preconfigured_ssl_connection()
         if not should_enable_tls_ticket:
@@ -228,7 +500,104 @@ def _resume_ssl_session(server_info, ssl_session=None, should_enable_tls_ticket=
         finally:
             ssl_connection.close()
 
-        return new_session
+        handshake_duration = ssl_connection.connection_trace.get_total_duration(ConnectionPhaseEnum.TLS_HANDSHAKE)
+        return new_session, SslSessionInfo.from_ssl_session(new_session), handshake_duration
+
+
+class ResumptionAttempt(object):
+    """A single attempt at resuming a session with the server.
+
+    Attributes:
+        resumption_type (HandshakeTypeEnum): Whether the session was resumed using its Session ID or its TLS ticket.
+        offered_session (Optional[Text]): The session that was offered to the server: its Session ID, or the key name of
+            its TLS ticket. None if the server did not assign a Session ID or a TLS ticket.
+        returned_session (Optional[Text]): The Session ID or the TLS ticket key name of the session returned by the
+            server for the resumption handshake, which identifies the session cache or the ticket key of the backend
+            that handled the connection when the session was not resumed.
+        was_resumed (bool): True if the server accepted the offered session.
+    """
+
+    def __init__(self, resumption_type, offered_session, returned_session, was_resumed):
+        # type: (HandshakeTypeEnum, Optional[Text], Optional[Text], bool) -> None
+        self.resumption_type = resumption_type
+        self.offered_session = offered_session
+        self.returned_session = returned_session
+        self.was_resumed = was_resumed
+
+
+class SessionCacheTopology(object):
+    """What can be inferred about the session caches and the TLS ticket keys behind the server, using the outcome of
+    many resumption attempts.
+
+    When a server is load-balanced across backends that do not share the same session cache, a resumption only succeeds
+    when the connection lands on the backend that created the session; with N session caches behind the load-balancer,
+    about 1 resumption out of N succeeds. Backends that do not share the same TLS ticket keys can be counted more
+    directly, as each ticket key has a different key name.
+
+    Attributes:
+        session_id_attempts_nb (int): The number of session ID resumptions that were attempted.
+        successful_session_id_resumptions_nb (int): The number of session ID resumptions that were successful.
+        estimated_session_caches_nb (Optional[int]): The estimated number of distinct session caches behind the server.
+            None if no session ID resumption was successful.
+        ticket_attempts_nb (int): The number of TLS ticket resumptions that were attempted.
+        successful_ticket_resumptions_nb (int): The number of TLS ticket resumptions that were successful.
+        tls_ticket_key_names (List[Text]): The distinct key names found in the TLS tickets assigned by the server.
+        estimated_ticket_key_groups_nb (Optional[int]): The estimated number of groups of backends sharing the same TLS
+            ticket keys. None if no TLS ticket was assigned.
+    """
+
+    def __init__(self, resumption_attempts):
+        # type: (List[ResumptionAttempt]) -> None
+        session_id_attempts = [attempt for attempt in resumption_attempts
+                               if attempt.resumption_type == HandshakeTypeEnum.SESSION_ID_RESUMPTION]
+        self.session_id_attempts_nb = len(session_id_attempts)
+        self.successful_session_id_resumptions_nb = len([attempt for attempt in session_id_attempts
+                                                         if attempt.was_resumed])
+        self.estimated_session_caches_nb = None  # type: Optional[int]
+        if self.successful_session_id_resumptions_nb:
+            self.estimated_session_caches_nb = int(round(self.session_id_attempts_nb /
+                                                         float(self.successful_session_id_resumptions_nb)))
+
+        ticket_attempts = [attempt for attempt in resumption_attempts
+                           if attempt.resumption_type == HandshakeTypeEnum.TLS_TICKET_RESUMPTION]
+        self.ticket_attempts_nb = len(ticket_attempts)
+        self.successful_ticket_resumptions_nb = len([attempt for attempt in ticket_attempts if attempt.was_resumed])
+        self.tls_ticket_key_names = []  # type: List[Text]
+        for attempt in ticket_attempts:
+            for key_name in [attempt.offered_session, attempt.returned_session]:
+                if key_name and key_name not in self.tls_ticket_key_names:
+                    self.tls_ticket_key_names.append(key_name)
+        self.estimated_ticket_key_groups_nb = len(self.tls_ticket_key_names) if self.tls_ticket_key_names else None
+
+
+class SeedSessionResumptionResult(object):
+    """The result of trying to resume a single session (the seed session) several times.
+
+    Attributes:
+        session_id (Optional[Text]): The Session ID assigned by the server to the seed session. None if the server did
+            not assign one or the seed session could not be established.
+        attempted_resumptions_nb (int): The number of resumptions of the seed session that were attempted.
+        successful_resumptions_nb (int): The number of resumptions of the seed session that were successful.
+        errored_resumptions_list (List[Text]): A list of unexpected errors triggered while trying to resume the seed
+            session.
+        resumption_rate (float): The ratio of successful resumptions, between 0 and 1.
+    """
+
+    def __init__(
+            self,
+            attempted_resumptions_nb,       # type: int
+            session_id=None,                # type: Optional[Text]
+            successful_resumptions_nb=0,    # type: int
+            errored_resumptions_list=None,  # type: Optional[List[Text]]
+    ):
+        # type: (...) -> None
+        self.session_id = session_id
+        self.attempted_resumptions_nb = attempted_resumptions_nb
+        self.successful_resumptions_nb = successful_resumptions_nb
+        self.errored_resumptions_list = errored_resumptions_list if errored_resumptions_list else []
+        self.resumption_rate = 0.0
+        if attempted_resumptions_nb:
+            self.resumption_rate = successful_resumptions_nb / float(attempted_resumptions_nb)
 
 
 class SessionResumptionRateScanResult(PluginScanResult):
@@ -240,54 +609,117 @@ class SessionResumptionRateScanResult(PluginScanResult):
         failed_resumptions_nb (int): The number of session ID resumptions that failed.
         errored_resumptions_list (Optional[List[(Text)]): A list of unexpected errors triggered while trying to perform
             session ID resumption with the server (should always be empty).
+        seed_session_results (List[SeedSessionResumptionResult]): The results for each seed session, if the
+            seed_sessions_nb option was used; empty otherwise.
+        resumption_attempts (List[ResumptionAttempt]): The details of each resumption attempt, including the TLS
+            ticket resumptions if the ticket_resumptions_nb option was used.
+        errored_ticket_resumptions_list (List[Text]): A list of unexpected errors triggered while trying to perform TLS
+            ticket resumption with the server.
+        session_cache_topology (Optional[SessionCacheTopology]): What could be inferred from the resumption attempts
+            about the session caches and TLS ticket keys used by the server's backends. None if no resumption attempt
+            could be performed.
     """
 
     def __init__(
             self,
-            server_info,                # type: ServerConnectivityInfo
-            scan_command,               # type: SessionResumptionRateScanCommand
-            attempted_resum_nb,         # type: int
-            successful_resum_nb,        # type: int
-            errored_resumptions_list    # type: List[Text]
+            server_info,                            # type: ServerConnectivityInfo
+            scan_command,                           # type: SessionResumptionRateScanCommand
+            attempted_resum_nb,                     # type: int
+            successful_resum_nb,                    # type: int
+            errored_resumptions_list,               # type: List[Text]
+            seed_session_results=None,              # type: Optional[List[SeedSessionResumptionResult]]
+            resumption_attempts=None,               # type: Optional[List[ResumptionAttempt]]
+            errored_ticket_resumptions_list=None    # type: Optional[List[Text]]
     ):
         super(SessionResumptionRateScanResult, self).__init__(server_info, scan_command)
         self.attempted_resumptions_nb = attempted_resum_nb
         self.successful_resumptions_nb = successful_resum_nb
         self.errored_resumptions_list = errored_resumptions_list
         self.failed_resumptions_nb = attempted_resum_nb - successful_resum_nb - len(errored_resumptions_list)
+        self.seed_session_results = seed_session_results if seed_session_results else []
+        self.resumption_attempts = resumption_attempts if resumption_attempts else []
+        self.errored_ticket_resumptions_list = errored_ticket_resumptions_list if errored_ticket_resumptions_list \
+            else []
+        self.session_cache_topology = SessionCacheTopology(self.resumption_attempts) \
+            if self.resumption_attempts else None
 
 
     RESUMPTION_RESULT_FORMAT = '{4} ({0} successful, {1} failed, {2} errors, {3} total attempts).'
     RESUMPTION_LINE_FORMAT = '      {resumption_type:<35}{result}'
     RESUMPTION_ERROR_FORMAT = '        ERROR #{error_nb}: {error_msg}'
+    SEED_SESSION_RESULT_FORMAT = '{rate:.0%} ({successful} successful out of {attempted} attempts).'
 
-    def as_text(self):
-        result_txt = [self._format_title(self.scan_command.get_title())]
-
-        # Create the line which summarizes the session resumption rate
-        if self.successful_resumptions_nb == self.attempted_resumptions_nb:
+    @classmethod
+    def _format_resumption_rate(cls, successful_resum_nb, failed_resum_nb, errors_nb, attempted_resum_nb):
+        # type: (int, int, int, int) -> Text
+        if successful_resum_nb == attempted_resum_nb:
             resumption_supported_txt = 'OK - Supported'
-        elif self.successful_resumptions_nb > 0:
+        elif successful_resum_nb > 0:
             resumption_supported_txt = 'PARTIALLY SUPPORTED'
-        elif self.failed_resumptions_nb == self.attempted_resumptions_nb:
+        elif failed_resum_nb == attempted_resum_nb:
             resumption_supported_txt = 'NOT SUPPORTED'
         else:
             resumption_supported_txt = 'ERROR'
 
-        resum_rate_txt = self.RESUMPTION_RESULT_FORMAT.format(str(self.successful_resumptions_nb),
-                                                              str(self.failed_resumptions_nb),
-                                                              str(len(self.errored_resumptions_list)),
-                                                              str(self.attempted_resumptions_nb),
-                                                              resumption_supported_txt)
+        return cls.RESUMPTION_RESULT_FORMAT.format(str(successful_resum_nb), str(failed_resum_nb), str(errors_nb),
+                                                   str(attempted_resum_nb), resumption_supported_txt)
+
+    def as_text(self):
+        result_txt = [self._format_title(self.scan_command.get_title())]
+
+        # Create the line which summarizes the session resumption rate
+        resum_rate_txt = self._format_resumption_rate(self.successful_resumptions_nb, self.failed_resumptions_nb,
+                                                      len(self.errored_resumptions_list), self.attempted_resumptions_nb)
         result_txt.append(self.RESUMPTION_LINE_FORMAT.format(resumption_type='With Session IDs:',
                                                              result=resum_rate_txt))
 
+        # Add the rate for each seed session if there was any
+        for seed_nb, seed_result in enumerate(self.seed_session_results):
+            seed_result_txt = self.SEED_SESSION_RESULT_FORMAT.format(rate=seed_result.resumption_rate,
+                                                                     successful=seed_result.successful_resumptions_nb,
+                                                                     attempted=seed_result.attempted_resumptions_nb)
+            if seed_result.session_id is None and not seed_result.errored_resumptions_list:
+                seed_result_txt = 'NOT SUPPORTED - Session ID not assigned.'
+            result_txt.append(self.RESUMPTION_LINE_FORMAT.format(
+                resumption_type='  Seed Session #{}:'.format(seed_nb), result=seed_result_txt
+            ))
+
         # Add error messages if there was any
         i = 0
         for error_msg in self.errored_resumptions_list:
             result_txt.append(self.RESUMPTION_ERROR_FORMAT.format(error_nb=i, error_msg=error_msg))
             i += 1
 
+        topology = self.session_cache_topology
+        if topology is None:
+            return result_txt
+
+        # Add the TLS ticket resumption rate if tickets were tested
+        if topology.ticket_attempts_nb or self.errored_ticket_resumptions_list:
+            ticket_rate_txt = self._format_resumption_rate(
+                topology.successful_ticket_resumptions_nb,
+                topology.ticket_attempts_nb - topology.successful_ticket_resumptions_nb,
+                len(self.errored_ticket_resumptions_list),
+                topology.ticket_attempts_nb + len(self.errored_ticket_resumptions_list)
+            )
+            result_txt.append(self.RESUMPTION_LINE_FORMAT.format(resumption_type='With TLS Tickets:',
+                                                                 result=ticket_rate_txt))
+            for error_nb, error_msg in enumerate(self.errored_ticket_resumptions_list):
+                result_txt.append(self.RESUMPTION_ERROR_FORMAT.format(error_nb=error_nb, error_msg=error_msg))
+
+        # Add what could be inferred about the server's backends
+        caches_txt = str(topology.estimated_session_caches_nb) \
+            if topology.estimated_session_caches_nb is not None \
+            else 'Unknown - No successful session ID resumption.'
+        result_txt.append(self.RESUMPTION_LINE_FORMAT.format(resumption_type='Session Caches (estimated):',
+                                                             result=caches_txt))
+        if topology.ticket_attempts_nb:
+            ticket_keys_txt = str(topology.estimated_ticket_key_groups_nb) \
+                if topology.estimated_ticket_key_groups_nb is not None \
+                else 'Unknown - No TLS ticket assigned.'
+            result_txt.append(self.RESUMPTION_LINE_FORMAT.format(resumption_type='TLS Ticket Keys (estimated):',
+                                                                 result=ticket_keys_txt))
+
         return result_txt
 
 
@@ -308,7 +740,41 @@ def as_xml(self):
             resumption_error_xml.text = error_msg
             resumption_rate_xml.append(resumption_error_xml)
 
+        for seed_result in self.seed_session_results:
+            seed_xml_attr = {'totalAttempts': str(seed_result.attempted_resumptions_nb),
+                             'successfulAttempts': str(seed_result.successful_resumptions_nb),
+                             'errors': str(len(seed_result.errored_resumptions_list))}
+            if seed_result.session_id:
+                seed_xml_attr['sessionId'] = seed_result.session_id
+            resumption_rate_xml.append(Element('seedSession', attrib=seed_xml_attr))
+
         xml_result.append(resumption_rate_xml)
+
+        topology = self.session_cache_topology
+        if topology is not None:
+            topology_xml_attr = {
+                'sessionIdAttempts': str(topology.session_id_attempts_nb),
+                'successfulSessionIdResumptions': str(topology.successful_session_id_resumptions_nb),
+                'ticketAttempts': str(topology.ticket_attempts_nb + len(self.errored_ticket_resumptions_list)),
+                'successfulTicketResumptions': str(topology.successful_ticket_resumptions_nb),
+                'ticketErrors': str(len(self.errored_ticket_resumptions_list)),
+            }
+            if topology.estimated_session_caches_nb is not None:
+                topology_xml_attr['estimatedSessionCaches'] = str(topology.estimated_session_caches_nb)
+            if topology.estimated_ticket_key_groups_nb is not None:
+                topology_xml_attr['estimatedTicketKeyGroups'] = str(topology.estimated_ticket_key_groups_nb)
+
+            topology_xml = Element('sessionCacheTopology', attrib=topology_xml_attr)
+            for key_name in topology.tls_ticket_key_names:
+                key_name_xml = Element('ticketKeyName')
+                key_name_xml.text = key_name
+                topology_xml.append(key_name_xml)
+            for error_msg in self.errored_ticket_resumptions_list:
+                error_xml = Element('error')
+                error_xml.text = error_msg
+                topology_xml.append(error_xml)
+            xml_result.append(topology_xml)
+
         return xml_result
 
 
@@ -326,6 +792,11 @@ class SessionResumptionSupportScanResult(PluginScanResult):
         ticket_resumption_failed_reason (Text): A message explaining why TLS ticket resumption failed.
         ticket_resumption_exception (Optional[Text]): An unexpected error that was raised while trying to perform ticket
             resumption (should never happen).
+        tls_ticket_lifetime_hint (Optional[int]): The lifetime of the TLS tickets advertised by the server, in seconds.
+            None if the server did not assign a TLS ticket.
+        tls_ticket_key_names (List[Text]): The distinct key names found in the TLS tickets assigned by the server
+            during the scan, as hex strings. More than one key name means that the server rotated its ticket keys or
+            that its backends do not share the same ticket keys, which prevents ticket resumption across backends.
     """
 
     def __init__(
@@ -337,7 +808,9 @@ def __init__(
             errored_resumptions_list,               # type: List[Text]
             is_ticket_resumption_supported,         # type: int
             ticket_resumption_failed_reason=None,   # type: Optional[Text]
-            ticket_resumption_exception=None        # type: Optional[Exception]
+            ticket_resumption_exception=None,       # type: Optional[Exception]
+            tls_ticket_lifetime_hint=None,          # type: Optional[int]
+            tls_ticket_key_names=None               # type: Optional[List[Text]]
     ):
         super(SessionResumptionSupportScanResult, self).__init__(server_info, scan_command)
         self.attempted_resumptions_nb = attempted_resum_nb
@@ -347,6 +820,8 @@ def __init__(
 
         self.is_ticket_resumption_supported = is_ticket_resumption_supported
         self.ticket_resumption_failed_reason = ticket_resumption_failed_reason
+        self.tls_ticket_lifetime_hint = tls_ticket_lifetime_hint
+        self.tls_ticket_key_names = tls_ticket_key_names if tls_ticket_key_names else []
 
         # An exception was raised while trying to perform ticket resumption (should never happen)
         self.ticket_resumption_error = None
@@ -373,6 +848,16 @@ def as_text(self):
 
 
         result_txt.append(self.RESUMPTION_LINE_FORMAT.format(resumption_type='With TLS Tickets:', result=ticket_txt))
+
+        if self.tls_ticket_lifetime_hint is not None:
+            result_txt.append(self.RESUMPTION_LINE_FORMAT.format(
+                resumption_type='  Ticket Lifetime Hint:', result='{} seconds'.format(self.tls_ticket_lifetime_hint)
+            ))
+        if len(self.tls_ticket_key_names) > 1:
+            result_txt.append(self.RESUMPTION_LINE_FORMAT.format(
+                resumption_type='  Ticket Key Names:',
+                result='WARNING - {} different ticket keys used.'.format(len(self.tls_ticket_key_names))
+            ))
         return result_txt
 
 
@@ -392,8 +877,146 @@ def as_xml(self):
             xml_resum_ticket_attr['isSupported'] = str(self.is_ticket_resumption_supported)
             if not self.is_ticket_resumption_supported:
                 xml_resum_ticket_attr['reason'] = self.ticket_resumption_failed_reason
+            if self.tls_ticket_lifetime_hint is not None:
+                xml_resum_ticket_attr['lifetimeHint'] = str(self.tls_ticket_lifetime_hint)
+            if self.tls_ticket_key_names:
+                xml_resum_ticket_attr['keyNamesNb'] = str(len(self.tls_ticket_key_names))
 
         xml_resum_ticket = Element('sessionResumptionWithTLSTickets', attrib=xml_resum_ticket_attr)
         xml_result.append(xml_resum_ticket)
 
         return xml_result
+
+
+class HandshakeLatencyStatistics(object):
+    """The latency of one kind of handshake (full handshake, session ID resumption or TLS ticket resumption).
+
+    Attributes:
+        attempted_handshakes_nb (int): The number of handshakes that were attempted; 0 if the server did not assign a
+            session to resume.
+        handshake_durations (List[float]): How long each successful handshake took, in seconds. For resumptions, only
+            the handshakes where the session was actually resumed are included.
+        not_resumed_handshakes_nb (int): The number of resumptions where the server did a full handshake instead.
+        errored_handshakes_list (List[Text]): A list of unexpected errors triggered during the handshakes.
+        not_supported_reason (Optional[Text]): Why no resumption was attempted, for example because the server did not
+            assign a TLS ticket. None if handshakes were attempted.
+        p50 (Optional[float]): The median latency of the handshakes, in seconds. None if there was no successful
+            handshake.
+        p95 (Optional[float]): The 95th percentile of the latency of the handshakes, in seconds.
+        p99 (Optional[float]): The 99th percentile of the latency of the handshakes, in seconds.
+    """
+
+    def __init__(
+            self,
+            attempted_handshakes_nb,        # type: int
+            handshake_durations,            # type: List[float]
+            not_resumed_handshakes_nb,      # type: int
+            errored_handshakes_list,        # type: List[Text]
+            not_supported_reason=None       # type: Optional[Text]
+    ):
+        # type: (...) -> None
+        self.attempted_handshakes_nb = attempted_handshakes_nb
+        self.handshake_durations = sorted(handshake_durations)
+        self.not_resumed_handshakes_nb = not_resumed_handshakes_nb
+        self.errored_handshakes_list = errored_handshakes_list
+        self.not_supported_reason = not_supported_reason
+
+        self.p50 = self._get_percentile(self.handshake_durations, 50)
+        self.p95 = self._get_percentile(self.handshake_durations, 95)
+        self.p99 = self._get_percentile(self.handshake_durations, 99)
+
+    @staticmethod
+    def _get_percentile(sorted_values, percentile):
+        # type: (List[float], int) -> Optional[float]
+        """Nearest-rank percentile of a sorted list of values.
+        """
+        if not sorted_values:
+            return None
+        rank = int(math.ceil(percentile / 100.0 * len(sorted_values)))
+        return sorted_values[max(rank, 1) - 1]
+
+
+class HandshakeLatencyScanResult(PluginScanResult):
+    """The result of running HandshakeLatencyScanCommand on a specific server.
+
+    Attributes:
+        concurrency (int): The number of handshakes that were performed simultaneously.
+        full_handshake_latency (HandshakeLatencyStatistics): The latency of full handshakes.
+        session_id_resumption_latency (HandshakeLatencyStatistics): The latency of session ID resumptions.
+        tls_ticket_resumption_latency (HandshakeLatencyStatistics): The latency of TLS ticket resumptions.
+    """
+
+    def __init__(
+            self,
+            server_info,                        # type: ServerConnectivityInfo
+            scan_command,                       # type: HandshakeLatencyScanCommand
+            full_handshake_latency,             # type: HandshakeLatencyStatistics
+            session_id_resumption_latency,      # type: HandshakeLatencyStatistics
+            tls_ticket_resumption_latency       # type: HandshakeLatencyStatistics
+    ):
+        # type: (...) -> None
+        super(HandshakeLatencyScanResult, self).__init__(server_info, scan_command)
+        self.concurrency = scan_command.latency_concurrency
+        self.full_handshake_latency = full_handshake_latency
+        self.session_id_resumption_latency = session_id_resumption_latency
+        self.tls_ticket_resumption_latency = tls_ticket_resumption_latency
+
+    def _get_handshake_types(self):
+        # type: () -> List[Tuple[Text, Text, HandshakeLatencyStatistics]]
+        return [
+            ('Full Handshakes:', 'fullHandshakes', self.full_handshake_latency),
+            ('Session ID Resumptions:', 'sessionIdResumptions', self.session_id_resumption_latency),
+            ('TLS Ticket Resumptions:', 'tlsTicketResumptions', self.tls_ticket_resumption_latency),
+        ]
+
+    LATENCY_LINE_FORMAT = '      {handshake_type:<35}{result}'
+    LATENCY_RESULT_FORMAT = 'p50 {p50:.0f} ms, p95 {p95:.0f} ms, p99 {p99:.0f} ms ({measured} measured, ' \
+                            '{not_resumed} not resumed, {errors} errors, {attempted} total attempts).'
+    LATENCY_ERROR_FORMAT = '        ERROR #{error_nb}: {error_msg}'
+
+    def as_text(self):
+        result_txt = [self._format_title(self.scan_command.get_title())]
+        result_txt.append(self.LATENCY_LINE_FORMAT.format(handshake_type='Concurrency:', result=self.concurrency))
+
+        for handshake_type_txt, _, latency in self._get_handshake_types():
+            if latency.not_supported_reason:
+                latency_txt = 'NOT SUPPORTED - {}.'.format(latency.not_supported_reason)
+            elif not latency.handshake_durations:
+                latency_txt = 'ERROR - No successful handshake.'
+            else:
+                latency_txt = self.LATENCY_RESULT_FORMAT.format(
+                    p50=latency.p50 * 1000, p95=latency.p95 * 1000, p99=latency.p99 * 1000,
+                    measured=len(latency.handshake_durations), not_resumed=latency.not_resumed_handshakes_nb,
+                    errors=len(latency.errored_handshakes_list), attempted=latency.attempted_handshakes_nb
+                )
+            result_txt.append(self.LATENCY_LINE_FORMAT.format(handshake_type=handshake_type_txt, result=latency_txt))
+
+            for error_nb, error_msg in enumerate(latency.errored_handshakes_list):
+                result_txt.append(self.LATENCY_ERROR_FORMAT.format(error_nb=error_nb, error_msg=error_msg))
+
+        return result_txt
+
+    def as_xml(self):
+        xml_result = Element(self.scan_command.get_cli_argument(), title=self.scan_command.get_title(),
+                             concurrency=str(self.concurrency))
+
+        for _, xml_tag, latency in self._get_handshake_types():
+            latency_xml_attr = {
+                'totalAttempts': str(latency.attempted_handshakes_nb),
+                'measuredHandshakes': str(len(latency.handshake_durations)),
+                'notResumed': str(latency.not_resumed_handshakes_nb),
+                'errors': str(len(latency.errored_handshakes_list)),
+            }
+            if latency.not_supported_reason:
+                latency_xml_attr['notSupportedReason'] = latency.not_supported_reason
+            if latency.handshake_durations:
+                latency_xml_attr.update({'p50': str(latency.p50), 'p95': str(latency.p95), 'p99': str(latency.p99)})
+
+            latency_xml = Element(xml_tag, attrib=latency_xml_attr)
+            for error_msg in latency.errored_handshakes_list:
+                error_xml = Element('error')
+                error_xml.text = error_msg
+                latency_xml.append(error_xml)
+            xml_result.append(latency_xml)
+
+        return xml_result
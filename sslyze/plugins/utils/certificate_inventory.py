@@ -0,0 +1,213 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import binascii
+import calendar
+import os
+import sqlite3
+import threading
+import time
+from datetime import datetime
+from hashlib import sha256
+
+import cryptography
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.serialization import Encoding
+from cryptography.hazmat.primitives.serialization import PublicFormat
+from sslyze.plugins.utils.certificate_utils import CertificateUtils
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Text
+
+
+class CertificateInventory(object):
+    """An SQLite database of the certificates returned by the servers that were scanned, and the endpoints they were
+    returned by.
+
+    It is updated while scanning (see the inventory_db option of the CertificateInfoScanCommand) so that questions such
+    as "which certificates expire in the next 30 days" or "which servers share the same key" can be answered without
+    parsing the scan output. The database can be shared by several processes and re-used across scans.
+
+    Args:
+        path (Text): The path to the SQLite database file; it gets created if it does not exist.
+    """
+
+    # Several worker processes write to the same database; wait for the other writers instead of failing
+    _LOCK_TIMEOUT = 60
+
+    _SCHEMA = [
+        '''CREATE TABLE IF NOT EXISTS certificates (
+            fingerprint TEXT PRIMARY KEY,
+            subject TEXT NOT NULL,
+            issuer TEXT NOT NULL,
+            serial_number TEXT NOT NULL,
+            not_before INTEGER NOT NULL,
+            not_after INTEGER NOT NULL,
+            public_key_sha256 TEXT NOT NULL,
+            dns_subject_alternative_names TEXT NOT NULL
+        )''',
+        'CREATE INDEX IF NOT EXISTS certificates_not_after ON certificates (not_after)',
+        'CREATE INDEX IF NOT EXISTS certificates_public_key_sha256 ON certificates (public_key_sha256)',
+        '''CREATE TABLE IF NOT EXISTS endpoints (
+            hostname TEXT NOT NULL,
+            ip_address TEXT,
+            port INTEGER NOT NULL,
+            server_name_indication TEXT NOT NULL,
+            fingerprint TEXT NOT NULL REFERENCES certificates (fingerprint),
+            position_in_chain INTEGER NOT NULL,
+            last_seen INTEGER NOT NULL,
+            PRIMARY KEY (hostname, ip_address, port, server_name_indication, fingerprint)
+        )''',
+        'CREATE INDEX IF NOT EXISTS endpoints_fingerprint ON endpoints (fingerprint)',
+    ]
+
+    # The databases whose schema was already created by this process
+    _INITIALIZED_PATHS = set()  # type: Set[Text]
+    _INITIALIZED_PATHS_LOCK = threading.Lock()
+
+    def __init__(self, path):
+        # type: (Text) -> None
+        self.path = path
+        absolute_path = os.path.abspath(path)
+        with self._INITIALIZED_PATHS_LOCK:
+            if absolute_path in self._INITIALIZED_PATHS:
+                return
+
+            connection = self._connect()
+            try:
+                with connection:
+                    for statement in self._SCHEMA:
+                        connection.execute(statement)
+            finally:
+                connection.close()
+            self._INITIALIZED_PATHS.add(absolute_path)
+
+    def _connect(self):
+        # type: () -> sqlite3.Connection
+        connection = sqlite3.connect(self.path, timeout=self._LOCK_TIMEOUT)
+        connection.row_factory = sqlite3.Row
+        return connection
+
+    @staticmethod
+    def _to_timestamp(certificate_date):
+        # type: (datetime) -> int
+        return calendar.timegm(certificate_date.utctimetuple())
+
+    def add_certificate_chain(self, hostname, ip_address, port, server_name_indication, certificate_chain):
+        # type: (Text, Optional[Text], int, Text, List[cryptography.x509.Certificate]) -> None
+        """Record that the supplied certificate chain was returned by the server at the supplied endpoint.
+
+        Certificates that are no longer returned by this endpoint are removed from its inventory. The ip_address is None
+        if the server was scanned through an HTTP tunnel.
+        """
+        certificate_rows = []
+        endpoint_rows = []
+        recorded_fingerprints = set()  # type: Set[Text]
+        now = int(time.time())
+        for position, certificate in enumerate(certificate_chain):
+            fingerprint = binascii.hexlify(certificate.fingerprint(hashes.SHA256())).decode('ascii')
+            if fingerprint in recorded_fingerprints:
+                # Misconfigured server sending the same certificate twice; only its first position is recorded
+                continue
+            recorded_fingerprints.add(fingerprint)
+
+            try:
+                dns_names = CertificateUtils.get_dns_subject_alternative_names(certificate)
+            except ValueError:
+                # Extension that cryptography cannot parse
+                dns_names = []
+            spki_bytes = certificate.public_key().public_bytes(Encoding.DER, PublicFormat.SubjectPublicKeyInfo)
+            certificate_rows.append((
+                fingerprint,
+                CertificateUtils.get_name_as_text(certificate.subject),
+                CertificateUtils.get_name_as_text(certificate.issuer),
+                '{:x}'.format(certificate.serial_number),
+                self._to_timestamp(certificate.not_valid_before),
+                self._to_timestamp(certificate.not_valid_after),
+                sha256(spki_bytes).hexdigest(),
+                '\n'.join(dns_names),
+            ))
+            endpoint_rows.append((hostname, ip_address, port, server_name_indication, fingerprint, position, now))
+
+        connection = self._connect()
+        try:
+            with connection:
+                connection.executemany('INSERT OR IGNORE INTO certificates VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                                       certificate_rows)
+                connection.execute(
+                    'DELETE FROM endpoints WHERE hostname = ? AND ip_address IS ? AND port = ? '
+                    'AND server_name_indication = ?',
+                    (hostname, ip_address, port, server_name_indication)
+                )
+                connection.executemany('INSERT INTO endpoints VALUES (?, ?, ?, ?, ?, ?, ?)', endpoint_rows)
+        finally:
+            connection.close()
+
+    def _query(self, query, parameters=()):
+        # type: (Text, Any) -> List[Dict[Text, Any]]
+        connection = self._connect()
+        try:
+            return [dict(row) for row in connection.execute(query, parameters)]
+        finally:
+            connection.close()
+
+    @classmethod
+    def _format_certificate_rows(cls, rows):
+        # type: (List[Dict[Text, Any]]) -> List[Dict[Text, Any]]
+        for row in rows:
+            row['dns_subject_alternative_names'] = [name for name in row['dns_subject_alternative_names'].split('\n')
+                                                    if name]
+        return rows
+
+    def get_certificates_expiring_within(self, days_nb, leaf_certificates_only=True, reference_time=None):
+        # type: (int, bool, Optional[int]) -> List[Dict[Text, Any]]
+        """Return the certificates that expire in the next days_nb days (including the ones that already expired),
+        sorted by expiration date; not_before and not_after are UNIX timestamps.
+
+        The days are counted from reference_time, a UNIX timestamp, or from now if it is None.
+        """
+        if reference_time is None:
+            reference_time = int(time.time())
+        position_clause = 'AND fingerprint IN (SELECT fingerprint FROM endpoints WHERE position_in_chain = 0) ' \
+            if leaf_certificates_only else ''
+        rows = self._query(
+            'SELECT * FROM certificates WHERE not_after <= ? {}ORDER BY not_after'.format(position_clause),
+            (reference_time + days_nb * 24 * 3600,)
+        )
+        return self._format_certificate_rows(rows)
+
+    def get_certificate(self, fingerprint):
+        # type: (Text) -> Optional[Dict[Text, Any]]
+        rows = self._format_certificate_rows(
+            self._query('SELECT * FROM certificates WHERE fingerprint = ?', (fingerprint.lower(),))
+        )
+        return rows[0] if rows else None
+
+    def get_endpoints_for_certificate(self, fingerprint):
+        # type: (Text) -> List[Dict[Text, Any]]
+        """Return the endpoints (hostname, ip_address, port and server_name_indication) that returned the certificate
+        with the supplied SHA-256 fingerprint.
+        """
+        return self._query(
+            'SELECT hostname, ip_address, port, server_name_indication, position_in_chain, last_seen FROM endpoints '
+            'WHERE fingerprint = ? ORDER BY hostname, port',
+            (fingerprint.lower(),)
+        )
+
+    def get_reused_public_keys(self):
+        # type: () -> Dict[Text, List[Text]]
+        """Return the public keys used in several leaf certificates, mapped to the fingerprints of these certificates.
+        """
+        rows = self._query(
+            'SELECT public_key_sha256, fingerprint FROM certificates '
+            'WHERE fingerprint IN (SELECT fingerprint FROM endpoints WHERE position_in_chain = 0) '
+            'ORDER BY public_key_sha256, fingerprint'
+        )
+        public_keys = {}  # type: Dict[Text, List[Text]]
+        for row in rows:
+            public_keys.setdefault(row['public_key_sha256'], []).append(row['fingerprint'])
+        return {public_key: fingerprints for public_key, fingerprints in public_keys.items() if len(fingerprints) > 1}
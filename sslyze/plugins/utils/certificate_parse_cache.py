@@ -0,0 +1,97 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import threading
+from base64 import b64decode
+from collections import OrderedDict
+from hashlib import sha256
+
+import cryptography
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives import hashes
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Text
+from typing import Union
+
+
+class _CertificateCacheEntry(object):
+
+    def __init__(self, certificate):
+        # type: (cryptography.x509.Certificate) -> None
+        self.certificate = certificate
+        # Data extracted from the certificate, such as its HPKP pin
+        self.derived_data = {}  # type: Dict[Text, Any]
+
+
+class CertificateParseCache(object):
+    """Per-process cache of parsed certificates, keyed by the SHA-256 of their DER encoding.
+
+    Servers often send the same certificates (intermediate CAs, shared leaf certificates, etc.); the cache ensures each
+    of them only gets parsed once per process, as well as the data derived from it (HPKP pin, names, etc.). The least
+    recently used certificates are evicted once the cache is full.
+    """
+
+    MAX_ENTRIES_NB = 2000
+
+    _ENTRIES = OrderedDict()  # type: OrderedDict
+    _LOCK = threading.Lock()
+
+    @classmethod
+    def get_certificate_from_pem(cls, pem_certificate):
+        # type: (Union[Text, bytes]) -> cryptography.x509.Certificate
+        if isinstance(pem_certificate, bytes):
+            pem_certificate = pem_certificate.decode('ascii')
+        # Extracting the DER bytes is much cheaper than parsing the certificate
+        pem_lines = [line.strip() for line in pem_certificate.strip().splitlines()]
+        der_certificate = b64decode(''.join([line for line in pem_lines if line and not line.startswith('-----')]))
+        return cls.get_certificate_from_der(der_certificate)
+
+    @classmethod
+    def get_certificate_from_der(cls, der_certificate):
+        # type: (bytes) -> cryptography.x509.Certificate
+        return cls._get_entry(sha256(der_certificate).digest(), der_certificate).certificate
+
+    @classmethod
+    def get_derived_data(cls, certificate, data_name, compute_function):
+        # type: (cryptography.x509.Certificate, Text, Callable[[cryptography.x509.Certificate], Any]) -> Any
+        """Return some data extracted from the certificate using compute_function, which only gets called the first time
+        this data is requested for this certificate.
+        """
+        entry = cls._get_entry(certificate.fingerprint(hashes.SHA256()), certificate=certificate)
+        try:
+            return entry.derived_data[data_name]
+        except KeyError:
+            data = compute_function(certificate)
+            entry.derived_data[data_name] = data
+            return data
+
+    @classmethod
+    def _get_entry(cls, der_sha256, der_certificate=None, certificate=None):
+        # type: (bytes, bytes, cryptography.x509.Certificate) -> _CertificateCacheEntry
+        with cls._LOCK:
+            entry = cls._ENTRIES.pop(der_sha256, None)
+            if entry is not None:
+                # Move the entry to the end as it is now the most recently used one
+                cls._ENTRIES[der_sha256] = entry
+                return entry
+
+        # Parse the certificate outside of the lock
+        if certificate is None:
+            certificate = cryptography.x509.load_der_x509_certificate(der_certificate, default_backend())
+
+        with cls._LOCK:
+            # Another thread may have parsed the same certificate in the meantime
+            entry = cls._ENTRIES.pop(der_sha256, None) or _CertificateCacheEntry(certificate)
+            cls._ENTRIES[der_sha256] = entry
+            if len(cls._ENTRIES) > cls.MAX_ENTRIES_NB:
+                cls._ENTRIES.popitem(last=False)
+            return entry
+
+    @classmethod
+    def clear(cls):
+        # type: () -> None
+        with cls._LOCK:
+            cls._ENTRIES.clear()
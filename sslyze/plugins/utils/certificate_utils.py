@@ -2,9 +2,9 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
 
-import ssl
 from base64 import b64encode
 from hashlib import sha256
+from ssl import CertificateError
 import cryptography
 from cryptography.hazmat.primitives.asymmetric import rsa, dsa, ec
 from cryptography.hazmat.primitives.serialization import Encoding, PublicFormat
@@ -12,6 +12,10 @@
 from cryptography.x509 import ExtensionNotFound
 from cryptography.x509 import ExtensionOID
 from cryptography.x509 import NameOID
+from sslyze.plugins.utils.certificate_parse_cache import CertificateParseCache
+from sslyze.plugins.utils.hostname_matcher import HostnameMatcher
+from typing import Dict
+from typing import Iterable
 from typing import List
 from typing import Text
 
@@ -25,11 +29,17 @@ def get_common_names(name_field):
         # type: (cryptography.x509.Name) -> List[Text]
         return [cn.value for cn in name_field.get_attributes_for_oid(NameOID.COMMON_NAME)]
 
-    @staticmethod
-    def get_dns_subject_alternative_names(certificate):
+    @classmethod
+    def get_dns_subject_alternative_names(cls, certificate):
         # type: (cryptography.x509.Certificate) -> List[Text]
         """Retrieve all the DNS entries of the Subject Alternative Name extension.
         """
+        return CertificateParseCache.get_derived_data(certificate, 'dns_subject_alternative_names',
+                                                      cls._compute_dns_subject_alternative_names)
+
+    @staticmethod
+    def _compute_dns_subject_alternative_names(certificate):
+        # type: (cryptography.x509.Certificate) -> List[Text]
         subj_alt_names = []
         try:
             san_ext = certificate.extensions.get_extension_for_oid(ExtensionOID.SUBJECT_ALTERNATIVE_NAME)
@@ -46,13 +56,41 @@ def matches_hostname(cls, certificate, hostname):
         Raises: 
             CertificateError: If the certificate was not issued for the supplied hostname.
         """
-        # Extract the names from the certificate to create the properly-formatted dictionary
-        certificate_names = {
-            'subject': (tuple([('commonName', name) for name in cls.get_common_names(certificate.subject)]),),
-            'subjectAltName': tuple([('DNS', name) for name in cls.get_dns_subject_alternative_names(certificate)]),
-        }
-        # CertificateError is raised on failure
-        ssl.match_hostname(certificate_names, hostname)
+        hostname_matcher = cls.get_hostname_matcher(certificate)
+        if hostname_matcher.matches(hostname):
+            return
+
+        # Same errors as ssl.match_hostname()
+        if len(hostname_matcher.names) > 1:
+            raise CertificateError('hostname {!r} doesn\'t match either of {}'.format(
+                hostname, ', '.join(map(repr, hostname_matcher.names))
+            ))
+        elif len(hostname_matcher.names) == 1:
+            raise CertificateError('hostname {!r} doesn\'t match {!r}'.format(hostname, hostname_matcher.names[0]))
+        else:
+            raise CertificateError('no appropriate commonName or subjectAltName fields were found')
+
+    @classmethod
+    def match_hostnames(cls, certificate, hostnames):
+        # type: (cryptography.x509.Certificate, Iterable[Text]) -> Dict[Text, bool]
+        """Check whether the certificate was issued for each of the supplied hostnames, for example all the virtual
+        hosts served by a single IP address.
+        """
+        return cls.get_hostname_matcher(certificate).match_hostnames(hostnames)
+
+    @classmethod
+    def get_hostname_matcher(cls, certificate):
+        # type: (cryptography.x509.Certificate) -> HostnameMatcher
+        return CertificateParseCache.get_derived_data(certificate, 'hostname_matcher', cls._compute_hostname_matcher)
+
+    @classmethod
+    def _compute_hostname_matcher(cls, certificate):
+        # type: (cryptography.x509.Certificate) -> HostnameMatcher
+        # Like ssl.match_hostname(), only look at the common names if there are no DNS subject alternative names
+        names = cls.get_dns_subject_alternative_names(certificate)
+        if not names:
+            names = cls.get_common_names(certificate.subject)
+        return HostnameMatcher(names)
 
     @classmethod
     def get_name_as_short_text(cls, name_field):
@@ -73,11 +111,16 @@ def get_name_as_text(cls, name_field):
         # type: (cryptography.x509.Name) -> Text
         return ', '.join(['{}={}'.format(attr.oid._name, attr.value) for attr in name_field])
 
-    @staticmethod
-    def get_hpkp_pin(certificate):
+    @classmethod
+    def get_hpkp_pin(cls, certificate):
         # type: (cryptography.x509.Certificate) -> Text
         """Generate the HTTP Public Key Pinning hash (RFC 7469) for the given certificate.
         """
+        return CertificateParseCache.get_derived_data(certificate, 'hpkp_pin', cls._compute_hpkp_pin)
+
+    @staticmethod
+    def _compute_hpkp_pin(certificate):
+        # type: (cryptography.x509.Certificate) -> Text
         pub_bytes = certificate.public_key().public_bytes(
             encoding=Encoding.DER,
             format=PublicFormat.SubjectPublicKeyInfo
@@ -85,8 +128,13 @@ def get_hpkp_pin(certificate):
         digest = sha256(pub_bytes).digest()
         return b64encode(digest).decode('utf-8')
 
+    @classmethod
+    def get_public_key_type(cls, certificate):
+        # type: (cryptography.x509.Certificate) -> Text
+        return CertificateParseCache.get_derived_data(certificate, 'public_key_type', cls._compute_public_key_type)
+
     @staticmethod
-    def get_public_key_type(certificate):
+    def _compute_public_key_type(certificate):
         # type: (cryptography.x509.Certificate) -> Text
         public_key = certificate.public_key()
         if isinstance(public_key, rsa.RSAPublicKey):
@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+from typing import Dict
+from typing import Iterable
+from typing import List
+from typing import Set
+from typing import Text
+from typing import Tuple
+
+
+class HostnameMatcher(object):
+    """The names a certificate was issued for, pre-processed so that many hostnames can be checked against them cheaply.
+
+    Names are matched following the rules of RFC 6125 as implemented by ssl.match_hostname(): the comparison is
+    case-insensitive, and a wildcard is only allowed in the left-most label, where it matches exactly one label.
+
+    Args:
+        names (List[Text]): The DNS names the certificate was issued for (the DNS entries of the Subject Alternative
+            Name extension or, if there are none, the subject's common names).
+    """
+
+    # Don't let the cache of results grow forever when the same certificate gets matched against a huge list of names
+    MAX_CACHED_RESULTS_NB = 10000
+
+    def __init__(self, names):
+        # type: (List[Text]) -> None
+        self.names = names
+
+        self._exact_names = set()  # type: Set[Text]
+        # Names such as *.example.com, stored as the set of parent domains (example.com)
+        self._wildcard_domains = set()  # type: Set[Text]
+        # Names such as www*.example.com, stored as the parent domain mapped to the prefix and suffix of the wildcard
+        self._partial_wildcards = {}  # type: Dict[Text, List[Tuple[Text, Text]]]
+
+        for name in names:
+            name = self._normalize(name)
+            if '*' not in name:
+                self._exact_names.add(name)
+                continue
+
+            leftmost_label, _, domain = name.partition('.')
+            if '*' in domain or leftmost_label.count('*') > 1 or not domain:
+                # Invalid wildcard; this name cannot match anything
+                continue
+            if leftmost_label == '*':
+                self._wildcard_domains.add(domain)
+            elif not leftmost_label.startswith('xn--'):
+                # Wildcards cannot be used inside IDNA labels
+                prefix, _, suffix = leftmost_label.partition('*')
+                self._partial_wildcards.setdefault(domain, []).append((prefix, suffix))
+
+        self._results = {}  # type: Dict[Text, bool]
+
+    @staticmethod
+    def _normalize(hostname):
+        # type: (Text) -> Text
+        return hostname.lower().rstrip('.')
+
+    def matches(self, hostname):
+        # type: (Text) -> bool
+        """Was the certificate issued for the supplied hostname?
+        """
+        try:
+            return self._results[hostname]
+        except KeyError:
+            pass
+
+        result = self._matches(self._normalize(hostname))
+        if len(self._results) < self.MAX_CACHED_RESULTS_NB:
+            self._results[hostname] = result
+        return result
+
+    def _matches(self, hostname):
+        # type: (Text) -> bool
+        if hostname in self._exact_names:
+            return True
+
+        leftmost_label, _, domain = hostname.partition('.')
+        if not domain or not leftmost_label:
+            return False
+        if domain in self._wildcard_domains:
+            return True
+        for prefix, suffix in self._partial_wildcards.get(domain, []):
+            if len(leftmost_label) >= len(prefix) + len(suffix) and leftmost_label.startswith(prefix) \
+                    and leftmost_label.endswith(suffix) and not leftmost_label.startswith('xn--'):
+                return True
+        return False
+
+    def match_hostnames(self, hostnames):
+        # type: (Iterable[Text]) -> Dict[Text, bool]
+        """Check a batch of hostnames, for example all the virtual hosts served by a single IP address.
+        """
+        return {hostname: self.matches(hostname) for hostname in hostnames}
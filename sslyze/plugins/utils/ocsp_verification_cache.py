@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import calendar
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from hashlib import sha256
+
+from nassl.ocsp_response import OcspResponse
+from nassl.ocsp_response import OcspResponseNotTrustedError
+from sslyze.plugins.utils.trust_store.trust_store import TrustStore
+from typing import Optional
+from typing import Text
+
+
+class OcspVerificationCache(object):
+    """Per-process cache of the results of verifying OCSP responses against a trust store.
+
+    Many servers staple the same OCSP responses (for example when they share a certificate) that were signed by the same
+    few responders; the signature of each response only needs to be checked once per trust store, until the response
+    expires.
+    """
+
+    MAX_ENTRIES_NB = 5000
+
+    # How long to keep the result for a response that has no nextUpdate field or an unexpected one, in seconds
+    DEFAULT_TTL = 3600
+
+    _ENTRIES = OrderedDict()  # type: OrderedDict
+    _LOCK = threading.Lock()
+
+    @classmethod
+    def is_response_trusted(cls, ocsp_response, trust_store):
+        # type: (OcspResponse, TrustStore) -> bool
+        """Verify that the OCSP response is signed by a responder trusted by the supplied trust store.
+        """
+        # nassl does not expose the DER-encoded response, so the entries are keyed on OpenSSL's text dump of the
+        # response instead; it includes the signature so two different responses cannot share the same entry
+        response_text = ocsp_response.as_text()
+        entry_key = (sha256(response_text.encode('utf-8')).digest(), trust_store.path)
+        now = time.time()
+        with cls._LOCK:
+            cached_entry = cls._ENTRIES.get(entry_key)
+            if cached_entry is not None:
+                is_trusted, expiration_time = cached_entry
+                if now < expiration_time:
+                    return is_trusted
+                del cls._ENTRIES[entry_key]
+
+        try:
+            ocsp_response.verify(trust_store.path)
+            is_trusted = True
+        except OcspResponseNotTrustedError:
+            is_trusted = False
+
+        expiration_time = cls._get_next_update_timestamp(ocsp_response)
+        if expiration_time is None:
+            expiration_time = now + cls.DEFAULT_TTL
+
+        with cls._LOCK:
+            cls._ENTRIES[entry_key] = (is_trusted, expiration_time)
+            if len(cls._ENTRIES) > cls.MAX_ENTRIES_NB:
+                cls._ENTRIES.popitem(last=False)
+        return is_trusted
+
+    @staticmethod
+    def _get_next_update_timestamp(ocsp_response):
+        # type: (OcspResponse) -> Optional[float]
+        try:
+            next_update = ocsp_response.as_dict()['responses'][0]['nextUpdate']
+        except (KeyError, IndexError):
+            return None
+        return OcspVerificationCache._parse_openssl_time(next_update)
+
+    @staticmethod
+    def _parse_openssl_time(openssl_time):
+        # type: (Optional[Text]) -> Optional[float]
+        """Parse a time printed by OpenSSL, such as "Nov  9 12:00:00 2017 GMT", into a timestamp.
+        """
+        if not openssl_time:
+            return None
+        try:
+            parsed_time = datetime.strptime(' '.join(openssl_time.split()), '%b %d %H:%M:%S %Y GMT')
+        except ValueError:
+            return None
+        return float(calendar.timegm(parsed_time.utctimetuple()))
+
+    @classmethod
+    def clear(cls):
+        # type: () -> None
+        with cls._LOCK:
+            cls._ENTRIES.clear()
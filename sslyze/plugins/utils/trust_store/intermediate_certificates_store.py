@@ -0,0 +1,177 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import binascii
+import io
+import os
+import threading
+
+from cryptography.hazmat.primitives import hashes
+from cryptography.hazmat.primitives.serialization import Encoding
+from cryptography.x509.base import Certificate
+from cryptography.x509.extensions import ExtensionNotFound
+from cryptography.x509.name import Name
+from cryptography.x509.oid import ExtensionOID
+from sslyze.plugins.utils.certificate_parse_cache import CertificateParseCache
+from sslyze.plugins.utils.trust_store.trust_store_index import TrustStoreIndex
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Set
+from typing import Text
+
+
+class IntermediateCertificatesStore(object):
+    """Pool of the intermediate CA certificates that were sent by the servers scanned so far.
+
+    It is used to complete the certificate chains of servers that do not send all the intermediate certificates, without
+    having to download them (using the Authority Information Access extension). The certificates are indexed by subject
+    in memory; if a folder was set using set_path(), they are also saved there as DER files so that they are shared with
+    the other processes and re-used by later scans. The folder is only readable by the current user as the certificates
+    it contains are used to build chains.
+    """
+
+    DEFAULT_PATH = os.path.join(os.path.expanduser('~'), '.sslyze', 'intermediate-certificates')
+
+    _CERTIFICATE_FILE_EXTENSION = '.der'
+
+    # Nothing is written to disk unless a folder was explicitly set
+    _path = None  # type: Optional[Text]
+    _subject_hash_to_certificates = {}  # type: Dict[bytes, List[Certificate]]
+    _known_file_names = set()  # type: Set[Text]
+    _folder_mtime = None  # type: Optional[float]
+    _lock = threading.Lock()
+
+    @classmethod
+    def set_path(cls, path):
+        # type: (Optional[Text]) -> None
+        """Change the folder where the intermediate certificates are saved; None to only keep them in memory.
+        """
+        with cls._lock:
+            if path == cls._path:
+                return
+            cls._path = path
+            cls._reset()
+
+    @classmethod
+    def clear(cls):
+        # type: () -> None
+        """Forget about the certificates loaded in memory; the files that were saved are left untouched.
+        """
+        with cls._lock:
+            cls._reset()
+
+    @classmethod
+    def _reset(cls):
+        # type: () -> None
+        cls._subject_hash_to_certificates = {}
+        cls._known_file_names = set()
+        cls._folder_mtime = None
+
+    @staticmethod
+    def _is_intermediate_certificate(certificate):
+        # type: (Certificate) -> bool
+        if certificate.subject == certificate.issuer:
+            # Root certificates have to come from a trust store
+            return False
+        try:
+            basic_constraints_ext = certificate.extensions.get_extension_for_oid(ExtensionOID.BASIC_CONSTRAINTS)
+        except ExtensionNotFound:
+            return False
+        return basic_constraints_ext.value.ca
+
+    @classmethod
+    def add_certificates(cls, certificate_chain):
+        # type: (List[Certificate]) -> None
+        """Save the intermediate CA certificates found in a certificate chain sent by a server.
+        """
+        for certificate in certificate_chain:
+            try:
+                if not cls._is_intermediate_certificate(certificate):
+                    continue
+                subject_hash = TrustStoreIndex.hash_name(certificate.subject)
+            except ValueError:
+                # Certificate with extensions or a subject that cryptography cannot parse
+                continue
+
+            file_name = '{}{}'.format(binascii.hexlify(certificate.fingerprint(hashes.SHA256())).decode('ascii'),
+                                       cls._CERTIFICATE_FILE_EXTENSION)
+            with cls._lock:
+                if file_name in cls._known_file_names:
+                    continue
+                cls._known_file_names.add(file_name)
+                cls._subject_hash_to_certificates.setdefault(subject_hash, []).append(certificate)
+                path = cls._path
+
+            if path is None:
+                continue
+            try:
+                cls._write_certificate_file(path, file_name, certificate.public_bytes(Encoding.DER))
+            except (IOError, OSError):
+                # The certificate can still be used by this process
+                pass
+
+    @classmethod
+    def _write_certificate_file(cls, folder_path, file_name, der_certificate):
+        # type: (Text, Text, bytes) -> None
+        if not os.path.isdir(folder_path):
+            try:
+                os.makedirs(folder_path, 0o700)
+            except OSError:
+                # Created by another process in the meantime
+                if not os.path.isdir(folder_path):
+                    raise
+
+        certificate_path = os.path.join(folder_path, file_name)
+        if os.path.exists(certificate_path):
+            return
+
+        # Write the file atomically as other processes may be reading the folder
+        temp_path = '{}.{}.tmp'.format(certificate_path, os.getpid())
+        with io.open(temp_path, 'wb') as certificate_file:
+            certificate_file.write(der_certificate)
+        try:
+            os.rename(temp_path, certificate_path)
+        except OSError:
+            # Already saved by another process
+            os.remove(temp_path)
+
+    @classmethod
+    def get_certificates_with_subject(cls, subject):
+        # type: (Name) -> List[Certificate]
+        subject_hash = TrustStoreIndex.hash_name(subject)
+        with cls._lock:
+            certificates = cls._subject_hash_to_certificates.get(subject_hash)
+            if certificates is None:
+                # Other processes may have saved new certificates since the folder was last loaded
+                cls._load_new_certificate_files()
+                certificates = cls._subject_hash_to_certificates.get(subject_hash, [])
+            return list(certificates)
+
+    @classmethod
+    def _load_new_certificate_files(cls):
+        # type: () -> None
+        if cls._path is None:
+            return
+        try:
+            folder_mtime = os.stat(cls._path).st_mtime
+        except OSError:
+            # Nothing was saved yet
+            return
+        if folder_mtime == cls._folder_mtime:
+            return
+        cls._folder_mtime = folder_mtime
+
+        for file_name in os.listdir(cls._path):
+            if not file_name.endswith(cls._CERTIFICATE_FILE_EXTENSION) or file_name in cls._known_file_names:
+                continue
+            cls._known_file_names.add(file_name)
+            try:
+                with io.open(os.path.join(cls._path, file_name), 'rb') as certificate_file:
+                    certificate = CertificateParseCache.get_certificate_from_der(certificate_file.read())
+                subject_hash = TrustStoreIndex.hash_name(certificate.subject)
+            except (IOError, ValueError):
+                # Corrupted or unreadable file
+                continue
+            cls._subject_hash_to_certificates.setdefault(subject_hash, []).append(certificate)
@@ -2,14 +2,19 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
 
-import io
-from cryptography.x509.base import load_pem_x509_certificate
-from cryptography.hazmat.backends import default_backend
+from cryptography.exceptions import InvalidSignature
+from cryptography.exceptions import UnsupportedAlgorithm
+from cryptography.hazmat.primitives.asymmetric.dsa import DSAPublicKey
+from cryptography.hazmat.primitives.asymmetric.ec import ECDSA
+from cryptography.hazmat.primitives.asymmetric.ec import EllipticCurvePublicKey
+from cryptography.hazmat.primitives.asymmetric.padding import PKCS1v15
+from cryptography.hazmat.primitives.asymmetric.rsa import RSAPublicKey
 from cryptography.x509.base import Certificate
-from cryptography.x509.name import Name
 from cryptography.x509.extensions import ExtensionNotFound
 from cryptography.x509.oid import ObjectIdentifier
 from cryptography.x509.oid import ExtensionOID
+from sslyze.plugins.utils.trust_store.intermediate_certificates_store import IntermediateCertificatesStore
+from sslyze.plugins.utils.trust_store.trust_store_index import TrustStoreIndex
 from typing import Dict
 from typing import List
 from typing import Optional
@@ -36,7 +41,8 @@ def __init__(self, path, name, version, ev_oids=None):
         self._ev_oids = []
         self.__parse_ev_oids()
 
-        self._subject_to_certificate_dict = None
+        # The index of the trust store's certificates, built when first needed
+        self._index = None  # type: Optional[TrustStoreIndex]
 
     def __eq__(self, other):
         # type: (TrustStore) -> bool
@@ -50,8 +56,8 @@ def __parse_ev_oids(self):
 
     def __getstate__(self):
         pickable_dict = self.__dict__.copy()
-        # Remove non-pickable entries
-        pickable_dict['_subject_to_certificate_dict'] = None
+        # Remove non-pickable entries; the index only holds DER bytes and is sent along so the other process does not
+        # have to parse the PEM file again
         pickable_dict['_ev_oids'] = []
         return pickable_dict
 
@@ -77,43 +83,28 @@ def is_extended_validation(self, certificate):
                 return True
         return False
 
-    @staticmethod
-    def _compute_subject_certificate_dict(path):
-        # type: (Text) -> Dict[Name, Certificate]
-        cert_dict = {}
-        with io.open(path, encoding='utf-8') as store_file:
-            store_content = store_file.read()
-            # Each certificate is separated by -----BEGIN CERTIFICATE-----
-            pem_cert_list = store_content.split('-----BEGIN CERTIFICATE-----')[1::]
-            pem_cert_nb = 0
-            for pem_split in pem_cert_list:
-                # Remove PEM comments as they may cause Unicode errors
-                final_pem = '-----BEGIN CERTIFICATE-----{}-----END CERTIFICATE-----'.format(
-                    pem_split.split('-----END CERTIFICATE-----')[0]
-                ).strip()
-                cert = load_pem_x509_certificate(final_pem.encode(encoding='ascii'), default_backend())
-                # Store a dictionary of subject->certificate for easy lookup
-                try:
-                    cert_dict[cert.subject] = cert
-                except ValueError:
-                    if pem_cert_nb == 311:
-                        # Cert number 311 in the Mozilla store can't be parsed by cryptography
-                        continue
-                    raise
-
-                pem_cert_nb += 1
-
-        return cert_dict
-
-    def _get_certificate_with_subject(self, certificate_subject):
-        # type: (Name) -> Certificate
-        if self._subject_to_certificate_dict is None:
-            self._subject_to_certificate_dict = self._compute_subject_certificate_dict(self.path)
-        return self._subject_to_certificate_dict.get(certificate_subject, None)
+    def _get_index(self):
+        # type: () -> TrustStoreIndex
+        if self._index is None:
+            self._index = TrustStoreIndex(self.path)
+        return self._index
+
+    def _get_anchor_certificate(self, certificate):
+        # type: (Certificate) -> Optional[Certificate]
+        """Return the certificate of the trust store that issued the supplied certificate, if any.
+        """
+        anchor_candidates = self._get_index().get_certificates_with_subject(certificate.issuer)
+        if not anchor_candidates:
+            return None
+        # Re-keyed or cross-signed roots share the same subject
+        return self._select_issuer_certificate(certificate, anchor_candidates)
 
     @staticmethod
-    def _is_certificate_chain_order_valid(certificate_chain):
+    def is_certificate_chain_order_valid(certificate_chain):
         # type: (List[Certificate]) -> bool
+        """Were the certificates sent in the right order, starting with the leaf certificate, each certificate being
+        followed by the one that issued it?
+        """
         previous_issuer = None
         for index, cert in enumerate(certificate_chain):
             current_subject = cert.subject
@@ -129,34 +120,89 @@ def _is_certificate_chain_order_valid(certificate_chain):
                 previous_issuer = u"missing issuer {}".format(index)
         return True
 
+    # Give up on chains longer than this, which are most likely loops of cross-signed certificates
+    _MAX_CHAIN_LENGTH = 10
+
     def build_verified_certificate_chain(self, received_certificate_chain):
         # type: (List[Certificate]) -> List[Certificate]
         """Try to figure out the verified chain by finding the anchor/root CA the received chain chains up to in the
         trust store.
 
-        This will not clean the certificate chain if additional/invalid certificates were sent and the signatures and
-        fields (notBefore, etc.) are not verified.
-        """
-        # The certificates must have been sent in the correct order or we give up
-        if not self._is_certificate_chain_order_valid(received_certificate_chain):
-            raise InvalidCertificateChainOrderError()
+        The certificates sent after the leaf certificate can be in any order. If the server did not send some of the
+        intermediate certificates, the ones sent by previously scanned servers are used to complete the chain (see
+        IntermediateCertificatesStore).
 
+        This will not clean the certificate chain if additional/invalid certificates were sent and the fields
+        (notBefore, etc.) are not verified.
+        """
         # TODO: OpenSSL 1.1.0 has SSL_get0_verified_chain() to do this directly
-        verified_certificate_chain = []
-        anchor_cert = None
-        # Assume that the certificates were sent in the correct order or give up
-        for cert in received_certificate_chain:
-            anchor_cert = self._get_certificate_with_subject(cert.issuer)
-            verified_certificate_chain.append(cert)
+        received_subject_hash_to_certificates = {}  # type: Dict[bytes, List[Certificate]]
+        for cert in received_certificate_chain[1:]:
+            received_subject_hash_to_certificates.setdefault(TrustStoreIndex.hash_name(cert.subject), []).append(cert)
+
+        verified_certificate_chain = [received_certificate_chain[0]]
+        while len(verified_certificate_chain) <= self._MAX_CHAIN_LENGTH:
+            current_cert = verified_certificate_chain[-1]
+            anchor_cert = self._get_anchor_certificate(current_cert)
             if anchor_cert:
                 verified_certificate_chain.append(anchor_cert)
+                return verified_certificate_chain
+
+            if current_cert.issuer == current_cert.subject:
+                # Self-signed certificate that is not in the trust store
                 break
 
-        if anchor_cert is None:
-            # Could not build the verified chain
-            raise AnchorCertificateNotInTrustStoreError()
+            # Look for the issuer in the certificates sent by the server first
+            issuer_subject_hash = TrustStoreIndex.hash_name(current_cert.issuer)
+            issuer_candidates = received_subject_hash_to_certificates.get(issuer_subject_hash, [])
+            issuer_candidates = [cert for cert in issuer_candidates if cert not in verified_certificate_chain]
+            if not issuer_candidates:
+                issuer_candidates = [
+                    cert for cert in IntermediateCertificatesStore.get_certificates_with_subject(current_cert.issuer)
+                    if cert not in verified_certificate_chain
+                ]
+            if not issuer_candidates:
+                break
 
-        return verified_certificate_chain
+            verified_certificate_chain.append(self._select_issuer_certificate(current_cert, issuer_candidates))
+
+        # Could not build the verified chain
+        raise AnchorCertificateNotInTrustStoreError()
+
+    @classmethod
+    def _select_issuer_certificate(cls, certificate, issuer_candidates):
+        # type: (Certificate, List[Certificate]) -> Certificate
+        if len(issuer_candidates) > 1:
+            # Several certificates with the same subject (for example after a key rollover); pick the one that actually
+            # signed the certificate
+            for candidate in issuer_candidates:
+                if cls._is_signature_valid(certificate, candidate):
+                    return candidate
+        return issuer_candidates[0]
+
+    @staticmethod
+    def _is_signature_valid(certificate, issuer_certificate):
+        # type: (Certificate, Certificate) -> bool
+        """Only used to pick an issuer among certificates with the same subject; the actual validation of the chain is
+        done by OpenSSL during the handshake. Signatures that cannot be checked here (RSA-PSS, Ed25519, etc.) are
+        reported as invalid.
+        """
+        try:
+            issuer_public_key = issuer_certificate.public_key()
+            if isinstance(issuer_public_key, RSAPublicKey):
+                issuer_public_key.verify(certificate.signature, certificate.tbs_certificate_bytes, PKCS1v15(),
+                                         certificate.signature_hash_algorithm)
+            elif isinstance(issuer_public_key, EllipticCurvePublicKey):
+                issuer_public_key.verify(certificate.signature, certificate.tbs_certificate_bytes,
+                                         ECDSA(certificate.signature_hash_algorithm))
+            elif isinstance(issuer_public_key, DSAPublicKey):
+                issuer_public_key.verify(certificate.signature, certificate.tbs_certificate_bytes,
+                                         certificate.signature_hash_algorithm)
+            else:
+                return False
+        except (InvalidSignature, UnsupportedAlgorithm, ValueError, TypeError):
+            return False
+        return True
 
 
 class CouldNotBuildVerifiedChainError(ValueError):
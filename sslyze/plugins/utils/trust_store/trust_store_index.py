@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+"""Index of a PEM trust store's root certificates, which can be searched without parsing all the certificates again.
+"""
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import hashlib
+import io
+
+from cryptography.hazmat.backends import default_backend
+from cryptography.hazmat.primitives.serialization import Encoding
+from cryptography.hazmat.primitives.serialization import PublicFormat
+from cryptography.x509.base import Certificate
+from cryptography.x509.base import load_pem_x509_certificate
+from cryptography.x509.name import Name
+from sslyze.plugins.utils.certificate_parse_cache import CertificateParseCache
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Text
+
+
+class TrustStoreIndex(object):
+    """The DER-encoded root certificates of a trust store, indexed by the hashes of their subject and public key.
+
+    The index is built in memory from the PEM file when the trust store is first used, and is pickled along with the
+    trust store so that worker processes do not have to build it again. Looking up a certificate by subject or public
+    key then only requires parsing the certificate that was found. Nothing is written to disk, so that an index cannot
+    be tampered with or get out of date with the PEM file.
+    """
+
+    def __init__(self, pem_path):
+        # type: (Text) -> None
+        """Parse the supplied PEM trust store file and index its certificates.
+        """
+        self.pem_path = pem_path
+        self._subject_hash_to_certificates_der = {}  # type: Dict[bytes, List[bytes]]
+        self._spki_hash_to_certificates_der = {}  # type: Dict[bytes, List[bytes]]
+        for certificate in self._parse_pem_file(pem_path):
+            certificate_der = certificate.public_bytes(Encoding.DER)
+            self._subject_hash_to_certificates_der.setdefault(self.hash_name(certificate.subject), []).append(
+                certificate_der
+            )
+            self._spki_hash_to_certificates_der.setdefault(self.hash_public_key(certificate), []).append(
+                certificate_der
+            )
+
+    def __len__(self):
+        # type: () -> int
+        return sum([len(certificates_der) for certificates_der in self._subject_hash_to_certificates_der.values()])
+
+    @staticmethod
+    def hash_name(name):
+        # type: (Name) -> bytes
+        """Hash a certificate's subject or issuer so that two names that are equal get the same hash, regardless of the
+        ASN.1 string types used for encoding them.
+        """
+        normalized_name = '\n'.join(['{}={}'.format(attribute.oid.dotted_string, attribute.value)
+                                     for attribute in name])
+        return hashlib.sha256(normalized_name.encode('utf-8')).digest()
+
+    @staticmethod
+    def hash_public_key(certificate):
+        # type: (Certificate) -> bytes
+        spki_bytes = certificate.public_key().public_bytes(Encoding.DER, PublicFormat.SubjectPublicKeyInfo)
+        return hashlib.sha256(spki_bytes).digest()
+
+    def get_certificates_with_subject(self, subject):
+        # type: (Name) -> List[Certificate]
+        return [self._get_certificate(certificate_der)
+                for certificate_der in self._subject_hash_to_certificates_der.get(self.hash_name(subject), [])]
+
+    def get_certificate_with_subject(self, subject):
+        # type: (Name) -> Optional[Certificate]
+        certificates = self.get_certificates_with_subject(subject)
+        return certificates[0] if certificates else None
+
+    def get_certificates_with_public_key_hash(self, spki_hash):
+        # type: (bytes) -> List[Certificate]
+        return [self._get_certificate(certificate_der)
+                for certificate_der in self._spki_hash_to_certificates_der.get(spki_hash, [])]
+
+    @staticmethod
+    def _get_certificate(certificate_der):
+        # type: (bytes) -> Certificate
+        # The same root certificates are found in most trust stores, so they are shared using the parse cache
+        return CertificateParseCache.get_certificate_from_der(certificate_der)
+
+    @classmethod
+    def _parse_pem_file(cls, pem_path):
+        # type: (Text) -> List[Certificate]
+        certificates = []
+        with io.open(pem_path, encoding='utf-8') as store_file:
+            store_content = store_file.read()
+
+        # Each certificate is separated by -----BEGIN CERTIFICATE-----
+        pem_cert_list = store_content.split('-----BEGIN CERTIFICATE-----')[1::]
+        for pem_cert_nb, pem_split in enumerate(pem_cert_list):
+            # Remove PEM comments as they may cause Unicode errors
+            final_pem = '-----BEGIN CERTIFICATE-----{}-----END CERTIFICATE-----'.format(
+                pem_split.split('-----END CERTIFICATE-----')[0]
+            ).strip()
+            cert = load_pem_x509_certificate(final_pem.encode(encoding='ascii'), default_backend())
+            try:
+                # Make sure the subject can be parsed
+                cls.hash_name(cert.subject)
+            except ValueError:
+                if pem_cert_nb == 311:
+                    # Cert number 311 in the Mozilla store can't be parsed by cryptography
+                    continue
+                raise
+            certificates.append(cert)
+
+        return certificates
@@ -4,10 +4,15 @@
 
 from os.path import join
 import inspect
+import os
 import sys
+import threading
 from os.path import abspath, realpath, dirname
 from sslyze.plugins.utils.trust_store.trust_store import TrustStore
+from typing import Dict
 from typing import List
+from typing import Text
+from typing import Tuple
 
 
 def _get_script_dir(follow_symlinks=True):
@@ -70,3 +75,34 @@ def get_main(cls):
         It is used for additional things including OCSP and EV validation.
         """
         return cls._MAIN_STORE
+
+    # Custom trust stores supplied by the user, keyed by path, modification time and size so that an updated file is
+    # parsed again
+    _CUSTOM_STORES = {}  # type: Dict[Tuple[Text, float, int], TrustStore]
+    _CUSTOM_STORES_LOCK = threading.Lock()
+
+    @classmethod
+    def get_custom_trust_store(cls, path, name, version):
+        # type: (Text, Text, Text) -> TrustStore
+        """Return a trust store for the supplied PEM file, re-using the one created for a previous scan command if the
+        file did not change, so that its certificates only get parsed once per process.
+
+        Raises:
+            IOError: If the file does not exist.
+        """
+        real_path = os.path.realpath(path)
+        if not os.path.isfile(real_path):
+            raise IOError('Could not open trust store file at "{}"'.format(path))
+
+        file_stat = os.stat(real_path)
+        store_key = (real_path, file_stat.st_mtime, file_stat.st_size)
+        with cls._CUSTOM_STORES_LOCK:
+            trust_store = cls._CUSTOM_STORES.get(store_key)
+            if trust_store is None or trust_store.name != name or trust_store.version != version:
+                # Forget about the previous versions of this file
+                for existing_key in [key for key in cls._CUSTOM_STORES if key[0] == real_path]:
+                    del cls._CUSTOM_STORES[existing_key]
+
+                trust_store = TrustStore(real_path, name, version)
+                cls._CUSTOM_STORES[store_key] = trust_store
+        return trust_store
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+from xml.etree.ElementTree import Element
+
+from sslyze.plugins import plugin_base
+from sslyze.plugins.compression_plugin import CompressionPlugin, CompressionScanCommand
+from sslyze.plugins.fallback_scsv_plugin import FallbackScsvPlugin, FallbackScsvScanCommand
+from sslyze.plugins.heartbleed_plugin import HeartbleedPlugin, HeartbleedScanCommand
+from sslyze.plugins.openssl_ccs_injection_plugin import OpenSslCcsInjectionPlugin, OpenSslCcsInjectionScanCommand
+from sslyze.plugins.plugin_base import PluginScanCommand
+from sslyze.plugins.plugin_base import PluginScanResult
+from sslyze.plugins.session_renegotiation_plugin import SessionRenegotiationPlugin, SessionRenegotiationScanCommand
+from sslyze.server_connectivity import ServerConnectivityInfo
+from sslyze.utils.thread_pool import ThreadPool
+from typing import Dict
+from typing import List
+from typing import Tuple
+from typing import Type
+
+
+class VulnerabilitySweepScanCommand(PluginScanCommand):
+    """Test the server(s) for Heartbleed, OpenSSL CCS injection, Deflate compression, TLS_FALLBACK_SCSV support and
+    insecure renegotiation, using fewer connections than when running each of the corresponding scan commands.
+    """
+
+    @classmethod
+    def get_cli_argument(cls):
+        return 'vuln_sweep'
+
+    @classmethod
+    def get_title(cls):
+        return 'Vulnerability Sweep'
+
+
+class VulnerabilitySweepPlugin(plugin_base.Plugin):
+    """Run the vulnerability checks of several plugins together, sharing connections where the protocol allows it.
+
+    The Heartbleed, CCS injection and downgrade checks each need their own connection as they alter the handshake, so
+    they are run in parallel. The renegotiation checks share a single connection which uses the default connection
+    settings and the legacy OpenSSL client, so it also reveals compression support via the HandshakeFactsCache; the
+    compression check is then run after it, without opening another connection.
+    """
+
+    # Each group of checks is run sequentially, in a separate thread
+    _CHECK_GROUPS = [
+        [(HeartbleedPlugin, HeartbleedScanCommand)],
+        [(OpenSslCcsInjectionPlugin, OpenSslCcsInjectionScanCommand)],
+        [(FallbackScsvPlugin, FallbackScsvScanCommand)],
+        [(SessionRenegotiationPlugin, SessionRenegotiationScanCommand), (CompressionPlugin, CompressionScanCommand)],
+    ]  # type: List[List[Tuple[Type[plugin_base.Plugin], Type[PluginScanCommand]]]]
+
+    @classmethod
+    def get_available_commands(cls):
+        return [VulnerabilitySweepScanCommand]
+
+    def process_task(self, server_info, scan_command):
+        # type: (ServerConnectivityInfo, VulnerabilitySweepScanCommand) -> VulnerabilitySweepScanResult
+        thread_pool = ThreadPool()
+        for check_group in self._CHECK_GROUPS:
+            thread_pool.add_job((self._run_checks, (server_info, check_group)))
+        thread_pool.start(nb_threads=len(self._CHECK_GROUPS))
+
+        check_results = {}  # type: Dict[Type[PluginScanCommand], PluginScanResult]
+        for (_, group_results) in thread_pool.get_result():
+            for check_result in group_results:
+                check_results[check_result.scan_command.__class__] = check_result
+
+        for (_, exception) in thread_pool.get_error():
+            # Should never happen as errors are caught for each check
+            thread_pool.join()
+            raise exception
+
+        thread_pool.join()
+
+        return VulnerabilitySweepScanResult(server_info, scan_command,
+                                            check_results[HeartbleedScanCommand],
+                                            check_results[OpenSslCcsInjectionScanCommand],
+                                            check_results[CompressionScanCommand],
+                                            check_results[FallbackScsvScanCommand],
+                                            check_results[SessionRenegotiationScanCommand])
+
+    @staticmethod
+    def _run_checks(server_info, check_group):
+        # type: (ServerConnectivityInfo, List[Tuple[Type[plugin_base.Plugin], Type[PluginScanCommand]]]) -> List[PluginScanResult]
+        # Imported here to avoid a circular import as the concurrent scanner loads all the plugins
+        from sslyze.concurrent_scanner import PluginRaisedExceptionScanResult
+
+        group_results = []
+        for plugin_class, scan_command_class in check_group:
+            check_command = scan_command_class()
+            try:
+                check_result = plugin_class().process_task(server_info, check_command)
+            except Exception as e:
+                # Report the error in the check's result, the same way as when the check's own command is run
+                check_result = PluginRaisedExceptionScanResult(server_info, check_command, e)
+            group_results.append(check_result)
+        return group_results
+
+
+class VulnerabilitySweepScanResult(PluginScanResult):
+    """The result of running a VulnerabilitySweepScanCommand on a specific server.
+
+    Each attribute is the result of the corresponding scan command, or a PluginRaisedExceptionScanResult if the check
+    raised an exception.
+
+    Attributes:
+        heartbleed_result (HeartbleedScanResult): The result of the Heartbleed check.
+        openssl_ccs_result (OpenSslCcsInjectionScanResult): The result of the OpenSSL CCS injection check.
+        compression_result (CompressionScanResult): The result of the Deflate compression check.
+        fallback_result (FallbackScsvScanResult): The result of the TLS_FALLBACK_SCSV check.
+        reneg_result (SessionRenegotiationScanResult): The result of the session renegotiation check.
+    """
+
+    def __init__(
+            self,
+            server_info,            # type: ServerConnectivityInfo
+            scan_command,           # type: VulnerabilitySweepScanCommand
+            heartbleed_result,      # type: PluginScanResult
+            openssl_ccs_result,     # type: PluginScanResult
+            compression_result,     # type: PluginScanResult
+            fallback_result,        # type: PluginScanResult
+            reneg_result            # type: PluginScanResult
+    ):
+        # type: (...) -> None
+        super(VulnerabilitySweepScanResult, self).__init__(server_info, scan_command)
+        self.heartbleed_result = heartbleed_result
+        self.openssl_ccs_result = openssl_ccs_result
+        self.compression_result = compression_result
+        self.fallback_result = fallback_result
+        self.reneg_result = reneg_result
+
+    def _get_check_results(self):
+        # type: () -> List[PluginScanResult]
+        return [self.heartbleed_result, self.openssl_ccs_result, self.compression_result, self.fallback_result,
+                self.reneg_result]
+
+    def as_text(self):
+        # Same output as running each of the scan commands
+        result_txt = []
+        for check_result in self._get_check_results():
+            if result_txt:
+                result_txt.append('')
+            result_txt.extend(check_result.as_text())
+        return result_txt
+
+    def as_xml(self):
+        xml_result = Element(self.scan_command.get_cli_argument(), title=self.scan_command.get_title())
+        for check_result in self._get_check_results():
+            xml_result.append(check_result.as_xml())
+        return xml_result
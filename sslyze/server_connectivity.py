@@ -5,19 +5,25 @@
 from __future__ import unicode_literals
 
 import socket
+import uuid
 
 from enum import Enum
 from typing import Iterable
 from typing import List
 from typing import Optional
+from nassl.legacy_ssl_client import LegacySslClient
 from nassl.ssl_client import ClientCertificateRequested, OpenSslVersionEnum
 
 from sslyze.ssl_settings import TlsWrappedProtocolEnum, ClientAuthenticationCredentials, HttpConnectTunnelingSettings
+from sslyze.ssl_settings import HttpConnectProxyPoolSettings
 from typing import Text
 from typing import Tuple
+from typing import Union
 from sslyze.utils.ssl_connection import StartTLSError, ProxyError, SSLConnection, SMTPConnection, XMPPConnection, \
     XMPPServerConnection, POP3Connection, IMAPConnection, FTPConnection, LDAPConnection, RDPConnection, \
     PostgresConnection, HTTPSConnection
+from sslyze.utils.connection_trace import ConnectionPhaseEnum
+from sslyze.utils.handshake_facts_cache import HandshakeFactsCache
 from sslyze.utils.thread_pool import ThreadPool
 
 
@@ -35,6 +41,51 @@ class ClientAuthenticationServerConfigurationEnum(Enum):
     REQUIRED = 3
 
 
+class ConnectivityHandshakeSnapshot(object):
+    """What was negotiated during the successful handshake of the connectivity test, kept so that plugins and output
+    generators do not need to connect to the server again to retrieve it.
+
+    Attributes:
+        ssl_version (OpenSslVersionEnum): The SSL/TLS version that was used.
+        cipher_name (Text): The OpenSSL name of the cipher suite that was negotiated.
+        handshake_duration (float): How long the TLS handshake took, in seconds.
+        is_ocsp_response_stapled (bool): True if the server stapled an OCSP response to the handshake.
+        are_legacy_client_facts_known (bool): True if the handshake was performed using the legacy OpenSSL client, so
+            that compression_name and supports_secure_renegotiation are known.
+        compression_name (Optional[Text]): The compression method that was negotiated; None if compression was not
+            enabled or is unknown.
+        supports_secure_renegotiation (Optional[bool]): True if the server supports secure renegotiation; None if
+            unknown.
+    """
+
+    def __init__(self, ssl_connection, ssl_version):
+        # type: (SSLConnection, OpenSslVersionEnum) -> None
+        ssl_client = ssl_connection.ssl_client
+        self.ssl_version = ssl_version
+        self.cipher_name = ssl_client.get_current_cipher_name()
+        self.handshake_duration = ssl_connection.connection_trace.get_total_duration(
+            ConnectionPhaseEnum.TLS_HANDSHAKE
+        )
+        self.is_ocsp_response_stapled = ssl_client.get_tlsext_status_ocsp_resp() is not None
+
+        self.are_legacy_client_facts_known = isinstance(ssl_client, LegacySslClient)
+        self.compression_name = None  # type: Optional[Text]
+        self.supports_secure_renegotiation = None  # type: Optional[bool]
+        if self.are_legacy_client_facts_known:
+            self.compression_name = ssl_client.get_current_compression_method()
+            self.supports_secure_renegotiation = ssl_client.get_secure_renegotiation_support()
+
+        # Private so that the certificates do not bloat the output of each server's info
+        self._certificate_chain_as_pem = [x509_cert.as_pem() for x509_cert in ssl_client.get_peer_cert_chain()]
+
+    @property
+    def certificate_chain_as_pem(self):
+        # type: () -> List[Text]
+        """The certificate chain sent by the server, as PEM-formatted certificates.
+        """
+        return self._certificate_chain_as_pem
+
+
 class ServerConnectivityInfo(object):
     """An object encapsulating all the settings (hostname, port, SSL version, etc.) needed to successfully connect to a
     specific SSL/TLS server.
@@ -81,7 +132,7 @@ def __init__(
             tls_server_name_indication=None,                        # type: Optional[Text]
             xmpp_to_hostname=None,                                  # type: Optional[Text]
             client_auth_credentials=None,                           # type: Optional[ClientAuthenticationCredentials]
-            http_tunneling_settings=None                            # type: Optional[HttpConnectTunnelingSettings]
+            http_tunneling_settings=None    # type: Optional[Union[HttpConnectTunnelingSettings, HttpConnectProxyPoolSettings]]
             ):
         # type: (...) -> None
         """Constructor to specify how to connect to a server to be scanned.
@@ -110,9 +161,9 @@ def __init__(
             client_auth_credentials (Optional[ClientAuthenticationCredentials]): The client certificate and private key
                 needed to perform mutual authentication with the server. If not supplied, sslyze will attempt to connect
                 to the server without performing mutual authentication.
-            http_tunneling_settings (Optional[HttpConnectTunnelingSettings]): The HTTP proxy configuration to use in
-                order to tunnel the scans through a proxy. If not supplied, sslyze will run the scans by directly
-                connecting to the server.
+            http_tunneling_settings (Optional[Union[HttpConnectTunnelingSettings, HttpConnectProxyPoolSettings]]): The
+                HTTP proxy configuration to use in order to tunnel the scans through a proxy, or through a pool of
+                proxies. If not supplied, sslyze will run the scans by directly connecting to the server.
 
         Raises:
             ServerConnectivityError: If a DNS lookup was attempted and failed.
@@ -168,6 +219,9 @@ def __init__(
         self.highest_ssl_version_supported = None
         self.ssl_cipher_supported = None
         self.client_auth_requirement = None
+        self.connectivity_snapshot = None  # type: Optional[ConnectivityHandshakeSnapshot]
+        # Identifies the connectivity test that the facts recorded in the HandshakeFactsCache belong to
+        self.connectivity_test_id = None  # type: Optional[Text]
 
     def test_connectivity_to_server(self, network_timeout=None):
         # type: (Optional[int]) -> None
@@ -184,6 +238,9 @@ def test_connectivity_to_server(self, network_timeout=None):
         Raises:
             ServerConnectivityError: If the server was not reachable or an SSL/TLS handshake could not be completed.
         """
+        # What was learnt about the server during a previous connectivity test may no longer be true
+        HandshakeFactsCache.forget_server(self)
+
         client_auth_requirement = ClientAuthenticationServerConfigurationEnum.DISABLED
         ssl_connection = self.get_preconfigured_ssl_connection(override_ssl_version=OpenSslVersionEnum.SSLV23)
 
@@ -215,6 +272,7 @@ def test_connectivity_to_server(self, network_timeout=None):
         # Then try to complete an SSL handshake to figure out the SSL version and cipher supported by the server
         ssl_version_supported = None
         ssl_cipher_supported = None
+        connectivity_snapshot = None
 
         # TODO(AD): Switch to using the protocol discovery logic available in OpenSSL 1.1.0 with TLS_client_method()
         for ssl_version in [OpenSslVersionEnum.TLSV1_2, OpenSslVersionEnum.TLSV1_1, OpenSslVersionEnum.TLSV1,
@@ -224,11 +282,13 @@ def test_connectivity_to_server(self, network_timeout=None):
                 ssl_connection = self.get_preconfigured_ssl_connection(override_ssl_version=ssl_version,
                                                                        should_ignore_client_auth=False)
                 ssl_connection.ssl_client.set_cipher_list(cipher_list)
+                ssl_connection.request_ocsp_stapling()
                 try:
                     # Only do one attempt when testing connectivity
                     ssl_connection.connect(network_timeout=network_timeout, network_max_retries=0)
                     ssl_version_supported = ssl_version
                     ssl_cipher_supported = ssl_connection.ssl_client.get_current_cipher_name()
+                    connectivity_snapshot = ConnectivityHandshakeSnapshot(ssl_connection, ssl_version)
                     break
                 except ClientCertificateRequested:
                     # Connection successful but the servers wants a client certificate which wasn't supplied to sslyze
@@ -240,9 +300,11 @@ def test_connectivity_to_server(self, network_timeout=None):
                     ssl_connection_auth = self.get_preconfigured_ssl_connection(override_ssl_version=ssl_version,
                                                                                 should_ignore_client_auth=True)
                     ssl_connection_auth.ssl_client.set_cipher_list(cipher_list)
+                    ssl_connection_auth.request_ocsp_stapling()
                     try:
                         ssl_connection_auth.connect(network_timeout=network_timeout, network_max_retries=0)
                         ssl_cipher_supported = ssl_connection_auth.ssl_client.get_current_cipher_name()
+                        connectivity_snapshot = ConnectivityHandshakeSnapshot(ssl_connection_auth, ssl_version)
                         client_auth_requirement = ClientAuthenticationServerConfigurationEnum.OPTIONAL
                     except:
                         client_auth_requirement = ClientAuthenticationServerConfigurationEnum.REQUIRED
@@ -265,6 +327,8 @@ def test_connectivity_to_server(self, network_timeout=None):
         self.highest_ssl_version_supported = ssl_version_supported
         self.ssl_cipher_supported = ssl_cipher_supported
         self.client_auth_requirement = client_auth_requirement
+        self.connectivity_snapshot = connectivity_snapshot
+        self.connectivity_test_id = uuid.uuid4().hex
 
     def get_preconfigured_ssl_connection(
             self,
@@ -317,7 +381,9 @@ def get_preconfigured_ssl_connection(
             ssl_connection.set_xmpp_to(self.xmpp_to_hostname)
 
         # Add HTTP tunneling configuration
-        if self.http_tunneling_settings:
+        if isinstance(self.http_tunneling_settings, HttpConnectProxyPoolSettings):
+            ssl_connection.enable_http_connect_proxy_pool(self.http_tunneling_settings)
+        elif self.http_tunneling_settings:
             ssl_connection.enable_http_connect_tunneling(self.http_tunneling_settings.hostname,
                                                          self.http_tunneling_settings.port,
                                                          self.http_tunneling_settings.basic_auth_user,
@@ -331,6 +397,13 @@ def get_preconfigured_ssl_connection(
         if self.ssl_cipher_supported and override_ssl_version is None and should_use_legacy_openssl is None:
             ssl_connection.ssl_client.set_cipher_list(self.ssl_cipher_supported)
 
+        # Share what gets negotiated using the server's default settings with the other plugins
+        if override_ssl_version is None:
+            ssl_connection.handshake_facts_key = HandshakeFactsCache.get_key(
+                self.hostname, self.ip_address, self.port, self.tls_server_name_indication, self.connectivity_test_id,
+                ssl_version
+            )
+
         return ssl_connection
 
 
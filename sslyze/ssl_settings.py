@@ -9,6 +9,7 @@
 from base64 import b64encode
 
 from enum import Enum
+from typing import List
 from typing import Optional
 from typing import Text
 
@@ -124,3 +125,40 @@ def get_basic_auth_header(self):
         if self.basic_auth_user is not None:
             header = b64encode('{0}:{1}'.format(quote(self.basic_auth_user), quote(self.basic_auth_password)))
         return header
+
+
+class HttpConnectProxyPoolSettings(object):
+    """Container for specifying several HTTP Connect Proxies to spread all the traffic across.
+
+    Each connection is tunneled through the least busy proxy of the pool; proxies that cannot be reached are put aside
+    for a while and their connections are sent to the other proxies.
+    """
+
+    def __init__(self, proxies, max_connections_per_proxy=5, unhealthy_proxy_cooldown=30):
+        # type: (List[HttpConnectTunnelingSettings], int, int) -> None
+        """
+        Args:
+            proxies (List[HttpConnectTunnelingSettings]): The settings of each proxy in the pool.
+            max_connections_per_proxy (int): The maximum number of connections to have open at the same time through
+                each proxy, within each scanning process.
+            unhealthy_proxy_cooldown (int): The number of seconds during which a proxy that could not be reached will
+                not be used.
+        """
+        if not proxies:
+            raise ValueError('No proxies supplied')
+        if max_connections_per_proxy < 1:
+            raise ValueError('Invalid maximum number of connections per proxy')
+
+        self.proxies = proxies
+        self.max_connections_per_proxy = max_connections_per_proxy
+        self.unhealthy_proxy_cooldown = unhealthy_proxy_cooldown
+
+    @classmethod
+    def from_urls(cls, proxy_urls, max_connections_per_proxy=5):
+        # type: (List[Text], int) -> HttpConnectProxyPoolSettings
+        return cls([HttpConnectTunnelingSettings.from_url(proxy_url) for proxy_url in proxy_urls],
+                   max_connections_per_proxy)
+
+    def __str__(self):
+        # type: () -> Text
+        return ', '.join(['{}:{}'.format(proxy.hostname, proxy.port) for proxy in self.proxies])
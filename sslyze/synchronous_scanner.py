@@ -6,6 +6,7 @@
 from sslyze.plugins.plugin_base import PluginScanCommand
 from sslyze.plugins.plugins_repository import PluginsRepository
 from sslyze.server_connectivity import ServerConnectivityInfo
+from sslyze.utils.connection_trace import ConnectionTraceCollector
 from sslyze.utils.ssl_connection import SSLConnection
 from typing import Optional
 
@@ -20,15 +21,20 @@ class SynchronousScanner(object):
 
     def __init__(self,
                  network_retries=DEFAULT_NETWORK_RETRIES,
-                 network_timeout=DEFAULT_NETWORK_TIMEOUT):
-        # type: (Optional[int], Optional[int]) -> None
+                 network_timeout=DEFAULT_NETWORK_TIMEOUT,
+                 should_trace_connections=False):
+        # type: (Optional[int], Optional[int], Optional[bool]) -> None
         """Create a scanner for running scanning commands synchronously.
 
         Args:
             network_retries (Optional[int]): How many times SSLyze should retry a connection that timed out.
             network_timeout (Optional[int]): The time until an ongoing connection times out.
+            should_trace_connections (Optional[bool]): Whether to record the timing of every connection opened while
+                running a scan command, into the result's connection_traces and connection_traces_summary
+                attributes.
         """
         self._plugins_repository = PluginsRepository()
+        self._should_trace_connections = should_trace_connections
 
         # Set global network settings
         SSLConnection.set_global_network_settings(network_retries, network_timeout)
@@ -49,4 +55,11 @@ def run_scan_command(self, server_info, scan_command):
         """
         plugin_class = self._plugins_repository.get_plugin_class_for_command(scan_command)
         plugin = plugin_class()
-        return plugin.process_task(server_info, scan_command)
+        if not self._should_trace_connections:
+            return plugin.process_task(server_info, scan_command)
+
+        with ConnectionTraceCollector() as trace_collector:
+            result = plugin.process_task(server_info, scan_command)
+        result.connection_traces = trace_collector.connection_traces
+        result.connection_traces_summary = trace_collector.get_summary()
+        return result
@@ -0,0 +1,199 @@
+# -*- coding: utf-8 -*-
+"""Instrumentation recording where the time goes within each connection opened by SSLyze.
+"""
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import socket
+import threading
+import time
+from contextlib import contextmanager
+
+from enum import Enum
+from typing import Dict
+from typing import Iterator
+from typing import List
+from typing import Optional
+from typing import Text
+
+
+class ConnectionPhaseEnum(Enum):
+    """The successive steps of a connection to the server.
+    """
+    DNS = 1
+    TCP_CONNECT = 2
+    PROXY_CONNECT = 3
+    START_TLS = 4
+    TLS_HANDSHAKE = 5
+    POST_HANDSHAKE_CHECK = 6
+    CLOSE = 7
+
+
+class ConnectionPhaseTiming(object):
+    """The time spent in one phase of a connection.
+
+    Attributes:
+        phase (ConnectionPhaseEnum): The phase of the connection.
+        start_time (float): When the phase started, as a timestamp in seconds.
+        end_time (float): When the phase ended, as a timestamp in seconds.
+        error_message (Optional[Text]): The error that interrupted this phase, if any.
+    """
+
+    def __init__(self, phase, start_time, end_time, error_message=None):
+        # type: (ConnectionPhaseEnum, float, float, Optional[Text]) -> None
+        self.phase = phase
+        self.start_time = start_time
+        self.end_time = end_time
+        self.error_message = error_message
+
+    @property
+    def duration(self):
+        # type: () -> float
+        return self.end_time - self.start_time
+
+
+class ConnectionTrace(object):
+    """The timing and traffic of a single connection to a server.
+
+    Attributes:
+        hostname (Text): The server's hostname.
+        port (int): The server's port.
+        thread_name (Text): The name of the thread that opened the connection.
+        phase_timings (List[ConnectionPhaseTiming]): The phases of the connection, in the order they happened. If the
+            connection was retried, the phases of each attempt are included.
+        retries_nb (int): How many times the connection had to be retried because of a network timeout.
+        bytes_sent (int): The number of bytes sent on the connection's sockets.
+        bytes_received (int): The number of bytes received on the connection's sockets.
+    """
+
+    def __init__(self, hostname, port):
+        # type: (Text, int) -> None
+        self.hostname = hostname
+        self.port = port
+        self.thread_name = threading.current_thread().name
+        self.phase_timings = []  # type: List[ConnectionPhaseTiming]
+        self.retries_nb = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+
+    def add_phase(self, phase, start_time, end_time, error_message=None):
+        # type: (ConnectionPhaseEnum, float, float, Optional[Text]) -> None
+        self.phase_timings.append(ConnectionPhaseTiming(phase, start_time, end_time, error_message))
+
+    @contextmanager
+    def phase(self, phase):
+        # type: (ConnectionPhaseEnum) -> Iterator[None]
+        """Record the time spent within the with block as the supplied phase.
+        """
+        start_time = time.time()
+        try:
+            yield
+        except Exception as e:
+            self.add_phase(phase, start_time, time.time(), '{}: {}'.format(type(e).__name__, e))
+            raise
+        self.add_phase(phase, start_time, time.time())
+
+    def get_total_duration(self, phase):
+        # type: (ConnectionPhaseEnum) -> float
+        return sum([timing.duration for timing in self.phase_timings if timing.phase == phase])
+
+
+class TracedSocket(object):
+    """Wrapper around a socket counting the bytes sent and received into a ConnectionTrace.
+    """
+
+    def __init__(self, sock, connection_trace):
+        # type: (socket.socket, ConnectionTrace) -> None
+        self._sock = sock
+        self._connection_trace = connection_trace
+
+    def send(self, data, *args):
+        sent_len = self._sock.send(data, *args)
+        self._connection_trace.bytes_sent += sent_len
+        return sent_len
+
+    def sendall(self, data, *args):
+        self._sock.sendall(data, *args)
+        self._connection_trace.bytes_sent += len(data)
+
+    def recv(self, size, *args):
+        data = self._sock.recv(size, *args)
+        self._connection_trace.bytes_received += len(data)
+        return data
+
+    def recv_into(self, buffer, *args):
+        received_len = self._sock.recv_into(buffer, *args)
+        self._connection_trace.bytes_received += received_len
+        return received_len
+
+    def __getattr__(self, name):
+        # Everything else (close(), settimeout(), etc.) is forwarded to the actual socket
+        return getattr(self._sock, name)
+
+
+class ConnectionTracesSummary(object):
+    """The totals of all the connections opened to run a scan command.
+
+    Attributes:
+        connections_nb (int): The number of connections that were opened.
+        phase_durations (Dict[Text, float]): The total time spent in each phase of the connections, in seconds, keyed
+            by the name of the phase (such as "TLS_HANDSHAKE").
+        retries_nb (int): How many times the connections had to be retried because of a network timeout.
+        bytes_sent (int): The number of bytes sent on the connections.
+        bytes_received (int): The number of bytes received on the connections.
+    """
+
+    def __init__(self, connection_traces):
+        # type: (List[ConnectionTrace]) -> None
+        self.connections_nb = len(connection_traces)
+        self.phase_durations = {phase.name: 0.0 for phase in ConnectionPhaseEnum}  # type: Dict[Text, float]
+        self.retries_nb = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        for connection_trace in connection_traces:
+            for timing in connection_trace.phase_timings:
+                self.phase_durations[timing.phase.name] += timing.duration
+            self.retries_nb += connection_trace.retries_nb
+            self.bytes_sent += connection_trace.bytes_sent
+            self.bytes_received += connection_trace.bytes_received
+
+
+class ConnectionTraceCollector(object):
+    """Collect the traces of all the connections opened by the current thread while the collector is active.
+
+    Only one collector can be active at a time within a thread. Threads started by a ThreadPool inherit the collector
+    that was active in the thread that started the pool, so that the connections opened by a plugin's threads are
+    collected as well.
+    """
+
+    _THREAD_LOCAL = threading.local()
+
+    def __init__(self):
+        # type: () -> None
+        self.connection_traces = []  # type: List[ConnectionTrace]
+        self._lock = threading.Lock()
+
+    @classmethod
+    def get_active_collector(cls):
+        # type: () -> Optional[ConnectionTraceCollector]
+        return getattr(cls._THREAD_LOCAL, 'active_collector', None)
+
+    def add_connection_trace(self, connection_trace):
+        # type: (ConnectionTrace) -> None
+        with self._lock:
+            self.connection_traces.append(connection_trace)
+
+    def get_summary(self):
+        # type: () -> ConnectionTracesSummary
+        with self._lock:
+            return ConnectionTracesSummary(list(self.connection_traces))
+
+    def __enter__(self):
+        # type: () -> ConnectionTraceCollector
+        if self.get_active_collector() is not None:
+            raise RuntimeError('Another collector is already active within this thread')
+        self._THREAD_LOCAL.active_collector = self
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._THREAD_LOCAL.active_collector = None
@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+"""Cache of what was negotiated with each server, so that plugins do not need to redo a handshake to retrieve it.
+"""
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import threading
+from collections import OrderedDict
+
+from nassl.legacy_ssl_client import LegacySslClient
+from nassl.ssl_client import OpenSslVersionEnum
+from typing import Any
+from typing import Dict
+from typing import List
+from typing import Optional
+from typing import Text
+from typing import Tuple
+
+
+class HandshakeFacts(object):
+    """What was negotiated with a server during handshakes performed with the default connection settings.
+
+    Each handshake may only reveal some of the facts, depending on the client that was used; the other facts are left
+    to their default value.
+
+    Attributes:
+        ssl_version (OpenSslVersionEnum): The SSL/TLS version that was used.
+        cipher_name (Optional[Text]): The OpenSSL name of the cipher suite that was negotiated.
+        certificate_chain_as_pem (List[Text]): The certificate chain sent by the server, as PEM-formatted certificates.
+        are_legacy_client_facts_known (bool): True if a handshake was performed using the legacy OpenSSL client, so
+            that compression_name and supports_secure_renegotiation are known.
+        compression_name (Optional[Text]): The compression method that was negotiated; None if compression was not
+            enabled.
+        supports_secure_renegotiation (Optional[bool]): True if the server supports secure renegotiation.
+    """
+
+    def __init__(self, ssl_version):
+        # type: (OpenSslVersionEnum) -> None
+        self.ssl_version = ssl_version
+        self.cipher_name = None  # type: Optional[Text]
+        self.certificate_chain_as_pem = []  # type: List[Text]
+
+        self.are_legacy_client_facts_known = False
+        self.compression_name = None  # type: Optional[Text]
+        self.supports_secure_renegotiation = None  # type: Optional[bool]
+
+    @classmethod
+    def from_connectivity_snapshot(cls, snapshot):
+        # type: (Any) -> HandshakeFacts
+        """Create the facts from the ConnectivityHandshakeSnapshot of a ServerConnectivityInfo.
+        """
+        facts = cls(snapshot.ssl_version)
+        facts.cipher_name = snapshot.cipher_name
+        facts.certificate_chain_as_pem = list(snapshot.certificate_chain_as_pem)
+        facts.are_legacy_client_facts_known = snapshot.are_legacy_client_facts_known
+        facts.compression_name = snapshot.compression_name
+        facts.supports_secure_renegotiation = snapshot.supports_secure_renegotiation
+        return facts
+
+
+class HandshakeFactsCache(object):
+    """Per-process cache of the facts learnt from the handshakes performed with each server.
+
+    Only connections returned by ServerConnectivityInfo.get_preconfigured_ssl_connection() without overriding the SSL
+    version are recorded, as the facts would be different with other connection settings.
+
+    The facts are tied to the connectivity test that was run on the ServerConnectivityInfo: testing the connectivity
+    again forgets everything that was learnt about the server until then, so that a long-running process does not keep
+    returning facts about a server whose configuration has since changed.
+    """
+
+    MAX_SERVERS_NB = 1000
+
+    _FACTS = OrderedDict()  # type: OrderedDict
+    _LOCK = threading.Lock()
+
+    # Which SSL/TLS versions are known to be supported or not by each server, for all connection settings
+    _SSL_VERSIONS_SUPPORT = OrderedDict()  # type: OrderedDict
+
+    @staticmethod
+    def get_key(hostname, ip_address, port, tls_server_name_indication, connectivity_test_id, ssl_version):
+        # type: (Text, Optional[Text], int, Text, Optional[Text], OpenSslVersionEnum) -> Tuple[Any, ...]
+        return hostname, ip_address, port, tls_server_name_indication, connectivity_test_id, ssl_version
+
+    @classmethod
+    def get_facts(cls, facts_key):
+        # type: (Tuple[Any, ...]) -> Optional[HandshakeFacts]
+        with cls._LOCK:
+            return cls._FACTS.get(facts_key)
+
+    @classmethod
+    def get_facts_for_server(cls, server_info):
+        # type: (Any) -> Optional[HandshakeFacts]
+        """Return the facts for a ServerConnectivityInfo's default connection settings.
+
+        If no handshake was recorded yet within this process since the server's connectivity test, the facts are
+        seeded using the snapshot of the connectivity test's handshake, when available.
+        """
+        facts_key = cls._get_server_key(server_info) + (server_info.highest_ssl_version_supported,)
+        snapshot = getattr(server_info, 'connectivity_snapshot', None)
+        with cls._LOCK:
+            facts = cls._FACTS.get(facts_key)
+            if facts is None and snapshot is not None:
+                facts = HandshakeFacts.from_connectivity_snapshot(snapshot)
+                cls._store_facts(facts_key, facts)
+            return facts
+
+    @staticmethod
+    def _get_server_key(server_info):
+        # type: (Any) -> Tuple[Any, ...]
+        return (server_info.hostname, server_info.ip_address, server_info.port,
+                server_info.tls_server_name_indication, server_info.connectivity_test_id)
+
+    @classmethod
+    def forget_server(cls, server_info):
+        # type: (Any) -> None
+        """Discard everything that was learnt about a ServerConnectivityInfo's server within this process, including
+        the facts recorded for previous connectivity tests.
+        """
+        # The connectivity test ID is left out so that the facts of all the previous tests match
+        endpoint = cls._get_server_key(server_info)[:-1]
+        with cls._LOCK:
+            for cache in [cls._FACTS, cls._SSL_VERSIONS_SUPPORT]:
+                for key in [key for key in cache.keys() if key[:len(endpoint)] == endpoint]:
+                    del cache[key]
+
+    @classmethod
+    def record_ssl_version_support(cls, server_info, ssl_version, is_supported):
+        # type: (Any, OpenSslVersionEnum, bool) -> None
+        """Store whether a ServerConnectivityInfo's server accepted handshakes using the supplied SSL/TLS version.
+        """
+        server_key = cls._get_server_key(server_info)
+        with cls._LOCK:
+            ssl_versions_support = cls._SSL_VERSIONS_SUPPORT.get(server_key)
+            if ssl_versions_support is None:
+                ssl_versions_support = {}
+                cls._SSL_VERSIONS_SUPPORT[server_key] = ssl_versions_support
+                if len(cls._SSL_VERSIONS_SUPPORT) > cls.MAX_SERVERS_NB:
+                    cls._SSL_VERSIONS_SUPPORT.popitem(last=False)
+            ssl_versions_support[ssl_version] = is_supported
+
+    @classmethod
+    def get_ssl_versions_support(cls, server_info):
+        # type: (Any) -> Dict[OpenSslVersionEnum, bool]
+        """Return the SSL/TLS versions known to be supported (True) or not (False) by a ServerConnectivityInfo's
+        server; versions that were not tested yet within this process are not included.
+        """
+        with cls._LOCK:
+            ssl_versions_support = dict(cls._SSL_VERSIONS_SUPPORT.get(cls._get_server_key(server_info), {}))
+
+        # The connectivity test found the highest version supported by the server
+        if server_info.highest_ssl_version_supported is not None:
+            ssl_versions_support[server_info.highest_ssl_version_supported] = True
+        return ssl_versions_support
+
+    @classmethod
+    def _store_facts(cls, facts_key, facts):
+        # type: (Tuple[Any, ...], HandshakeFacts) -> None
+        # The lock must be held by the caller
+        cls._FACTS[facts_key] = facts
+        if len(cls._FACTS) > cls.MAX_SERVERS_NB:
+            # Forget about the oldest server
+            cls._FACTS.popitem(last=False)
+
+    @classmethod
+    def record_handshake(cls, facts_key, ssl_client):
+        # type: (Tuple[Any, ...], Any) -> None
+        """Store what was negotiated by an SslClient that has just completed a handshake.
+        """
+        cipher_name = ssl_client.get_current_cipher_name()
+        certificate_chain_as_pem = [x509_cert.as_pem() for x509_cert in ssl_client.get_peer_cert_chain()]
+
+        is_legacy_client = isinstance(ssl_client, LegacySslClient)
+        if is_legacy_client:
+            compression_name = ssl_client.get_current_compression_method()
+            supports_secure_renegotiation = ssl_client.get_secure_renegotiation_support()
+
+        with cls._LOCK:
+            facts = cls._FACTS.get(facts_key)
+            if facts is None:
+                facts = HandshakeFacts(ssl_version=facts_key[-1])
+                cls._store_facts(facts_key, facts)
+
+            facts.cipher_name = cipher_name
+            if certificate_chain_as_pem:
+                facts.certificate_chain_as_pem = certificate_chain_as_pem
+            if is_legacy_client:
+                facts.are_legacy_client_facts_known = True
+                facts.compression_name = compression_name
+                facts.supports_secure_renegotiation = supports_secure_renegotiation
@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+"""Load balancing of the connections across several HTTP CONNECT proxies.
+"""
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import threading
+import time
+from typing import Dict
+from typing import Optional
+from typing import Tuple
+
+from sslyze.ssl_settings import HttpConnectProxyPoolSettings
+from sslyze.ssl_settings import HttpConnectTunnelingSettings
+
+
+class HttpConnectProxyPool(object):
+    """Thread-safe pool which hands out the proxy to use for each new connection.
+
+    The proxy with the fewest connections open is picked, within the limit of connections allowed for each proxy. A
+    proxy that could not be reached is considered offline and is not handed out until its cooldown period expires.
+
+    As the state of the pool cannot be shared across processes, each scanning process has its own pool; get_pool() should
+    be used to retrieve it.
+    """
+
+    _POOLS = {}  # type: Dict[Tuple, HttpConnectProxyPool]
+    _POOLS_LOCK = threading.Lock()
+
+    @classmethod
+    def get_pool(cls, pool_settings):
+        # type: (HttpConnectProxyPoolSettings) -> HttpConnectProxyPool
+        """Return this process' pool for the supplied settings.
+        """
+        # The settings get pickled and sent to the worker processes so they cannot be used as the key directly
+        pool_key = (
+            tuple([(proxy.hostname, proxy.port, proxy.basic_auth_user, proxy.basic_auth_password)
+                   for proxy in pool_settings.proxies]),
+            pool_settings.max_connections_per_proxy,
+            pool_settings.unhealthy_proxy_cooldown,
+        )
+        with cls._POOLS_LOCK:
+            if pool_key not in cls._POOLS:
+                cls._POOLS[pool_key] = cls(pool_settings)
+            return cls._POOLS[pool_key]
+
+    def __init__(self, pool_settings):
+        # type: (HttpConnectProxyPoolSettings) -> None
+        self._proxies = pool_settings.proxies
+        self._max_connections_per_proxy = pool_settings.max_connections_per_proxy
+        self._unhealthy_proxy_cooldown = pool_settings.unhealthy_proxy_cooldown
+
+        self._condition = threading.Condition()
+        self._active_connections = [0] * len(self._proxies)
+        self._unhealthy_until = [0.0] * len(self._proxies)
+        self._next_index = 0
+
+    @property
+    def proxies_count(self):
+        # type: () -> int
+        return len(self._proxies)
+
+    def acquire(self):
+        # type: () -> Optional[HttpConnectTunnelingSettings]
+        """Return the proxy to use for a new connection, waiting for a connection slot if all the proxies are busy.
+
+        Returns None if all the proxies of the pool are offline. The proxy must be given back using release() once the
+        connection has been closed.
+        """
+        with self._condition:
+            while True:
+                now = time.time()
+                healthy_indexes = [index for index in range(len(self._proxies))
+                                   if self._unhealthy_until[index] <= now]
+                if not healthy_indexes:
+                    return None
+
+                # Start from a different proxy each time so that connections are spread when the load is equal
+                available_indexes = sorted(
+                    [index for index in healthy_indexes
+                     if self._active_connections[index] < self._max_connections_per_proxy],
+                    key=lambda index: (index - self._next_index) % len(self._proxies)
+                )
+                if available_indexes:
+                    selected_index = min(available_indexes, key=lambda index: self._active_connections[index])
+                    self._active_connections[selected_index] += 1
+                    self._next_index = (selected_index + 1) % len(self._proxies)
+                    return self._proxies[selected_index]
+
+                # All the proxies are busy
+                self._condition.wait()
+
+    def release(self, proxy, is_healthy=True):
+        # type: (HttpConnectTunnelingSettings, bool) -> None
+        """Give back a proxy returned by acquire(); is_healthy should be False if the proxy could not be reached.
+        """
+        index = self._proxies.index(proxy)
+        with self._condition:
+            self._active_connections[index] -= 1
+            if not is_healthy:
+                self._unhealthy_until[index] = time.time() + self._unhealthy_proxy_cooldown
+            self._condition.notify_all()
+
+    def get_healthy_proxies_count(self):
+        # type: () -> int
+        now = time.time()
+        with self._condition:
+            return len([until for until in self._unhealthy_until if until <= now])
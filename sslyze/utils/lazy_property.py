@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+from typing import Any
+from typing import Callable
+from typing import List
+
+
+class LazyProperty(object):
+    """Decorator for an attribute that is only computed the first time it gets accessed.
+
+    The computed value is then stored in the instance's __dict__ under the same name, so it behaves like a regular
+    attribute afterwards.
+    """
+
+    def __init__(self, compute_function):
+        # type: (Callable[[Any], Any]) -> None
+        self._compute_function = compute_function
+        self.__name__ = compute_function.__name__
+        self.__doc__ = compute_function.__doc__
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+        value = self._compute_function(instance)
+        instance.__dict__[self.__name__] = value
+        return value
+
+    @staticmethod
+    def get_lazy_property_names(cls):
+        # type: (type) -> List[str]
+        """Return the names of all the lazy properties of a class, including the ones from its parent classes.
+        """
+        names = set()
+        for parent_cls in cls.__mro__:
+            for name, attribute in parent_cls.__dict__.items():
+                if isinstance(attribute, LazyProperty):
+                    names.add(name)
+        return sorted(names)
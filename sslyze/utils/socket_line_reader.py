@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+"""Buffered reader for the plaintext protocols negotiated before a TLS handshake (StartTLS, etc.).
+"""
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import socket
+from typing import Callable
+from typing import List
+from typing import Tuple
+
+
+class SocketLineReader(object):
+    """Read CRLF-terminated lines or delimited chunks from a socket, keeping any extra data received in a buffer.
+
+    Unlike a single recv() call, this correctly handles responses split across several TCP segments as well as several
+    responses received at once (which happens when commands are pipelined).
+
+    Args:
+        sock (socket.socket): The connected socket to read from.
+        max_size (int): The maximum number of bytes to buffer while waiting for a delimiter.
+    """
+
+    RECV_SIZE = 4096
+
+    def __init__(self, sock, max_size=65536):
+        # type: (socket.socket, int) -> None
+        self._sock = sock
+        self._max_size = max_size
+        self._buffer = bytearray()
+
+    @property
+    def pending_bytes(self):
+        # type: () -> bytes
+        """Data that was received from the socket but not returned yet.
+        """
+        return bytes(self._buffer)
+
+    def _recv_more(self):
+        # type: () -> bool
+        if len(self._buffer) >= self._max_size:
+            raise IOError('Received more than {} bytes without a delimiter'.format(self._max_size))
+        data = self._sock.recv(self.RECV_SIZE)
+        if not data:
+            return False
+        self._buffer.extend(data)
+        return True
+
+    def read_until(self, delimiters):
+        # type: (Tuple[bytes, ...]) -> bytes
+        """Return all the data up to and including the first occurrence of any of the delimiters, or all the remaining
+        data if the server closed the connection before sending a delimiter.
+        """
+        search_start = 0
+        while True:
+            found_positions = []
+            for delimiter in delimiters:
+                position = self._buffer.find(delimiter, search_start)
+                if position != -1:
+                    found_positions.append(position + len(delimiter))
+
+            if found_positions:
+                end = min(found_positions)
+                data = bytes(self._buffer[:end])
+                del self._buffer[:end]
+                return data
+
+            # Only search the newly received data next time, minus an overlap for delimiters split across segments
+            search_start = max(0, len(self._buffer) - max([len(delimiter) for delimiter in delimiters]) + 1)
+            if not self._recv_more():
+                data = bytes(self._buffer)
+                del self._buffer[:]
+                return data
+
+    def read_bytes(self, size):
+        # type: (int) -> bytes
+        """Return exactly size bytes, or less if the server closed the connection.
+        """
+        while len(self._buffer) < size:
+            if not self._recv_more():
+                break
+        data = bytes(self._buffer[:size])
+        del self._buffer[:size]
+        return data
+
+    def read_line(self):
+        # type: () -> bytes
+        """Return the next line without its line ending; an empty string is also returned if the connection was closed.
+        """
+        return self.read_until((b'\n',)).rstrip(b'\r\n')
+
+    def read_lines_until(self, is_last_line):
+        # type: (Callable[[bytes], bool]) -> List[bytes]
+        """Read lines until the supplied function returns True for one of them or the connection is closed.
+        """
+        lines = []
+        while True:
+            raw_line = self.read_until((b'\n',))
+            if not raw_line:
+                # Connection closed
+                return lines
+            line = raw_line.rstrip(b'\r\n')
+            lines.append(line)
+            if is_last_line(line) or not raw_line.endswith(b'\n'):
+                return lines
+
+    def read_multiline_reply(self):
+        # type: () -> List[bytes]
+        """Read a reply made of one or more lines starting with a three-digit code, as used by SMTP and FTP.
+
+        The last line of the reply has a space after the code (such as "250 OK") while the previous lines have a dash
+        (such as "250-PIPELINING").
+        """
+        reply_code = []  # type: List[bytes]
+
+        def is_last_line(line):
+            # type: (bytes) -> bool
+            if not reply_code:
+                reply_code.append(line[:3])
+            return line[:3] == reply_code[0] and line[3:4] != b'-'
+
+        return self.read_lines_until(is_last_line)
@@ -6,13 +6,18 @@
 
 import random
 import socket
+import threading
+from collections import OrderedDict
 from typing import Text
 from typing import Optional
+from typing import Tuple
 import struct
 import time
 from base64 import b64encode
 
 from sslyze.ssl_settings import ClientAuthenticationCredentials
+from sslyze.ssl_settings import HttpConnectProxyPoolSettings
+from sslyze.ssl_settings import HttpConnectTunnelingSettings
 
 try:
     # Python 3
@@ -27,9 +32,16 @@
 from nassl.ssl_client import SslClient
 from nassl.legacy_ssl_client import LegacySslClient
 from nassl.ssl_client import ClientCertificateRequested, OpenSslVerifyEnum, OpenSslVersionEnum
+from sslyze.utils.connection_trace import ConnectionPhaseEnum
+from sslyze.utils.connection_trace import ConnectionTrace
+from sslyze.utils.connection_trace import ConnectionTraceCollector
+from sslyze.utils.connection_trace import TracedSocket
+from sslyze.utils.handshake_facts_cache import HandshakeFactsCache
+from sslyze.utils.http_connect_proxy_pool import HttpConnectProxyPool
 from sslyze.utils.http_request_generator import HttpRequestGenerator
 
 from sslyze.utils.http_response_parser import HttpResponseParser
+from sslyze.utils.socket_line_reader import SocketLineReader
 
 
 class SSLHandshakeRejected(IOError):
@@ -50,6 +62,48 @@ class ProxyError(IOError):
     pass
 
 
+class _StartTlsPipeliningCache(object):
+    """Thread-safe record of whether each server accepts a pipelined StartTLS negotiation, learned from the previous
+    connections opened within this process.
+
+    Only the most recently seen servers are remembered, so that the cache does not grow without limit when scanning
+    many servers.
+    """
+
+    MAX_SERVERS_NB = 1000
+
+    def __init__(self):
+        # type: () -> None
+        self._servers = OrderedDict()  # type: OrderedDict
+        self._lock = threading.Lock()
+
+    def can_pipeline(self, server_key):
+        # type: (Tuple) -> bool
+        with self._lock:
+            return self._servers.get(server_key, False)
+
+    def _set(self, server_key, can_pipeline):
+        # type: (Tuple, bool) -> None
+        # The lock must be held by the caller
+        self._servers.pop(server_key, None)
+        self._servers[server_key] = can_pipeline
+        if len(self._servers) > self.MAX_SERVERS_NB:
+            # Forget about the oldest server
+            self._servers.popitem(last=False)
+
+    def record_start_tls_accepted(self, server_key):
+        # type: (Tuple) -> None
+        """The server accepted the StartTLS negotiation; pipeline it next time unless the server rejected pipelining.
+        """
+        with self._lock:
+            self._set(server_key, self._servers.get(server_key, True))
+
+    def record_pipelining_rejected(self, server_key):
+        # type: (Tuple) -> None
+        with self._lock:
+            self._set(server_key, False)
+
+
 class SSLConnection(object):
     """Base SSL connection class which leverages an nassl.SslClient for performing the SSL handshake.
     """
@@ -91,11 +145,15 @@ class SSLConnection(object):
     # Errors caused by the proxy
     ERR_CONNECT_REJECTED = 'The proxy rejected the CONNECT request for this host'
     ERR_PROXY_OFFLINE = 'Could not connect to the proxy: "{0}"'
+    ERR_NO_PROXY_AVAILABLE = 'Could not connect to any of the proxies'
 
     # Restrict cipher list to make the client hello smaller so we don't run into
     # https://bugs.debian.org/cgi-bin/bugreport.cgi?bug=665452
     DEFAULT_SSL_CIPHER_LIST = 'HIGH:MEDIUM:-aNULL:-eNULL:-3DES:-SRP:-PSK:-CAMELLIA'
 
+    # Whether the subclass performs a StartTLS negotiation in do_pre_handshake()
+    HAS_START_TLS_NEGOTIATION = False
+
     # Default socket settings global to all SSLyze connections; can be overridden
     NETWORK_MAX_RETRIES = 3
     NETWORK_TIMEOUT = 5
@@ -146,6 +204,24 @@ def __init__(self,
         self._tunnel_host = None
         self._tunnel_port = None
         self._tunnel_basic_auth_token = None
+        self._proxy_pool = None  # type: Optional[HttpConnectProxyPool]
+        self._proxy_from_pool = None  # type: Optional[HttpConnectTunnelingSettings]
+
+        # Record the timing of each phase of the connection; the trace is only kept if a collector is active
+        self.connection_trace = ConnectionTrace(hostname, port)
+        self._trace_collector = ConnectionTraceCollector.get_active_collector()
+        if self._trace_collector:
+            self._trace_collector.add_connection_trace(self.connection_trace)
+        self._socket_opened_time = None  # type: Optional[float]
+
+        # Set when the connection uses the server's default settings, so that the result of the handshake can be
+        # shared with the other plugins via the HandshakeFactsCache
+        self.handshake_facts_key = None  # type: Optional[Tuple]
+
+    @staticmethod
+    def _get_basic_auth_token(user, password):
+        # type: (Text, Text) -> Text
+        return b64encode('{0}:{1}'.format(quote(user), quote(password)).encode('utf-8')).decode('ascii')
 
     def enable_http_connect_tunneling(self, tunnel_host, tunnel_port, tunnel_user=None, tunnel_password=None):
         # type: (Text, int, Optional[Text], Optional[Text]) -> None
@@ -155,9 +231,19 @@ def enable_http_connect_tunneling(self, tunnel_host, tunnel_port, tunnel_user=No
         self._tunnel_port = tunnel_port
         self._tunnel_basic_auth_token = None
         if tunnel_user is not None:
-            self._tunnel_basic_auth_token = b64encode(
-                '{0}:{1}'.format(quote(tunnel_user), quote(tunnel_password)).encode('utf-8')
-            )
+            self._tunnel_basic_auth_token = self._get_basic_auth_token(tunnel_user, tunnel_password)
+
+    def enable_http_connect_proxy_pool(self, proxy_pool_settings):
+        # type: (HttpConnectProxyPoolSettings) -> None
+        """Proxy the traffic through one of the HTTP Connect proxies of a pool, selected when connecting.
+        """
+        self._proxy_pool = HttpConnectProxyPool.get_pool(proxy_pool_settings)
+
+    def request_ocsp_stapling(self):
+        # type: () -> None
+        """Send the status_request extension so that the server staples an OCSP response during the handshake.
+        """
+        self.ssl_client.set_tlsext_status_ocsp()
 
     def write(self, data):
         # type: (bytes) -> int
@@ -167,37 +253,104 @@ def read(self, size):
         # type: (int) -> bytes
         return self.ssl_client.read(size)
 
+    def _open_socket(self, host, port, network_timeout):
+        # type: (Text, int, int) -> socket
+        if host == self._ip_address:
+            # The DNS lookup was already done when creating the ServerConnectivityInfo
+            addr_infos = [(None, None, None, None, (host, port))]
+        else:
+            with self.connection_trace.phase(ConnectionPhaseEnum.DNS):
+                addr_infos = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+
+        with self.connection_trace.phase(ConnectionPhaseEnum.TCP_CONNECT):
+            sock = None
+            for index, (_, _, _, _, sockaddr) in enumerate(addr_infos):
+                try:
+                    sock = socket.create_connection(sockaddr[:2], network_timeout)
+                    break
+                except socket.error:
+                    if index == len(addr_infos) - 1:
+                        # Could not connect to any of the addresses
+                        raise
+
+        if self._trace_collector:
+            # Count the bytes sent and received
+            sock = TracedSocket(sock, self.connection_trace)
+        return sock
+
+    def _send_http_connect_request(self, sock, basic_auth_token):
+        # type: (socket, Optional[Text]) -> None
+        with self.connection_trace.phase(ConnectionPhaseEnum.PROXY_CONNECT):
+            # Send a CONNECT request with the host we want to tunnel to
+            if basic_auth_token is None:
+                sock.send(self.HTTP_CONNECT_REQ.format(self._hostname, self._port).encode('utf-8'))
+            else:
+                sock.send(self.HTTP_CONNECT_REQ_PROXY_AUTH_BASIC.format(self._hostname,
+                                                                        self._port,
+                                                                        basic_auth_token).encode('utf-8'))
+            http_response = HttpResponseParser.parse(sock)
+
+        # Check if the proxy was able to connect to the host
+        if http_response.status != 200:
+            raise ProxyError(self.ERR_CONNECT_REJECTED)
+
+    def _connect_through_proxy_pool(self, network_timeout):
+        # type: (int) -> socket
+        for _ in range(self._proxy_pool.proxies_count):
+            proxy = self._proxy_pool.acquire()
+            if proxy is None:
+                break
+
+            try:
+                sock = self._open_socket(proxy.hostname, proxy.port, network_timeout)
+            except socket.error:
+                # This proxy is offline; put it aside and fail over to another proxy of the pool
+                self._proxy_pool.release(proxy, is_healthy=False)
+                continue
+
+            # Keep track of the proxy so it gets released when closing the connection
+            self._proxy_from_pool = proxy
+            basic_auth_token = None
+            if proxy.basic_auth_user is not None:
+                basic_auth_token = self._get_basic_auth_token(proxy.basic_auth_user, proxy.basic_auth_password)
+            self._send_http_connect_request(sock, basic_auth_token)
+            return sock
+
+        raise ProxyError(self.ERR_NO_PROXY_AVAILABLE)
+
+    def _release_proxy_from_pool(self):
+        # type: () -> None
+        if self._proxy_from_pool is not None:
+            self._proxy_pool.release(self._proxy_from_pool)
+            self._proxy_from_pool = None
+
     def do_pre_handshake(self, network_timeout):
         # type: (int) -> socket
         """Open a socket to the server; setup HTTP tunneling if a proxy was configured.
         """
-        if self._tunnel_host:
+        # In case this is a retry, give back the proxy used for the previous attempt
+        self._release_proxy_from_pool()
+
+        if self._proxy_pool:
+            # Proxy pool configured; setup HTTP tunneling through one of the proxies
+            sock = self._connect_through_proxy_pool(network_timeout)
+        elif self._tunnel_host:
             # Proxy configured; setup HTTP tunneling
             try:
-                sock = socket.create_connection((self._tunnel_host, self._tunnel_port), network_timeout)
+                sock = self._open_socket(self._tunnel_host, self._tunnel_port, network_timeout)
             except socket.timeout as e:
                 raise ProxyError(self.ERR_PROXY_OFFLINE.format(str(e)))
             except socket.error as e:
                 raise ProxyError(self.ERR_PROXY_OFFLINE.format(str(e)))
 
-            # Send a CONNECT request with the host we want to tunnel to
-            if self._tunnel_basic_auth_token is None:
-                sock.send(self.HTTP_CONNECT_REQ.format(self._hostname, self._port).encode('utf-8'))
-            else:
-                sock.send(self.HTTP_CONNECT_REQ_PROXY_AUTH_BASIC.format(self._hostname,
-                                                                        self._port,
-                                                                        self._tunnel_basic_auth_token).encode('utf-8'))
-            http_response = HttpResponseParser.parse(sock)
-
-            # Check if the proxy was able to connect to the host
-            if http_response.status != 200:
-                raise ProxyError(self.ERR_CONNECT_REJECTED)
+            self._send_http_connect_request(sock, self._tunnel_basic_auth_token)
         else:
             # No proxy; connect directly to the server
-            sock = socket.create_connection(address=(self._ip_address, self._port), timeout=network_timeout)
+            sock = self._open_socket(self._ip_address, self._port, network_timeout)
 
         # Pass the connected socket to the SSL client
         self.ssl_client.set_underlying_socket(sock)
+        self._socket_opened_time = time.time()
         return sock
 
     def connect(self, network_timeout=None, network_max_retries=None):
@@ -212,11 +365,21 @@ def connect(self, network_timeout=None, network_max_retries=None):
                 time.sleep(delay)
 
                 # StartTLS negotiation or proxy setup if needed
-                self.do_pre_handshake(final_timeout)
+                self._socket_opened_time = None
+                try:
+                    self.do_pre_handshake(final_timeout)
+                except Exception as e:
+                    self._trace_start_tls_negotiation('{}: {}'.format(type(e).__name__, e))
+                    raise
+                self._trace_start_tls_negotiation()
 
                 try:
                     # SSL handshake
-                    self.ssl_client.do_handshake()
+                    with self.connection_trace.phase(ConnectionPhaseEnum.TLS_HANDSHAKE):
+                        self.ssl_client.do_handshake()
+
+                    if self.handshake_facts_key:
+                        HandshakeFactsCache.record_handshake(self.handshake_facts_key, self.ssl_client)
 
                 except ClientCertificateRequested:
                     # Server expected a client certificate and we didn't provide one
@@ -263,17 +426,29 @@ def connect(self, network_timeout=None, network_max_retries=None):
                 else:
                     # Exponential back off
                     delay = min(6, 2 * delay)  # Cap max delay at 6 seconds
+                self.connection_trace.retries_nb += 1
 
             else:
                 # No network error occurred
                 break
 
+    def _trace_start_tls_negotiation(self, error_message=None):
+        # type: (Optional[Text]) -> None
+        if self.HAS_START_TLS_NEGOTIATION and self._socket_opened_time is not None:
+            # Whatever happened after the base class opened the socket was the StartTLS negotiation
+            self.connection_trace.add_phase(ConnectionPhaseEnum.START_TLS, self._socket_opened_time, time.time(),
+                                            error_message)
+
     def close(self):
         # type: () -> None
-        self.ssl_client.shutdown()
-        sock = self.ssl_client.get_underlying_socket()
-        if sock:
-            sock.close()
+        try:
+            with self.connection_trace.phase(ConnectionPhaseEnum.CLOSE):
+                self.ssl_client.shutdown()
+                sock = self.ssl_client.get_underlying_socket()
+                if sock:
+                    sock.close()
+        finally:
+            self._release_proxy_from_pool()
 
     def post_handshake_check(self):
         # type: () -> Text
@@ -291,6 +466,11 @@ class HTTPSConnection(SSLConnection):
     ERR_GENERIC = 'Error sending HTTP GET'
 
     def post_handshake_check(self):
+        # type: () -> Text
+        with self.connection_trace.phase(ConnectionPhaseEnum.POST_HANDSHAKE_CHECK):
+            return self._send_http_get()
+
+    def _send_http_get(self):
         # type: () -> Text
         try:
             # Send an HTTP GET to the server and store the HTTP Status Code
@@ -325,31 +505,41 @@ class SMTPConnection(SSLConnection):
     ERR_SMTP_REJECTED = 'SMTP EHLO was rejected'
     ERR_NO_SMTP_STARTTLS = 'SMTP STARTTLS not supported'
 
+    HAS_START_TLS_NEGOTIATION = True
+
+    SMTP_EHLO_CMD = b'EHLO sslyze.scan\r\n'
+    SMTP_STARTTLS_CMD = b'STARTTLS\r\n'
+
     def do_pre_handshake(self, network_timeout):
         # type: (int) -> socket
         sock = super(SMTPConnection, self).do_pre_handshake(network_timeout)
+        reader = SocketLineReader(sock)
 
         # Get the SMTP banner
-        sock.recv(2048)
+        reader.read_multiline_reply()
 
-        # Send a EHLO and wait for the 250 status
-        sock.send(b'EHLO sslyze.scan\r\n')
-        if b'250 ' not in sock.recv(2048):
+        # Send a EHLO and wait for the 250 status; EHLO and STARTTLS must each be the last command of a pipelined group
+        # (RFC 2920), so they are always sent separately
+        sock.send(self.SMTP_EHLO_CMD)
+        ehlo_reply = reader.read_multiline_reply()
+        if not ehlo_reply or not ehlo_reply[-1].startswith(b'250'):
             raise StartTLSError(self.ERR_SMTP_REJECTED)
 
         # Send a STARTTLS
-        sock.send(b'STARTTLS\r\n')
-        if b'220' not in sock.recv(2048):
+        sock.send(self.SMTP_STARTTLS_CMD)
+        starttls_reply = reader.read_multiline_reply()
+        if not starttls_reply or not starttls_reply[-1].startswith(b'220'):
             raise StartTLSError(self.ERR_NO_SMTP_STARTTLS)
         return sock
 
     def post_handshake_check(self):
         # type: () -> Text
-        try:
-            self.write(b'NOOP\r\n')
-            result = self.ssl_client.read(2048).strip().decode('utf-8')
-        except socket.timeout:
-            result = 'Timeout on SMTP NOOP'
+        with self.connection_trace.phase(ConnectionPhaseEnum.POST_HANDSHAKE_CHECK):
+            try:
+                self.write(b'NOOP\r\n')
+                result = self.ssl_client.read(2048).strip().decode('utf-8')
+            except socket.timeout:
+                result = 'Timeout on SMTP NOOP'
         return result
 
 
@@ -361,10 +551,15 @@ class XMPPConnection(SSLConnection):
     ERR_XMPP_HOST_UNKNOWN = 'Error opening XMPP stream: server returned host-unknown error, try --xmpp_to'
     ERR_XMPP_NO_STARTTLS = 'XMPP STARTTLS not supported'
 
+    HAS_START_TLS_NEGOTIATION = True
+
     XMPP_OPEN_STREAM = "<stream:stream xmlns='jabber:client' xmlns:stream='http://etherx.jabber.org/streams' " \
                        "xmlns:tls='http://www.ietf.org/rfc/rfc2595.txt' to='{xmpp_to}' xml:lang='en' version='1.0'>"
     XMPP_STARTTLS = b"<starttls xmlns='urn:ietf:params:xml:ns:xmpp-tls'/>"
 
+    # Whether each server accepts the STARTTLS message sent together with the stream header
+    _PIPELINING_CACHE = _StartTlsPipeliningCache()
+
     @property
     def xmpp_to(self):
         # type: () -> Optional[Text]
@@ -384,28 +579,45 @@ def do_pre_handshake(self, network_timeout):
         """
         # Setup the network socket
         sock = super(XMPPConnection, self).do_pre_handshake(network_timeout)
+        reader = SocketLineReader(sock)
+        server_key = (self.__class__.__name__, self._hostname, self._ip_address, self._port, self.xmpp_to)
+        open_stream_cmd = self.XMPP_OPEN_STREAM.format(xmpp_to=self.xmpp_to).encode('utf-8')
+
+        # If a previous connection showed that the server supports StartTLS, open the XMPP stream and send the STARTTLS
+        # message in a single round trip
+        is_pipelined = self._PIPELINING_CACHE.can_pipeline(server_key)
+        if is_pipelined:
+            sock.send(open_stream_cmd + self.XMPP_STARTTLS)
+        else:
+            # Open an XMPP stream before the TLS handshake
+            sock.send(open_stream_cmd)
 
-        # Open an XMPP stream before the TLS handshake
-        sock.send(self.XMPP_OPEN_STREAM.format(xmpp_to=self.xmpp_to).encode('utf-8'))
-
-        # Get the server's features and check for an error
-        server_resp = sock.recv(4096)
+        # Get all the server's features and check for an error
+        server_resp = reader.read_until((b'</stream:features>', b'<stream:features/>', b'</stream:error>'))
         if b'<stream:error>' in server_resp:
+            if b'host-unknown' in server_resp:
+                raise StartTLSError(self.ERR_XMPP_HOST_UNKNOWN)
             raise StartTLSError(self.ERR_XMPP_REJECTED)
-        elif b'</stream:features>' not in server_resp:
-            # Get all the server features before initiating startTLS
-            sock.recv(4096)
 
-        # Send a STARTTLS message
-        sock.send(self.XMPP_STARTTLS)
-        xmpp_resp = sock.recv(2048)
+        if not is_pipelined:
+            # Send a STARTTLS message
+            sock.send(self.XMPP_STARTTLS)
 
+        xmpp_resp = reader.read_until((b'proceed', b'failure', b'</stream:stream>'))
         if b'host-unknown' in xmpp_resp:
             raise StartTLSError(self.ERR_XMPP_HOST_UNKNOWN)
 
         if b'proceed' not in xmpp_resp:
+            if is_pipelined:
+                # Retry the negotiation without pipelining
+                self._PIPELINING_CACHE.record_pipelining_rejected(server_key)
+                sock.close()
+                return self.do_pre_handshake(network_timeout)
             raise StartTLSError(self.ERR_XMPP_NO_STARTTLS)
 
+        # Consume the end of the proceed element so that it does not get mixed with the TLS handshake
+        reader.read_until((b'>',))
+        self._PIPELINING_CACHE.record_start_tls_accepted(server_key)
         return sock
 
 
@@ -420,6 +632,8 @@ class LDAPConnection(SSLConnection):
 
     ERR_NO_STARTTLS = 'LDAP AUTH TLS was rejected'
 
+    HAS_START_TLS_NEGOTIATION = True
+
     START_TLS_CMD = b'0\x1d\x02\x01\x01w\x18\x80\x161.3.6.1.4.1.1466.20037'
     START_TLS_OK = b'\x30\x0c\x02\x01\x01\x78\x07\x0a\x01\x00\x04\x00\x04'
     START_TLS_OK2 = b'Start TLS request accepted'
@@ -447,6 +661,8 @@ class RDPConnection(SSLConnection):
 
     ERR_NO_STARTTLS = 'RDP AUTH TLS was rejected'
 
+    HAS_START_TLS_NEGOTIATION = True
+
     START_TLS_CMD = b'\x03\x00\x00\x13\x0E\xE0\x00\x00\x00\x00\x00\x01\x00\x08\x00\x03\x00\x00\x00'
     START_TLS_OK = b'Start TLS request accepted.'
 
@@ -473,27 +689,61 @@ class GenericStartTLSConnection(SSLConnection):
     """SSL connection class that performs a StartTLS negotiation before the SSL handshake.
     """
 
+    HAS_START_TLS_NEGOTIATION = True
+
     # To be defined in subclasses
     ERR_NO_STARTTLS = b''
     START_TLS_CMD = b''
     START_TLS_OK = b''
     SHOULD_WAIT_FOR_SERVER_BANNER = True
 
+    # Whether the protocol allows sending the StartTLS command before the server's banner was received; if so, this is
+    # done for servers which already accepted the StartTLS command within this process in order to save a round trip
+    CAN_PIPELINE_START_TLS_WITH_BANNER = False
+
+    # Whether each server accepts the StartTLS command sent before its banner
+    _PIPELINING_CACHE = _StartTlsPipeliningCache()
+
+    def _read_banner(self, reader):
+        # type: (SocketLineReader) -> bytes
+        return reader.read_line()
+
+    def _read_start_tls_response(self, reader):
+        # type: (SocketLineReader) -> bytes
+        return reader.read_line()
+
     def do_pre_handshake(self, network_timeout):
         # type: (int) -> socket
         """Connect to a host on a given (SSL) port, send a STARTTLS command, and perform the SSL handshake.
         """
         sock = super(GenericStartTLSConnection, self).do_pre_handshake(network_timeout)
-
-        # Grab the banner
-        if self.SHOULD_WAIT_FOR_SERVER_BANNER:
-            sock.recv(2048)
-
-        # Send Start TLS
-        sock.send(self.START_TLS_CMD)
-        if self.START_TLS_OK not in sock.recv(2048):
+        reader = SocketLineReader(sock)
+        server_key = (self.__class__.__name__, self._hostname, self._ip_address, self._port)
+
+        is_pipelined = False
+        if not self.SHOULD_WAIT_FOR_SERVER_BANNER:
+            sock.send(self.START_TLS_CMD)
+        elif self.CAN_PIPELINE_START_TLS_WITH_BANNER and self._PIPELINING_CACHE.can_pipeline(server_key):
+            # Send Start TLS right away; the banner and the response will be read together
+            is_pipelined = True
+            sock.send(self.START_TLS_CMD)
+            self._read_banner(reader)
+        else:
+            # Grab the banner
+            self._read_banner(reader)
+
+            # Send Start TLS
+            sock.send(self.START_TLS_CMD)
+
+        if self.START_TLS_OK not in self._read_start_tls_response(reader):
+            if is_pipelined:
+                # Retry the negotiation without pipelining
+                self._PIPELINING_CACHE.record_pipelining_rejected(server_key)
+                sock.close()
+                return self.do_pre_handshake(network_timeout)
             raise StartTLSError(self.ERR_NO_STARTTLS)
 
+        self._PIPELINING_CACHE.record_start_tls_accepted(server_key)
         return sock
 
 
@@ -503,8 +753,17 @@ class IMAPConnection(GenericStartTLSConnection):
 
     ERR_NO_STARTTLS = b'IMAP START TLS was rejected'
 
-    START_TLS_CMD = b'. STARTTLS\r\n'
-    START_TLS_OK = b'. OK'
+    START_TLS_CMD = b'sslyze1 STARTTLS\r\n'
+    START_TLS_OK = b'sslyze1 OK'
+
+    # IMAP clients can send tagged commands without waiting for the server's greeting
+    CAN_PIPELINE_START_TLS_WITH_BANNER = True
+
+    def _read_start_tls_response(self, reader):
+        # type: (SocketLineReader) -> bytes
+        # Skip any untagged response until the server's response to our tagged command
+        tag = self.START_TLS_CMD.split(b' ', 1)[0] + b' '
+        return b'\r\n'.join(reader.read_lines_until(lambda line: line.startswith(tag)))
 
 
 class POP3Connection(GenericStartTLSConnection):
@@ -526,6 +785,14 @@ class FTPConnection(GenericStartTLSConnection):
     START_TLS_CMD = b'AUTH TLS\r\n'
     START_TLS_OK = b'234'
 
+    def _read_banner(self, reader):
+        # type: (SocketLineReader) -> bytes
+        return b'\r\n'.join(reader.read_multiline_reply())
+
+    def _read_start_tls_response(self, reader):
+        # type: (SocketLineReader) -> bytes
+        return b'\r\n'.join(reader.read_multiline_reply())
+
 
 class PostgresConnection(GenericStartTLSConnection):
     """PostgreSQL SSL Connection.
@@ -536,3 +803,8 @@ class PostgresConnection(GenericStartTLSConnection):
     START_TLS_CMD = b'\x00\x00\x00\x08\x04\xD2\x16\x2F'
     START_TLS_OK = b'S'
     SHOULD_WAIT_FOR_SERVER_BANNER = False
+
+    def _read_start_tls_response(self, reader):
+        # type: (SocketLineReader) -> bytes
+        # The server replies with a single byte
+        return reader.read_bytes(1)
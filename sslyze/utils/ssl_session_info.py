@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+"""Structured access to the content of the SSL sessions returned by nassl.
+"""
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import binascii
+
+import nassl
+from typing import Optional
+from typing import Text
+
+
+class SslSessionInfo(object):
+    """The fields of an SSL session that are relevant when testing session resumption.
+
+    nassl only exposes the content of a session through the output of OpenSSL's SSL_SESSION_print(), so the output is
+    parsed once when the SslSessionInfo gets created and the fields can then be compared cheaply.
+
+    Attributes:
+        protocol (Optional[Text]): The protocol of the session as returned by OpenSSL (for example "TLSv1.2").
+        cipher (Optional[Text]): The OpenSSL name of the cipher suite of the session.
+        session_id (Optional[Text]): The Session ID assigned by the server as an hex string, which is empty if the
+            server sent an empty Session ID. None if the session has no Session ID at all.
+        tls_ticket (Optional[bytes]): The TLS session ticket (RFC 5077) assigned by the server. None if the server did
+            not assign a ticket.
+        tls_ticket_lifetime_hint (Optional[int]): The lifetime of the TLS session ticket advertised by the server, in
+            seconds. None if the server did not assign a ticket.
+        tls_ticket_key_name (Optional[Text]): The first 16 bytes of the TLS session ticket as an hex string; with the
+            ticket format recommended by RFC 5077, this identifies the key the server used to protect the ticket.
+    """
+
+    # Lines of the hex dump of the TLS ticket, for example "0000 - 9c 2f 0d 3a 5b 71 84 03-8c 6e 2b ee 0e 8f 25 91   ."
+    _HEX_DUMP_SEPARATOR = ' - '
+    _HEX_DUMP_OFFSET_WIDTH = 4
+    _HEX_DUMP_BYTES_WIDTH = 16 * 3
+
+    # BIO_dump() in OpenSSL 1.0.2 does not print the trailing 0x00 and 0x20 bytes and ends the dump with this line
+    # instead, for example "0090 - <SPACES/NULS>", where the offset is the total length of the data
+    _HEX_DUMP_TRUNCATED_BYTES = '<SPACES/NULS>'
+
+    _TLS_TICKET_KEY_NAME_SIZE = 16
+
+    def __init__(self, protocol, cipher, session_id, tls_ticket, tls_ticket_lifetime_hint):
+        # type: (Optional[Text], Optional[Text], Optional[Text], Optional[bytes], Optional[int]) -> None
+        self.protocol = protocol
+        self.cipher = cipher
+        self.session_id = session_id
+        self.tls_ticket = tls_ticket
+        self.tls_ticket_lifetime_hint = tls_ticket_lifetime_hint
+
+    @property
+    def tls_ticket_key_name(self):
+        # type: () -> Optional[Text]
+        if not self.tls_ticket or len(self.tls_ticket) < self._TLS_TICKET_KEY_NAME_SIZE:
+            return None
+        return binascii.hexlify(self.tls_ticket[:self._TLS_TICKET_KEY_NAME_SIZE]).decode('ascii')
+
+    @classmethod
+    def from_ssl_session(cls, ssl_session):
+        # type: (nassl._nassl.SSL_SESSION) -> SslSessionInfo
+        return cls.from_text(ssl_session.as_text())
+
+    @classmethod
+    def from_text(cls, session_text):
+        # type: (Text) -> SslSessionInfo
+        """Parse the output of SSL_SESSION_print() in a single pass.
+        """
+        fields = {}
+        tls_ticket = None
+        is_in_tls_ticket = False
+        for line in session_text.splitlines():
+            if is_in_tls_ticket:
+                offset, separator, hex_dump = line.strip().partition(cls._HEX_DUMP_SEPARATOR)
+                if separator and len(offset) == cls._HEX_DUMP_OFFSET_WIDTH:
+                    if hex_dump == cls._HEX_DUMP_TRUNCATED_BYTES:
+                        # Whether the missing bytes were 0x00 or 0x20 is unknown; only restore the ticket's length
+                        tls_ticket += b'\x00' * (int(offset, 16) - len(tls_ticket))
+                    else:
+                        hex_bytes = hex_dump[:cls._HEX_DUMP_BYTES_WIDTH]
+                        tls_ticket += binascii.unhexlify(''.join(hex_bytes.replace('-', ' ').split()))
+                    continue
+                is_in_tls_ticket = False
+
+            key, separator, value = line.partition(':')
+            if not separator:
+                continue
+            key = key.strip()
+            if key == 'TLS session ticket':
+                tls_ticket = b''
+                is_in_tls_ticket = True
+            else:
+                fields[key] = value.strip()
+
+        lifetime_hint = fields.get('TLS session ticket lifetime hint')
+        if lifetime_hint is not None:
+            # For example "100800 (seconds)"
+            lifetime_hint = int(lifetime_hint.split()[0])
+
+        return cls(
+            protocol=fields.get('Protocol'),
+            cipher=fields.get('Cipher'),
+            session_id=fields.get('Session-ID'),
+            tls_ticket=tls_ticket,
+            tls_ticket_lifetime_hint=lifetime_hint,
+        )
@@ -6,6 +6,8 @@
 
 import threading
 
+from sslyze.utils.connection_trace import ConnectionTraceCollector
+
 try:
     # Python 3
     # noinspection PyCompatibility
@@ -75,11 +77,14 @@ def start(self, nb_threads):
         if self._active_threads:
             raise Exception('Threads already started.')
 
+        # The connections opened by the jobs are traced by the collector of the thread starting the pool, if any
+        trace_collector = ConnectionTraceCollector.get_active_collector()
+
         # Create thread pool
         for _ in range(nb_threads):
             worker = threading.Thread(
                 target=_work_function,
-                args=(self._job_q, self._result_q, self._error_q))
+                args=(self._job_q, self._result_q, self._error_q, trace_collector))
             worker.start()
             self._thread_list.append(worker)
             self._active_threads += 1
@@ -97,8 +102,16 @@ def join(self):
         self._error_q.join()
 
 
-def _work_function(job_q, result_q, error_q):
+def _work_function(job_q, result_q, error_q, trace_collector=None):
     """Work function expected to run within threads."""
+    if trace_collector is None:
+        _process_jobs(job_q, result_q, error_q)
+    else:
+        with trace_collector:
+            _process_jobs(job_q, result_q, error_q)
+
+
+def _process_jobs(job_q, result_q, error_q):
     while True:
         job = job_q.get()
 
@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+"""Builder for the raw ClientHello records sent by the plugins that talk TLS over the raw socket.
+"""
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import os
+import struct
+import threading
+from collections import OrderedDict
+
+from enum import IntEnum
+from tls_parser.cipher_suites import CipherSuites
+from tls_parser.handshake_protocol import TlsHandshakeMessage, TlsHandshakeRecord, TlsHandshakeTypeByte
+from tls_parser.record_protocol import TlsRecordHeader, TlsRecordTlsVersionBytes, TlsRecordTypeByte
+from tls_parser.tls_version import TlsVersionEnum
+from typing import Any
+from typing import List
+from typing import Optional
+from typing import Text
+from typing import Tuple
+
+
+class TlsExtensionTypeByte(IntEnum):
+    SERVER_NAME = 0x0000
+    SUPPORTED_GROUPS = 0x000a
+    EC_POINT_FORMATS = 0x000b
+    SIGNATURE_ALGORITHMS = 0x000d
+    HEARTBEAT = 0x000f
+    RENEGOTIATION_INFO = 0xff01
+
+
+# The cipher suites offered first in the ClientHello, as they are the ones most likely to be accepted by the server
+_PREFERRED_CIPHER_SUITES = [cipher_suite.value for cipher_suite in [
+    CipherSuites.TLS_ECDHE_ECDSA_WITH_AES_128_GCM_SHA256,
+    CipherSuites.TLS_ECDHE_RSA_WITH_AES_128_GCM_SHA256,
+    CipherSuites.TLS_ECDHE_ECDSA_WITH_AES_256_GCM_SHA384,
+    CipherSuites.TLS_ECDHE_RSA_WITH_AES_256_GCM_SHA384,
+    CipherSuites.TLS_ECDHE_ECDSA_WITH_AES_128_CBC_SHA256,
+    CipherSuites.TLS_ECDHE_RSA_WITH_AES_128_CBC_SHA256,
+    CipherSuites.TLS_ECDHE_ECDSA_WITH_AES_256_CBC_SHA384,
+    CipherSuites.TLS_ECDHE_RSA_WITH_AES_256_CBC_SHA384,
+    CipherSuites.TLS_ECDHE_ECDSA_WITH_AES_128_CBC_SHA,
+    CipherSuites.TLS_ECDHE_RSA_WITH_AES_128_CBC_SHA,
+    CipherSuites.TLS_ECDHE_ECDSA_WITH_AES_256_CBC_SHA,
+    CipherSuites.TLS_ECDHE_RSA_WITH_AES_256_CBC_SHA,
+    CipherSuites.TLS_DHE_RSA_WITH_AES_128_GCM_SHA256,
+    CipherSuites.TLS_DHE_RSA_WITH_AES_256_GCM_SHA384,
+    CipherSuites.TLS_DHE_RSA_WITH_AES_128_CBC_SHA256,
+    CipherSuites.TLS_DHE_RSA_WITH_AES_256_CBC_SHA256,
+    CipherSuites.TLS_DHE_RSA_WITH_AES_128_CBC_SHA,
+    CipherSuites.TLS_DHE_RSA_WITH_AES_256_CBC_SHA,
+    CipherSuites.TLS_RSA_WITH_AES_128_GCM_SHA256,
+    CipherSuites.TLS_RSA_WITH_AES_256_GCM_SHA384,
+    CipherSuites.TLS_RSA_WITH_AES_128_CBC_SHA256,
+    CipherSuites.TLS_RSA_WITH_AES_256_CBC_SHA256,
+    CipherSuites.TLS_RSA_WITH_AES_128_CBC_SHA,
+    CipherSuites.TLS_RSA_WITH_AES_256_CBC_SHA,
+    CipherSuites.TLS_ECDHE_RSA_WITH_3DES_EDE_CBC_SHA,
+    CipherSuites.TLS_DHE_RSA_WITH_3DES_EDE_CBC_SHA,
+    CipherSuites.TLS_RSA_WITH_3DES_EDE_CBC_SHA,
+    CipherSuites.TLS_ECDHE_RSA_WITH_RC4_128_SHA,
+    CipherSuites.TLS_RSA_WITH_RC4_128_SHA,
+    CipherSuites.TLS_RSA_WITH_RC4_128_MD5,
+]]
+
+
+class ClientHelloSpec(object):
+    """The content of a ClientHello, from which the raw bytes of the ClientHello record can be built without OpenSSL.
+
+    Args:
+        tls_version (TlsVersionEnum): The highest version supported by the client.
+        server_name (Optional[Text]): The hostname to send in the Server Name Indication extension; no extension is sent
+            if None.
+        cipher_suites (Optional[List[int]]): The IANA values of the cipher suites supported by the client; if None, all
+            the cipher suites returned by get_default_cipher_suites() are used.
+        extensions (Optional[List[Tuple[int, bytes]]]): Additional extensions to send, as their type and their raw
+            data.
+        should_include_heartbeat (bool): Send the Heartbeat extension (RFC 6520).
+        should_include_fallback_scsv (bool): Add the TLS_FALLBACK_SCSV signaling cipher suite (RFC 7507).
+    """
+
+    # Every cipher suite known to tls_parser, which is more than OpenSSL's "ALL:COMPLEMENTOFALL", so that servers that
+    # only support legacy or uncommon cipher suites still accept the ClientHello
+    DEFAULT_CIPHER_SUITES = _PREFERRED_CIPHER_SUITES + [
+        cipher_suite.value for cipher_suite in CipherSuites
+        if cipher_suite.value not in _PREFERRED_CIPHER_SUITES
+        and cipher_suite not in [CipherSuites.TLS_NULL_WITH_NULL_NULL, CipherSuites.TLS_EMPTY_RENEGOTIATION_INFO_SCSV]
+    ]
+
+    _FALLBACK_SCSV = 0x5600
+
+    # secp256r1, secp384r1 and secp521r1
+    _SUPPORTED_GROUPS = [0x0017, 0x0018, 0x0019]
+
+    # SHA256, SHA384, SHA512 and SHA1 with RSA and ECDSA
+    _SIGNATURE_ALGORITHMS = [0x0401, 0x0403, 0x0501, 0x0503, 0x0601, 0x0603, 0x0201, 0x0203]
+
+    def __init__(self, tls_version, server_name=None, cipher_suites=None, extensions=None,
+                 should_include_heartbeat=False, should_include_fallback_scsv=False):
+        # type: (TlsVersionEnum, Optional[Text], Optional[List[int]], Optional[List[Tuple[int, bytes]]], bool, bool) -> None
+        self.tls_version = tls_version
+        self.server_name = server_name
+        self.cipher_suites = cipher_suites if cipher_suites else self.DEFAULT_CIPHER_SUITES
+        self.extensions = extensions if extensions else []
+        self.should_include_heartbeat = should_include_heartbeat
+        self.should_include_fallback_scsv = should_include_fallback_scsv
+
+    @classmethod
+    def get_default_cipher_suites(cls, preferred_cipher_suite_name=None):
+        # type: (Optional[Text]) -> List[int]
+        """Return the default cipher suites, starting with the supplied one if it is known, such as the cipher suite the
+        server selected when testing connectivity.
+        """
+        try:
+            preferred_cipher_suite = CipherSuites[preferred_cipher_suite_name].value
+        except KeyError:
+            return cls.DEFAULT_CIPHER_SUITES
+        return [preferred_cipher_suite] + [cipher_suite for cipher_suite in cls.DEFAULT_CIPHER_SUITES
+                                           if cipher_suite != preferred_cipher_suite]
+
+    def get_cache_key(self):
+        # type: () -> Tuple[Any, ...]
+        return (self.tls_version, self.server_name, tuple(self.cipher_suites), tuple(self.extensions),
+                self.should_include_heartbeat, self.should_include_fallback_scsv)
+
+    @staticmethod
+    def _get_vector(data, length_size=2):
+        # type: (bytes, int) -> bytes
+        """Prefix the data with its length, as done for the variable-length vectors of the TLS specification.
+        """
+        return struct.pack(b'!I', len(data))[4 - length_size:] + data
+
+    @classmethod
+    def _get_extension(cls, extension_type, extension_data):
+        # type: (int, bytes) -> bytes
+        return struct.pack(b'!H', extension_type) + cls._get_vector(extension_data)
+
+    def _get_extensions(self):
+        # type: () -> List[Tuple[int, bytes]]
+        extensions = []
+        if self.server_name:
+            host_name = self._get_vector(self.server_name.encode('idna'))
+            # A list containing a single name of type host_name (0)
+            extensions.append((TlsExtensionTypeByte.SERVER_NAME, self._get_vector(b'\x00' + host_name)))
+
+        # Secure renegotiation, elliptic curves and point formats; sent by most clients
+        extensions.append((TlsExtensionTypeByte.RENEGOTIATION_INFO, b'\x00'))
+        extensions.append((TlsExtensionTypeByte.SUPPORTED_GROUPS,
+                           self._get_vector(b''.join([struct.pack(b'!H', group) for group in self._SUPPORTED_GROUPS]))))
+        extensions.append((TlsExtensionTypeByte.EC_POINT_FORMATS, self._get_vector(b'\x00', length_size=1)))
+        if self.tls_version == TlsVersionEnum.TLSV1_2:
+            extensions.append((TlsExtensionTypeByte.SIGNATURE_ALGORITHMS, self._get_vector(
+                b''.join([struct.pack(b'!H', algorithm) for algorithm in self._SIGNATURE_ALGORITHMS])
+            )))
+
+        if self.should_include_heartbeat:
+            # Mode peer_allowed_to_send (1)
+            extensions.append((TlsExtensionTypeByte.HEARTBEAT, b'\x01'))
+
+        extensions.extend(self.extensions)
+        return extensions
+
+    def to_bytes(self):
+        # type: () -> bytes
+        """Build the ClientHello record.
+        """
+        cipher_suites = list(self.cipher_suites)
+        if self.should_include_fallback_scsv:
+            cipher_suites.append(self._FALLBACK_SCSV)
+
+        hello_data = TlsRecordTlsVersionBytes[self.tls_version.name].value
+        hello_data += os.urandom(32)
+        # No session ID
+        hello_data += b'\x00'
+        hello_data += self._get_vector(b''.join([struct.pack(b'!H', cipher_suite) for cipher_suite in cipher_suites]))
+        # Only the null compression method
+        hello_data += b'\x01\x00'
+        hello_data += self._get_vector(b''.join([self._get_extension(extension_type, extension_data)
+                                                 for extension_type, extension_data in self._get_extensions()]))
+
+        hello_message = TlsHandshakeMessage(TlsHandshakeTypeByte.CLIENT_HELLO, hello_data)
+        # Use TLS 1.0 for the record layer as some servers reject records with a higher version in the first flight
+        record_version = TlsVersionEnum.SSLV3 if self.tls_version == TlsVersionEnum.SSLV3 else TlsVersionEnum.TLSV1
+        record_header = TlsRecordHeader(TlsRecordTypeByte.HANDSHAKE, record_version, hello_message.size)
+        return TlsHandshakeRecord(record_header, [hello_message]).to_bytes()
+
+
+class ClientHelloCache(object):
+    """Per-process cache of the ClientHello records already built, so that probes sent to the same server many times do
+    not build the same ClientHello every time.
+
+    A cached ClientHello always has the same client random, which is fine for probes that never complete the handshake.
+    """
+
+    MAX_CLIENT_HELLOS_NB = 1000
+
+    _CLIENT_HELLOS = OrderedDict()  # type: OrderedDict
+    _LOCK = threading.Lock()
+
+    @classmethod
+    def get_client_hello(cls, client_hello_spec):
+        # type: (ClientHelloSpec) -> bytes
+        cache_key = client_hello_spec.get_cache_key()
+        with cls._LOCK:
+            client_hello = cls._CLIENT_HELLOS.get(cache_key)
+            if client_hello is not None:
+                return client_hello
+
+        client_hello = client_hello_spec.to_bytes()
+        with cls._LOCK:
+            cls._CLIENT_HELLOS[cache_key] = client_hello
+            if len(cls._CLIENT_HELLOS) > cls.MAX_CLIENT_HELLOS_NB:
+                # Forget about the oldest ClientHello
+                cls._CLIENT_HELLOS.popitem(last=False)
+        return client_hello
@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""Incremental reader for the TLS records sent by a server, used by the plugins that talk TLS over the raw socket.
+"""
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import socket
+import struct
+
+from tls_parser.parser import TlsRecordParser
+from tls_parser.record_protocol import TlsRecord
+from typing import Iterator
+from typing import Optional
+
+
+class TlsRecordStreamReader(object):
+    """Read and parse TLS records from a socket one at a time, keeping the data received in a single buffer.
+
+    Data is received directly into the buffer with recv_into() and each record is only copied once, when it gets parsed;
+    the buffer gets compacted when it is full, which only moves the data of the record that has not been fully received
+    yet. As the header of a record gives its length, the socket is only read again when more data is needed to complete
+    the record.
+
+    Args:
+        sock (socket.socket): The connected socket to read from.
+    """
+
+    # Large enough for the biggest record allowed by the TLS specification (2^14 bytes plus 2048 bytes of expansion)
+    INITIAL_BUFFER_SIZE = 32768
+
+    _RECORD_HEADER_SIZE = 5
+
+    def __init__(self, sock):
+        # type: (socket.socket) -> None
+        self._sock = sock
+        self._buffer = bytearray(self.INITIAL_BUFFER_SIZE)
+        # The data received but not parsed yet is between these two offsets
+        self._start = 0
+        self._end = 0
+
+    @property
+    def pending_bytes(self):
+        # type: () -> bytes
+        """Data that was received from the socket but not returned as a record yet.
+        """
+        return memoryview(self._buffer)[self._start:self._end].tobytes()
+
+    def recv_more(self):
+        # type: () -> int
+        """Receive more data from the socket into the buffer, and return the number of bytes received; 0 means that the
+        server closed the connection.
+        """
+        if self._end == len(self._buffer):
+            pending_size = self._end - self._start
+            if self._start:
+                # Move the data that has not been parsed yet to the beginning of the buffer
+                self._buffer[:pending_size] = self._buffer[self._start:self._end]
+                self._start = 0
+                self._end = pending_size
+            if self._end == len(self._buffer):
+                # The buffer only contains the beginning of a single very large record
+                self._buffer.extend(bytearray(len(self._buffer)))
+
+        received_size = self._sock.recv_into(memoryview(self._buffer)[self._end:])
+        self._end += received_size
+        return received_size
+
+    def read_record(self):
+        # type: () -> Optional[TlsRecord]
+        """Return the next TLS record sent by the server, or None if the server closed the connection before sending a
+        full record.
+        """
+        while True:
+            if self._end - self._start >= self._RECORD_HEADER_SIZE:
+                record_size = self._RECORD_HEADER_SIZE + struct.unpack_from(b'!H', self._buffer, self._start + 3)[0]
+                record_end = self._start + record_size
+                if record_end <= self._end:
+                    # Slicing a memoryview does not copy the data, so the record's bytes only get copied once
+                    record_bytes = memoryview(self._buffer)[self._start:record_end].tobytes()
+                    tls_record, _ = TlsRecordParser.parse_bytes(record_bytes)
+                    if record_end == self._end:
+                        # All the data has been parsed; start from the beginning of the buffer again
+                        self._start = self._end = 0
+                    else:
+                        self._start = record_end
+                    return tls_record
+
+            if not self.recv_more():
+                return None
+
+    def iter_records(self):
+        # type: () -> Iterator[TlsRecord]
+        """Yield the TLS records sent by the server until it closes the connection.
+        """
+        while True:
+            tls_record = self.read_record()
+            if tls_record is None:
+                return
+            yield tls_record
@@ -12,15 +12,16 @@
 
 class WorkerProcess(Process):
 
-    def __init__(self, priority_queue_in, queue_in, queue_out, network_retries, network_timeout):
-        # type: (JoinableQueue, JoinableQueue, JoinableQueue, int, int) -> None
+    def __init__(self, priority_queue_in, queue_in, queue_out, network_retries, network_timeout,
+                 should_trace_connections=False):
+        # type: (JoinableQueue, JoinableQueue, JoinableQueue, int, int, bool) -> None
         Process.__init__(self)
         self.priority_queue_in = priority_queue_in
         self.queue_in = queue_in
         self.queue_out = queue_out
 
         # The object that will actually run the scan commands
-        self._synchronous_scanner = SynchronousScanner(network_retries, network_timeout)
+        self._synchronous_scanner = SynchronousScanner(network_retries, network_timeout, should_trace_connections)
 
 
     def run(self):
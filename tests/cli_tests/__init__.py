@@ -58,3 +58,4 @@ class MockCommandLineValues(object):
     def __init__(self):
         self.timeout = 2
         self.nb_retries = 5
+        self.dedup_certificates = False
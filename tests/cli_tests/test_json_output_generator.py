@@ -3,9 +3,13 @@
 from __future__ import unicode_literals
 
 import json
+import os
 import unittest
 from io import StringIO
 
+from cryptography.hazmat.backends import default_backend
+from cryptography.x509.base import load_pem_x509_certificate
+
 from sslyze.cli import FailedServerScan, CompletedServerScan
 from sslyze.cli.json_output import JsonOutputGenerator
 from sslyze.server_connectivity import ServerConnectivityError
@@ -67,3 +71,35 @@ def test(self):
         self.assertIn(str(scan_time), received_output)
         self.assertIn('"network_timeout": {}'.format(MockCommandLineValues().timeout), received_output)
         self.assertIn('"network_max_retries": {}'.format(MockCommandLineValues().nb_retries), received_output)
+
+    def test_dedup_certificates(self):
+        output_file = StringIO()
+        generator = JsonOutputGenerator(output_file)
+
+        command_line_values = MockCommandLineValues()
+        command_line_values.dedup_certificates = True
+        generator.command_line_parsed(None, command_line_values)
+
+        pem_path = os.path.join(os.path.dirname(__file__), '..', 'utils', 'github.com.pem')
+        with open(pem_path) as pem_file:
+            certificate = load_pem_x509_certificate(pem_file.read().encode('ascii'), default_backend())
+
+        # Two servers sending the same certificate
+        server_info = MockServerConnectivityInfo()
+        for _ in range(2):
+            # noinspection PyTypeChecker
+            plugin_result = MockPluginScanResult(server_info, MockPluginScanCommandOne(), 'Plugin output', None)
+            plugin_result.certificate_chain = [certificate]
+            # noinspection PyTypeChecker
+            generator.server_scan_completed(CompletedServerScan(server_info, [plugin_result]))
+
+        generator.scans_completed(1.3)
+        json_output = json.loads(output_file.getvalue())
+        output_file.close()
+
+        # The certificate was only written once and referenced by each server's chain
+        self.assertEqual(len(json_output['certificates']), 1)
+        certificate_id = list(json_output['certificates'].keys())[0]
+        self.assertIn('as_pem', json_output['certificates'][certificate_id])
+        for server_scan_dict in json_output['accepted_targets']:
+            self.assertEqual(server_scan_dict['commands_results']['plugin1']['certificate_chain'], [certificate_id])
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import json
+import unittest
+from io import StringIO
+
+from sslyze.cli import CompletedServerScan
+from sslyze.cli.trace_output import TraceOutputGenerator
+from sslyze.utils.connection_trace import ConnectionTrace, ConnectionPhaseEnum
+from tests.cli_tests import MockServerConnectivityInfo, MockPluginScanResult, MockCommandLineValues, \
+    MockPluginScanCommandOne, MockPluginScanCommandTwo
+
+
+class TraceOutputGeneratorTestCase(unittest.TestCase):
+
+    def test(self):
+        output_file = StringIO()
+        generator = TraceOutputGenerator(output_file)
+
+        generator.command_line_parsed(None, MockCommandLineValues())
+
+        server_info = MockServerConnectivityInfo()
+        generator.server_connectivity_test_succeeded(server_info)
+
+        generator.scans_started()
+
+        connection_trace = ConnectionTrace(server_info.hostname, server_info.port)
+        connection_trace.add_phase(ConnectionPhaseEnum.TCP_CONNECT, 10.0, 10.1)
+        connection_trace.add_phase(ConnectionPhaseEnum.TLS_HANDSHAKE, 10.1, 10.4, 'Some érrôr')
+        connection_trace.bytes_sent = 300
+        connection_trace.retries_nb = 1
+
+        # noinspection PyTypeChecker
+        plugin_result_1 = MockPluginScanResult(server_info, MockPluginScanCommandOne(), 'Plugin ûnicôdé output', None)
+        plugin_result_1.connection_traces = [connection_trace]
+        # A result without traces
+        # noinspection PyTypeChecker
+        plugin_result_2 = MockPluginScanResult(server_info, MockPluginScanCommandTwo(), 'other plugin Output', None)
+        # noinspection PyTypeChecker
+        server_scan = CompletedServerScan(server_info, [plugin_result_1, plugin_result_2])
+        generator.server_scan_completed(server_scan)
+
+        generator.scans_completed(1.3)
+
+        trace_events = json.loads(output_file.getvalue())['traceEvents']
+        output_file.close()
+
+        slices = [event for event in trace_events if event['ph'] == 'X']
+        self.assertEqual(len(slices), 3)
+
+        # The whole connection with its counters
+        connection_slice = slices[0]
+        self.assertEqual(connection_slice['name'], MockPluginScanCommandOne.get_cli_argument())
+        self.assertAlmostEqual(connection_slice['dur'], 400000, places=0)
+        self.assertEqual(connection_slice['args']['bytes_sent'], 300)
+        self.assertEqual(connection_slice['args']['retries_nb'], 1)
+
+        # Each phase of the connection
+        self.assertEqual([event['name'] for event in slices[1:]], ['tcp_connect', 'tls_handshake'])
+        self.assertEqual(slices[2]['args']['error'], 'Some érrôr')
@@ -2,6 +2,7 @@
 from __future__ import absolute_import
 from __future__ import unicode_literals
 
+import os
 import unittest
 from io import StringIO
 from xml.etree.ElementTree import Element
@@ -92,3 +93,42 @@ def test_with_http_tunneling(self):
         # Ensure the output displayed the tunneling settings
         self.assertIn('httpsTunnelHostname="{}"'.format(tunneling_settings.hostname), received_output)
         self.assertIn('httpsTunnelPort="{}"'.format(tunneling_settings.port), received_output)
+
+
+    def test_dedup_certificates(self):
+        output_file = StringIO()
+        generator = XmlOutputGenerator(output_file)
+
+        command_line_values = MockCommandLineValues()
+        command_line_values.dedup_certificates = True
+        generator.command_line_parsed(None, command_line_values)
+
+        pem_path = os.path.join(os.path.dirname(__file__), '..', 'utils', 'github.com.pem')
+        with open(pem_path) as pem_file:
+            pem_certificate = pem_file.read()
+
+        # Two servers sending the same certificate
+        server_info = MockServerConnectivityInfo()
+        for _ in range(2):
+            plugin_xml = Element('plugin1')
+            chain_xml = Element('receivedCertificateChain')
+            certificate_xml = Element('certificate', sha1Fingerprint='1234')
+            pem_xml = Element('asPEM')
+            pem_xml.text = pem_certificate
+            certificate_xml.append(pem_xml)
+            chain_xml.append(certificate_xml)
+            plugin_xml.append(chain_xml)
+
+            # noinspection PyTypeChecker
+            plugin_result = MockPluginScanResult(server_info, MockPluginScanCommandOne(), 'Plugin output', plugin_xml)
+            # noinspection PyTypeChecker
+            generator.server_scan_completed(CompletedServerScan(server_info, [plugin_result]))
+
+        generator.scans_completed(1.3)
+        received_output = output_file.getvalue()
+        output_file.close()
+
+        # The certificate was only written once and referenced by each server's chain
+        self.assertEqual(received_output.count('<asPEM>'), 1)
+        self.assertEqual(received_output.count('<certificateRef'), 2)
+        self.assertIn('<certificates>', received_output)
@@ -7,8 +7,15 @@
 
 import pickle
 
+from cryptography.hazmat.backends import default_backend
+from cryptography.x509.base import load_pem_x509_certificate
 from sslyze.plugins.certificate_info_plugin import CertificateInfoPlugin, CertificateInfoScanCommand
+from sslyze.plugins.certificate_info_plugin import CertificateInfoScanResult
+from sslyze.plugins.certificate_info_plugin import PathValidationResult
+from sslyze.plugins.utils.trust_store.intermediate_certificates_store import IntermediateCertificatesStore
+from sslyze.plugins.utils.trust_store.trust_store_repository import TrustStoresRepository
 from sslyze.server_connectivity import ServerConnectivityInfo
+from tests.cli_tests import MockServerConnectivityInfo
 
 
 class CertificateInfoPluginTestCase(unittest.TestCase):
@@ -273,4 +280,67 @@ def test_certificate_with_no_subject(self):
         self.assertTrue(plugin_result.as_xml())
 
         # Ensure the results are pickable so the ConcurrentScanner can receive them via a Queue
-        self.assertTrue(pickle.dumps(plugin_result))
\ No newline at end of file
+        self.assertTrue(pickle.dumps(plugin_result))
+
+    def test_lazy_properties(self):
+        utils_path = os.path.join(os.path.dirname(__file__), '..', 'utils')
+        certificate_chain = []
+        for file_name in ['github.com.pem', 'DigiCertSHA2ExtendedValidationServerCA.pem']:
+            with open(os.path.join(utils_path, file_name)) as pem_file:
+                certificate_chain.append(load_pem_x509_certificate(pem_file.read().encode('ascii'), default_backend()))
+
+        server_info = MockServerConnectivityInfo()
+        server_info.tls_server_name_indication = 'github.com'
+        path_validation_result_list = [PathValidationResult(TrustStoresRepository.get_main(), 'ok')]
+        plugin_result = CertificateInfoScanResult(server_info, CertificateInfoScanCommand(), certificate_chain,
+                                                  path_validation_result_list, [], None)
+
+        # Nothing is computed until it gets accessed
+        self.assertNotIn('verified_certificate_chain', plugin_result.__dict__)
+        self.assertEqual(len(plugin_result.verified_certificate_chain), 3)
+        self.assertIn('verified_certificate_chain', plugin_result.__dict__)
+        self.assertTrue(plugin_result.certificate_matches_hostname)
+        self.assertTrue(plugin_result.is_leaf_certificate_ev)
+
+        # The computed properties are pickled with the result
+        unpickled_result = pickle.loads(pickle.dumps(plugin_result))
+        self.assertIn('verified_certificate_chain', unpickled_result.__dict__)
+        self.assertTrue(unpickled_result.__dict__['certificate_matches_hostname'])
+        self.assertEqual(unpickled_result.certificate_chain, certificate_chain)
+        self.assertEqual(unpickled_result.verified_certificate_chain, plugin_result.verified_certificate_chain)
+        self.assertFalse(unpickled_result.has_sha1_in_certificate_chain)
+
+    def test_completed_certificate_chain(self):
+        utils_path = os.path.join(os.path.dirname(__file__), '..', 'utils')
+        certificate_chain = []
+        for file_name in ['github.com.pem', 'DigiCertSHA2ExtendedValidationServerCA.pem']:
+            with open(os.path.join(utils_path, file_name)) as pem_file:
+                certificate_chain.append(load_pem_x509_certificate(pem_file.read().encode('ascii'), default_backend()))
+        leaf_cert, intermediate_cert = certificate_chain
+        trust_store_list = [TrustStoresRepository.get_main()]
+
+        # Nothing to complete if the server sent the intermediate certificate
+        self.assertEqual(CertificateInfoPlugin._complete_certificate_chain(trust_store_list, certificate_chain), [])
+        self.assertEqual(CertificateInfoPlugin._complete_certificate_chain(trust_store_list, [leaf_cert]), [])
+
+        try:
+            # Once another server sent the missing intermediate certificate, the chain can be completed
+            IntermediateCertificatesStore.add_certificates([intermediate_cert])
+            completed_chain = CertificateInfoPlugin._complete_certificate_chain(trust_store_list, [leaf_cert])
+            self.assertEqual(completed_chain[:2], certificate_chain)
+
+            server_info = MockServerConnectivityInfo()
+            server_info.tls_server_name_indication = 'github.com'
+            path_validation_result_list = [PathValidationResult(TrustStoresRepository.get_main(),
+                                                                'unable to get local issuer certificate')]
+            plugin_result = CertificateInfoScanResult(server_info, CertificateInfoScanCommand(), [leaf_cert],
+                                                      path_validation_result_list, [], None, completed_chain)
+
+            # The completed chain is not reported as verified
+            self.assertEqual(plugin_result.verified_certificate_chain, [])
+            self.assertEqual(plugin_result.completed_certificate_chain, completed_chain)
+            self.assertTrue(plugin_result.as_text())
+            self.assertTrue(plugin_result.as_xml())
+            self.assertEqual(pickle.loads(pickle.dumps(plugin_result)).completed_certificate_chain, completed_chain)
+        finally:
+            IntermediateCertificatesStore.clear()
@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import os
+import shutil
+import tempfile
+import unittest
+
+from cryptography.hazmat.backends import default_backend
+from cryptography.x509.base import load_pem_x509_certificate
+from sslyze.plugins.utils.certificate_inventory import CertificateInventory
+
+
+def _load_certificate(file_name):
+    cert_path = os.path.join(os.path.dirname(__file__), '..', 'utils', file_name)
+    with open(cert_path) as cert_file:
+        return load_pem_x509_certificate(cert_file.read().encode('ascii'), default_backend())
+
+
+class CertificateInventoryTestCase(unittest.TestCase):
+
+    # May 1st 2018, two weeks before the github.com certificate expired
+    _REFERENCE_TIME = 1525132800
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.inventory = CertificateInventory(os.path.join(self.temp_dir, 'inventory.sqlite'))
+
+    def tearDown(self):
+        shutil.rmtree(self.temp_dir)
+
+    def test(self):
+        leaf_cert = _load_certificate('github.com.pem')
+        intermediate_cert = _load_certificate('DigiCertSHA2ExtendedValidationServerCA.pem')
+        self.inventory.add_certificate_chain('github.com', '192.30.253.113', 443, 'github.com',
+                                             [leaf_cert, intermediate_cert])
+        self.inventory.add_certificate_chain('www.github.com', '192.30.253.113', 443, 'www.github.com', [leaf_cert])
+
+        # The github.com certificate expires on May 17th 2018
+        expiring_certificates = self.inventory.get_certificates_expiring_within(30, reference_time=self._REFERENCE_TIME)
+        self.assertEqual(len(expiring_certificates), 1)
+        leaf_cert_row = expiring_certificates[0]
+        self.assertIn('github.com', leaf_cert_row['dns_subject_alternative_names'])
+        self.assertEqual(self.inventory.get_certificate(leaf_cert_row['fingerprint']), leaf_cert_row)
+
+        endpoints = self.inventory.get_endpoints_for_certificate(leaf_cert_row['fingerprint'])
+        self.assertEqual([endpoint['hostname'] for endpoint in endpoints], ['github.com', 'www.github.com'])
+
+        # The intermediate certificate expires in 2028
+        self.assertEqual(len(self.inventory.get_certificates_expiring_within(
+            30, leaf_certificates_only=False, reference_time=self._REFERENCE_TIME
+        )), 1)
+        self.assertEqual(len(self.inventory.get_certificates_expiring_within(
+            20 * 365, leaf_certificates_only=False, reference_time=self._REFERENCE_TIME
+        )), 2)
+        self.assertEqual(self.inventory.get_reused_public_keys(), {})
+
+    def test_reused_public_key(self):
+        # The self-signed certificates from badssl.com share the same key
+        first_cert = _load_certificate('self-signed.badssl.com.pem')
+        second_cert = _load_certificate('wildcard-self-signed.pem')
+        self.inventory.add_certificate_chain('self-signed.badssl.com', '104.154.89.105', 443, 'self-signed.badssl.com',
+                                             [first_cert])
+        self.inventory.add_certificate_chain('wildcard.badssl.com', '104.154.89.105', 443, 'wildcard.badssl.com',
+                                             [second_cert])
+
+        reused_public_keys = self.inventory.get_reused_public_keys()
+        self.assertEqual(len(reused_public_keys), 1)
+        self.assertEqual(len(list(reused_public_keys.values())[0]), 2)
+
+    def test_endpoint_without_ip_address(self):
+        # The IP address is not known when scanning through an HTTP tunnel
+        leaf_cert = _load_certificate('github.com.pem')
+        intermediate_cert = _load_certificate('DigiCertSHA2ExtendedValidationServerCA.pem')
+        self.inventory.add_certificate_chain('github.com', None, 443, 'github.com', [leaf_cert, intermediate_cert])
+        self.inventory.add_certificate_chain('github.com', None, 443, 'github.com', [leaf_cert])
+
+        leaf_cert_row = self.inventory.get_certificates_expiring_within(30, reference_time=self._REFERENCE_TIME)[0]
+        endpoints = self.inventory.get_endpoints_for_certificate(leaf_cert_row['fingerprint'])
+        self.assertEqual(len(endpoints), 1)
+        self.assertIsNone(endpoints[0]['ip_address'])
+
+        # The certificates no longer returned by the endpoint were removed
+        intermediate_cert_rows = self.inventory.get_certificates_expiring_within(
+            20 * 365, leaf_certificates_only=False, reference_time=self._REFERENCE_TIME
+        )
+        self.assertEqual(self.inventory.get_endpoints_for_certificate(intermediate_cert_rows[1]['fingerprint']), [])
+
+    def test_duplicated_certificate_in_chain(self):
+        leaf_cert = _load_certificate('github.com.pem')
+        intermediate_cert = _load_certificate('DigiCertSHA2ExtendedValidationServerCA.pem')
+        self.inventory.add_certificate_chain('github.com', '192.30.253.113', 443, 'github.com',
+                                             [leaf_cert, intermediate_cert, intermediate_cert])
+
+        # The intermediate certificate is only recorded at its first position
+        intermediate_cert_row = self.inventory.get_certificates_expiring_within(
+            20 * 365, leaf_certificates_only=False, reference_time=self._REFERENCE_TIME
+        )[1]
+        endpoints = self.inventory.get_endpoints_for_certificate(intermediate_cert_row['fingerprint'])
+        self.assertEqual([endpoint['position_in_chain'] for endpoint in endpoints], [1])
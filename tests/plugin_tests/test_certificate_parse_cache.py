@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import os
+import unittest
+
+from cryptography.hazmat.primitives.serialization import Encoding
+from sslyze.plugins.utils.certificate_parse_cache import CertificateParseCache
+from sslyze.plugins.utils.certificate_utils import CertificateUtils
+
+
+class CertificateParseCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        CertificateParseCache.clear()
+
+    def tearDown(self):
+        CertificateParseCache.clear()
+
+    def _read_pem(self, file_name):
+        with open(os.path.join(os.path.dirname(__file__), '..', 'utils', file_name)) as pem_file:
+            return pem_file.read()
+
+    def test_same_certificate_parsed_once(self):
+        pem_certificate = self._read_pem('github.com.pem')
+        certificate = CertificateParseCache.get_certificate_from_pem(pem_certificate)
+
+        # PEM as text or bytes, or DER: the same object is returned
+        self.assertIs(CertificateParseCache.get_certificate_from_pem(pem_certificate.encode('ascii')), certificate)
+        self.assertIs(CertificateParseCache.get_certificate_from_der(certificate.public_bytes(Encoding.DER)),
+                      certificate)
+
+    def test_derived_data(self):
+        certificate = CertificateParseCache.get_certificate_from_pem(self._read_pem('github.com.pem'))
+        hpkp_pin = CertificateUtils.get_hpkp_pin(certificate)
+        self.assertEqual(CertificateUtils._compute_hpkp_pin(certificate), hpkp_pin)
+
+        computed_values = []
+        def compute_function(cert):
+            computed_values.append(cert)
+            return 'value'
+
+        self.assertEqual(CertificateParseCache.get_derived_data(certificate, 'test', compute_function), 'value')
+        self.assertEqual(CertificateParseCache.get_derived_data(certificate, 'test', compute_function), 'value')
+        self.assertEqual(len(computed_values), 1)
+
+    def test_lru_eviction(self):
+        original_max_entries_nb = CertificateParseCache.MAX_ENTRIES_NB
+        CertificateParseCache.MAX_ENTRIES_NB = 2
+        try:
+            github_pem = self._read_pem('github.com.pem')
+            github_cert = CertificateParseCache.get_certificate_from_pem(github_pem)
+            CertificateParseCache.get_certificate_from_pem(self._read_pem('self-signed.badssl.com.pem'))
+
+            # Use the GitHub certificate again so that the other one is the least recently used
+            self.assertIs(CertificateParseCache.get_certificate_from_pem(github_pem), github_cert)
+            CertificateParseCache.get_certificate_from_pem(self._read_pem('wildcard-self-signed.pem'))
+
+            self.assertIs(CertificateParseCache.get_certificate_from_pem(github_pem), github_cert)
+            self.assertEqual(len(CertificateParseCache._ENTRIES), 2)
+        finally:
+            CertificateParseCache.MAX_ENTRIES_NB = original_max_entries_nb
@@ -23,6 +23,8 @@ def test(self):
         self.assertIsNone(CertificateUtils.matches_hostname(certificate, 'www.github.com'))
         with self.assertRaises(ssl.CertificateError):
             self.assertFalse(CertificateUtils.matches_hostname(certificate, 'notgithub.com'))
+        self.assertEqual(CertificateUtils.match_hostnames(certificate, ['github.com', 'www.github.com', 'notgithub.com']),
+                         {'github.com': True, 'www.github.com': True, 'notgithub.com': False})
 
         self.assertEqual(CertificateUtils.get_common_names(certificate.subject), ['github.com'])
         self.assertEqual(CertificateUtils.get_dns_subject_alternative_names(certificate), ['github.com',
@@ -8,6 +8,7 @@
 
 import pickle
 
+from nassl.ssl_client import OpenSslVersionEnum
 from sslyze.plugins.fallback_scsv_plugin import FallbackScsvPlugin, FallbackScsvScanCommand
 from sslyze.server_connectivity import ServerConnectivityInfo
 from tests.plugin_tests.openssl_server import NotOnLinux64Error
@@ -31,6 +32,25 @@ def test_fallback_good(self):
         # Ensure the results are pickable so the ConcurrentScanner can receive them via a Queue
         self.assertTrue(pickle.dumps(plugin_result))
 
+    def test_fallback_matrix(self):
+        server_info = ServerConnectivityInfo(hostname='www.google.com')
+        server_info.test_connectivity_to_server()
+
+        plugin = FallbackScsvPlugin()
+        plugin_result = plugin.process_task(server_info, FallbackScsvScanCommand(fallback_matrix=True))
+
+        self.assertTrue(plugin_result.supports_fallback_scsv)
+        # Every version below the highest version supported was tested, starting with TLS 1.1; SSL 3.0 is skipped if
+        # another test already found it to be unsupported
+        tested_ssl_versions = [result.ssl_version for result in plugin_result.downgrade_results]
+        self.assertEqual(tested_ssl_versions[:2], [OpenSslVersionEnum.TLSV1_1, OpenSslVersionEnum.TLSV1])
+
+        self.assertTrue(plugin_result.as_text())
+        self.assertTrue(plugin_result.as_xml())
+
+        # Ensure the results are pickable so the ConcurrentScanner can receive them via a Queue
+        self.assertTrue(pickle.dumps(plugin_result))
+
     def test_fallback_bad(self):
         try:
             with VulnerableOpenSslServer() as server:
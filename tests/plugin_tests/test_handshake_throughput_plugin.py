@@ -0,0 +1,42 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import unittest
+
+import pickle
+
+from nassl.ssl_client import OpenSslVersionEnum
+from sslyze.plugins.handshake_throughput_plugin import HandshakeThroughputPlugin, HandshakeThroughputScanCommand
+from sslyze.server_connectivity import ServerConnectivityInfo
+
+
+class HandshakeThroughputPluginTestCase(unittest.TestCase):
+
+    def test_throughput(self):
+        server_info = ServerConnectivityInfo(hostname='www.google.com')
+        server_info.test_connectivity_to_server()
+
+        plugin = HandshakeThroughputPlugin()
+        scan_command = HandshakeThroughputScanCommand(throughput_cipher='ECDHE-RSA-AES128-GCM-SHA256',
+                                                      throughput_ssl_version='tlsv1_2',
+                                                      throughput_max_concurrency=4,
+                                                      throughput_level_duration=1)
+        plugin_result = plugin.process_task(server_info, scan_command)
+
+        self.assertEqual(plugin_result.ssl_version, OpenSslVersionEnum.TLSV1_2)
+        self.assertEqual(plugin_result.cipher_name, 'ECDHE-RSA-AES128-GCM-SHA256')
+        self.assertTrue(plugin_result.concurrency_level_results)
+        self.assertEqual(plugin_result.concurrency_level_results[0].concurrency, 1)
+        self.assertTrue(plugin_result.max_handshakes_per_second > 0)
+        self.assertTrue(plugin_result.stop_reason)
+
+        self.assertTrue(plugin_result.as_text())
+        self.assertTrue(plugin_result.as_xml())
+
+        # Ensure the results are pickable so the ConcurrentScanner can receive them via a Queue
+        self.assertTrue(pickle.dumps(plugin_result))
+
+    def test_invalid_ssl_version(self):
+        with self.assertRaises(ValueError):
+            HandshakeThroughputScanCommand(throughput_ssl_version='tlsv9')
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import unittest
+
+from sslyze.plugins.utils.hostname_matcher import HostnameMatcher
+
+
+class HostnameMatcherTestCase(unittest.TestCase):
+
+    def test_exact_names(self):
+        matcher = HostnameMatcher(['github.com', 'WWW.github.com'])
+        self.assertTrue(matcher.matches('github.com'))
+        self.assertTrue(matcher.matches('www.GitHub.com.'))
+        self.assertFalse(matcher.matches('api.github.com'))
+        self.assertFalse(matcher.matches('notgithub.com'))
+
+    def test_wildcards(self):
+        matcher = HostnameMatcher(['*.badssl.com', 'w*.example.com', '*.*.example.org', 'xn--*.example.net'])
+        self.assertTrue(matcher.matches('self-signed.badssl.com'))
+        self.assertFalse(matcher.matches('badssl.com'))
+        # A wildcard only matches one label
+        self.assertFalse(matcher.matches('a.b.badssl.com'))
+
+        self.assertTrue(matcher.matches('www.example.com'))
+        self.assertFalse(matcher.matches('mail.example.com'))
+
+        # Invalid wildcards never match
+        self.assertFalse(matcher.matches('a.b.example.org'))
+        self.assertFalse(matcher.matches('xn--a.example.net'))
+
+    def test_match_hostnames(self):
+        matcher = HostnameMatcher(['*.badssl.com'])
+        self.assertEqual(matcher.match_hostnames(['expired.badssl.com', 'github.com']),
+                         {'expired.badssl.com': True, 'github.com': False})
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import unittest
+
+from nassl.ocsp_response import OcspResponseNotTrustedError
+from sslyze.plugins.utils.ocsp_verification_cache import OcspVerificationCache
+from sslyze.plugins.utils.trust_store.trust_store_repository import TrustStoresRepository
+
+
+class MockOcspResponse(object):
+
+    def __init__(self, next_update, is_trusted=True):
+        self.next_update = next_update
+        self.is_trusted = is_trusted
+        self.verify_calls_nb = 0
+
+    def as_text(self):
+        return 'OCSP Response Data: {}'.format(self.next_update)
+
+    def as_dict(self):
+        return {'responses': [{'nextUpdate': self.next_update}]}
+
+    def verify(self, verify_locations):
+        self.verify_calls_nb += 1
+        if not self.is_trusted:
+            raise OcspResponseNotTrustedError(verify_locations)
+
+
+class OcspVerificationCacheTestCase(unittest.TestCase):
+
+    def setUp(self):
+        OcspVerificationCache.clear()
+
+    def tearDown(self):
+        OcspVerificationCache.clear()
+
+    def test_verified_once_until_next_update(self):
+        trust_store = TrustStoresRepository.get_main()
+        ocsp_response = MockOcspResponse('Nov  9 12:00:00 2099 GMT', is_trusted=False)
+
+        self.assertFalse(OcspVerificationCache.is_response_trusted(ocsp_response, trust_store))
+        self.assertFalse(OcspVerificationCache.is_response_trusted(ocsp_response, trust_store))
+        self.assertEqual(ocsp_response.verify_calls_nb, 1)
+
+        # Another trust store requires another verification
+        other_trust_store = TrustStoresRepository.get_all()[1]
+        OcspVerificationCache.is_response_trusted(ocsp_response, other_trust_store)
+        self.assertEqual(ocsp_response.verify_calls_nb, 2)
+
+    def test_expired_response_verified_again(self):
+        trust_store = TrustStoresRepository.get_main()
+        ocsp_response = MockOcspResponse('Nov  9 12:00:00 2015 GMT')
+
+        self.assertTrue(OcspVerificationCache.is_response_trusted(ocsp_response, trust_store))
+        self.assertTrue(OcspVerificationCache.is_response_trusted(ocsp_response, trust_store))
+        self.assertEqual(ocsp_response.verify_calls_nb, 2)
+
+    def test_parse_openssl_time(self):
+        self.assertEqual(OcspVerificationCache._parse_openssl_time('Jan  1 00:00:00 1970 GMT'), 0)
+        self.assertIsNone(OcspVerificationCache._parse_openssl_time('not a date'))
+        self.assertIsNone(OcspVerificationCache._parse_openssl_time(None))
@@ -28,6 +28,26 @@ def test_renegotiation_good(self):
         # Ensure the results are pickable so the ConcurrentScanner can receive them via a Queue
         self.assertTrue(pickle.dumps(plugin_result))
 
+    def test_renegotiation_tolerance_rejected(self):
+        server_info = ServerConnectivityInfo(hostname='www.google.com')
+        server_info.test_connectivity_to_server()
+
+        plugin = SessionRenegotiationPlugin()
+        plugin_result = plugin.process_task(server_info, SessionRenegotiationScanCommand(reneg_max_attempts=10))
+
+        # The server rejects client-initiated renegotiations so it tolerates none
+        self.assertFalse(plugin_result.accepts_client_renegotiation)
+        self.assertEqual(plugin_result.tolerated_renegotiations_nb, 0)
+        self.assertFalse(plugin_result.renegotiation_durations)
+        # Stored as an attribute so that it gets written to the JSON output
+        self.assertIn('tolerated_renegotiations_nb', plugin_result.__dict__)
+
+        self.assertTrue(plugin_result.as_text())
+        self.assertTrue(plugin_result.as_xml())
+
+        # Ensure the results are pickable so the ConcurrentScanner can receive them via a Queue
+        self.assertTrue(pickle.dumps(plugin_result))
+
     def test_renegotiation_bad(self):
         # TBD
         pass
\ No newline at end of file
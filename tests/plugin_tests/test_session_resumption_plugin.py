@@ -7,7 +7,8 @@
 import pickle
 
 from sslyze.plugins.session_resumption_plugin import SessionResumptionPlugin, SessionResumptionSupportScanCommand, \
-    SessionResumptionRateScanCommand
+    SessionResumptionRateScanCommand, HandshakeLatencyScanCommand, HandshakeLatencyStatistics, HandshakeTypeEnum, \
+    ResumptionAttempt, SessionCacheTopology
 from sslyze.server_connectivity import ServerConnectivityInfo
 
 
@@ -21,6 +22,8 @@ def test_resumption_support(self):
         plugin_result = plugin.process_task(server_info, SessionResumptionSupportScanCommand())
 
         self.assertTrue(plugin_result.is_ticket_resumption_supported)
+        self.assertTrue(plugin_result.tls_ticket_lifetime_hint)
+        self.assertTrue(plugin_result.tls_ticket_key_names)
         self.assertTrue(plugin_result.attempted_resumptions_nb)
         self.assertTrue(plugin_result.successful_resumptions_nb)
         self.assertFalse(plugin_result.errored_resumptions_list)
@@ -48,3 +51,100 @@ def test_resumption_rate(self):
         # Ensure the results are pickable so the ConcurrentScanner can receive them via a Queue
         self.assertTrue(pickle.dumps(plugin_result))
 
+    def test_resumption_rate_with_seed_sessions(self):
+        server_info = ServerConnectivityInfo(hostname='www.google.com')
+        server_info.test_connectivity_to_server()
+
+        plugin = SessionResumptionPlugin()
+        plugin_result = plugin.process_task(server_info, SessionResumptionRateScanCommand(seed_sessions_nb=3))
+
+        self.assertEqual(plugin_result.attempted_resumptions_nb, 100)
+        self.assertEqual(len(plugin_result.seed_session_results), 3)
+        self.assertEqual(sum([seed_result.attempted_resumptions_nb
+                              for seed_result in plugin_result.seed_session_results]), 100)
+        self.assertEqual(sum([seed_result.successful_resumptions_nb
+                              for seed_result in plugin_result.seed_session_results]),
+                         plugin_result.successful_resumptions_nb)
+        self.assertFalse(plugin_result.errored_resumptions_list)
+        # Stored as an attribute so that it gets written to the JSON output
+        self.assertIn('resumption_rate', plugin_result.seed_session_results[0].__dict__)
+
+        self.assertTrue(plugin_result.as_text())
+        self.assertTrue(plugin_result.as_xml())
+
+        # Ensure the results are pickable so the ConcurrentScanner can receive them via a Queue
+        self.assertTrue(pickle.dumps(plugin_result))
+
+    def test_resumption_rate_with_ticket_resumptions(self):
+        server_info = ServerConnectivityInfo(hostname='www.google.com')
+        server_info.test_connectivity_to_server()
+
+        plugin = SessionResumptionPlugin()
+        plugin_result = plugin.process_task(server_info, SessionResumptionRateScanCommand(ticket_resumptions_nb=10))
+
+        self.assertEqual(len(plugin_result.resumption_attempts), 110)
+        self.assertFalse(plugin_result.errored_ticket_resumptions_list)
+        topology = plugin_result.session_cache_topology
+        self.assertEqual(topology.ticket_attempts_nb, 10)
+        self.assertTrue(topology.estimated_session_caches_nb)
+        self.assertTrue(topology.estimated_ticket_key_groups_nb)
+
+        self.assertTrue(plugin_result.as_text())
+        self.assertTrue(plugin_result.as_xml())
+
+        # Ensure the results are pickable so the ConcurrentScanner can receive them via a Queue
+        self.assertTrue(pickle.dumps(plugin_result))
+
+    def test_session_cache_topology(self):
+        # Two backends with their own session cache and ticket key, behind a round-robin load-balancer
+        resumption_attempts = [
+            ResumptionAttempt(HandshakeTypeEnum.SESSION_ID_RESUMPTION, 'AA01', 'AA01', was_resumed=True),
+            ResumptionAttempt(HandshakeTypeEnum.SESSION_ID_RESUMPTION, 'AA02', 'BB01', was_resumed=False),
+            ResumptionAttempt(HandshakeTypeEnum.SESSION_ID_RESUMPTION, 'BB02', 'BB02', was_resumed=True),
+            ResumptionAttempt(HandshakeTypeEnum.SESSION_ID_RESUMPTION, 'BB03', 'AA03', was_resumed=False),
+            ResumptionAttempt(HandshakeTypeEnum.TLS_TICKET_RESUMPTION, 'key1', 'key1', was_resumed=True),
+            ResumptionAttempt(HandshakeTypeEnum.TLS_TICKET_RESUMPTION, 'key1', 'key2', was_resumed=False),
+        ]
+        topology = SessionCacheTopology(resumption_attempts)
+        self.assertEqual(topology.session_id_attempts_nb, 4)
+        self.assertEqual(topology.successful_session_id_resumptions_nb, 2)
+        self.assertEqual(topology.estimated_session_caches_nb, 2)
+        self.assertEqual(topology.ticket_attempts_nb, 2)
+        self.assertEqual(topology.successful_ticket_resumptions_nb, 1)
+        self.assertEqual(topology.tls_ticket_key_names, ['key1', 'key2'])
+        self.assertEqual(topology.estimated_ticket_key_groups_nb, 2)
+
+        topology = SessionCacheTopology(resumption_attempts[1:2])
+        self.assertIsNone(topology.estimated_session_caches_nb)
+        self.assertIsNone(topology.estimated_ticket_key_groups_nb)
+
+    def test_handshake_latency(self):
+        server_info = ServerConnectivityInfo(hostname='www.google.com')
+        server_info.test_connectivity_to_server()
+
+        plugin = SessionResumptionPlugin()
+        plugin_result = plugin.process_task(server_info, HandshakeLatencyScanCommand(latency_handshakes_nb=10,
+                                                                                     latency_concurrency=2))
+
+        self.assertEqual(plugin_result.concurrency, 2)
+        for latency in [plugin_result.full_handshake_latency, plugin_result.session_id_resumption_latency,
+                        plugin_result.tls_ticket_resumption_latency]:
+            self.assertEqual(latency.attempted_handshakes_nb, 10)
+            self.assertTrue(latency.handshake_durations)
+            self.assertFalse(latency.errored_handshakes_list)
+            self.assertTrue(latency.p50 <= latency.p95 <= latency.p99)
+
+        self.assertTrue(plugin_result.as_text())
+        self.assertTrue(plugin_result.as_xml())
+
+        # Ensure the results are pickable so the ConcurrentScanner can receive them via a Queue
+        self.assertTrue(pickle.dumps(plugin_result))
+
+    def test_handshake_latency_percentiles(self):
+        latency = HandshakeLatencyStatistics(100, [float(duration) for duration in range(100, 0, -1)], 0, [])
+        self.assertEqual(latency.p50, 50.0)
+        self.assertEqual(latency.p95, 95.0)
+        self.assertEqual(latency.p99, 99.0)
+
+        latency = HandshakeLatencyStatistics(0, [], 0, [], 'TLS ticket not assigned')
+        self.assertIsNone(latency.p50)
@@ -3,13 +3,26 @@
 from __future__ import unicode_literals
 
 import os
+import pickle
+import shutil
+import tempfile
 import unittest
 
 from cryptography.hazmat.backends import default_backend
 from cryptography.x509.base import load_pem_x509_certificate
+from sslyze.plugins.utils.trust_store.intermediate_certificates_store import IntermediateCertificatesStore
+from sslyze.plugins.utils.trust_store.trust_store import AnchorCertificateNotInTrustStoreError
+from sslyze.plugins.utils.trust_store.trust_store import TrustStore
+from sslyze.plugins.utils.trust_store.trust_store_index import TrustStoreIndex
 from sslyze.plugins.utils.trust_store.trust_store_repository import TrustStoresRepository
 
 
+def _load_certificate(file_name):
+    cert_path = os.path.join(os.path.dirname(__file__), '..', 'utils', file_name)
+    with open(cert_path) as cert_file:
+        return load_pem_x509_certificate(cert_file.read().encode('ascii'), default_backend())
+
+
 class TrustStoreTestCase(unittest.TestCase):
 
     def test(self):
@@ -35,3 +48,108 @@ def test(self):
                 self.assertTrue(trust_store.is_extended_validation(certificate_chain[0]))
 
         self.assertTrue(found_mozilla)
+
+    def test_build_verified_certificate_chain_out_of_order(self):
+        leaf_cert = _load_certificate('github.com.pem')
+        intermediate_cert = _load_certificate('DigiCertSHA2ExtendedValidationServerCA.pem')
+        certificate_chain = [leaf_cert, _load_certificate('self-signed.badssl.com.pem'), intermediate_cert]
+        self.assertFalse(TrustStore.is_certificate_chain_order_valid(certificate_chain))
+
+        # The unrelated certificate is ignored
+        verified_chain = TrustStoresRepository.get_main().build_verified_certificate_chain(certificate_chain)
+        self.assertEqual(verified_chain[:2], [leaf_cert, intermediate_cert])
+        self.assertEqual(len(verified_chain), 3)
+
+    def test_build_verified_certificate_chain_with_harvested_intermediate(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            IntermediateCertificatesStore.set_path(temp_dir)
+            leaf_cert = _load_certificate('github.com.pem')
+            intermediate_cert = _load_certificate('DigiCertSHA2ExtendedValidationServerCA.pem')
+            trust_store = TrustStoresRepository.get_main()
+            with self.assertRaises(AnchorCertificateNotInTrustStoreError):
+                trust_store.build_verified_certificate_chain([leaf_cert])
+
+            # Once another server sent the intermediate certificate, it is used to complete the chain
+            IntermediateCertificatesStore.add_certificates([leaf_cert, intermediate_cert])
+            self.assertEqual(len(os.listdir(temp_dir)), 1)
+            self.assertEqual(trust_store.build_verified_certificate_chain([leaf_cert])[:2],
+                             [leaf_cert, intermediate_cert])
+
+            # Including by other processes, which load the saved certificates
+            IntermediateCertificatesStore.clear()
+            self.assertEqual(trust_store.build_verified_certificate_chain([leaf_cert])[:2],
+                             [leaf_cert, intermediate_cert])
+        finally:
+            IntermediateCertificatesStore.set_path(None)
+            shutil.rmtree(temp_dir)
+
+    def test_harvested_intermediate_kept_in_memory_by_default(self):
+        leaf_cert = _load_certificate('github.com.pem')
+        intermediate_cert = _load_certificate('DigiCertSHA2ExtendedValidationServerCA.pem')
+        try:
+            IntermediateCertificatesStore.add_certificates([leaf_cert, intermediate_cert])
+            self.assertEqual(IntermediateCertificatesStore.get_certificates_with_subject(intermediate_cert.subject),
+                             [intermediate_cert])
+        finally:
+            IntermediateCertificatesStore.clear()
+
+    def test_select_issuer_certificate(self):
+        leaf_cert = _load_certificate('github.com.pem')
+        intermediate_cert = _load_certificate('DigiCertSHA2ExtendedValidationServerCA.pem')
+        unrelated_cert = _load_certificate('self-signed.badssl.com.pem')
+
+        self.assertTrue(TrustStore._is_signature_valid(leaf_cert, intermediate_cert))
+        self.assertFalse(TrustStore._is_signature_valid(leaf_cert, unrelated_cert))
+
+        # The certificate that signed the leaf certificate is picked
+        self.assertEqual(TrustStore._select_issuer_certificate(leaf_cert, [unrelated_cert, intermediate_cert]),
+                         intermediate_cert)
+
+    def test_index(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            pem_path = os.path.join(temp_dir, 'store.pem')
+            shutil.copy(os.path.join(os.path.dirname(__file__), '..', 'utils', 'self-signed.badssl.com.pem'), pem_path)
+            certificate = _load_certificate('self-signed.badssl.com.pem')
+
+            # The index is only kept in memory
+            index = TrustStoreIndex(pem_path)
+            self.assertEqual(os.listdir(temp_dir), ['store.pem'])
+            self.assertEqual(len(index), 1)
+            self.assertEqual(index.get_certificate_with_subject(certificate.subject), certificate)
+            self.assertEqual(index.get_certificates_with_public_key_hash(TrustStoreIndex.hash_public_key(certificate)),
+                             [certificate])
+            self.assertIsNone(index.get_certificate_with_subject(_load_certificate('github.com.pem').subject))
+
+            # Once built, the index is sent along with the pickled trust store instead of parsing the PEM file again
+            trust_store = TrustStore(pem_path, 'Test', 'N/A')
+            self.assertEqual(trust_store.build_verified_certificate_chain([certificate]), [certificate, certificate])
+            os.remove(pem_path)
+            unpickled_trust_store = pickle.loads(pickle.dumps(trust_store))
+            self.assertEqual(unpickled_trust_store.build_verified_certificate_chain([certificate]),
+                             [certificate, certificate])
+        finally:
+            shutil.rmtree(temp_dir)
+
+    def test_get_custom_trust_store(self):
+        temp_dir = tempfile.mkdtemp()
+        try:
+            pem_path = os.path.join(temp_dir, 'store.pem')
+            shutil.copy(os.path.join(os.path.dirname(__file__), '..', 'utils', 'self-signed.badssl.com.pem'), pem_path)
+
+            # The same trust store is returned as long as the file does not change
+            trust_store = TrustStoresRepository.get_custom_trust_store(pem_path, 'Custom --ca_file', 'N/A')
+            self.assertIs(TrustStoresRepository.get_custom_trust_store(pem_path, 'Custom --ca_file', 'N/A'),
+                          trust_store)
+
+            # And a new one once it was updated
+            with open(pem_path, 'a') as pem_file:
+                pem_file.write('\n')
+            self.assertIsNot(TrustStoresRepository.get_custom_trust_store(pem_path, 'Custom --ca_file', 'N/A'),
+                             trust_store)
+
+            with self.assertRaises(IOError):
+                TrustStoresRepository.get_custom_trust_store(os.path.join(temp_dir, 'missing.pem'), 'Test', 'N/A')
+        finally:
+            shutil.rmtree(temp_dir)
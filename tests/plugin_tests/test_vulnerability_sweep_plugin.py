@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import unittest
+
+import pickle
+
+from sslyze.plugins.compression_plugin import CompressionScanResult
+from sslyze.plugins.fallback_scsv_plugin import FallbackScsvScanResult
+from sslyze.plugins.heartbleed_plugin import HeartbleedScanResult
+from sslyze.plugins.openssl_ccs_injection_plugin import OpenSslCcsInjectionScanResult
+from sslyze.plugins.session_renegotiation_plugin import SessionRenegotiationScanResult
+from sslyze.plugins.vulnerability_sweep_plugin import VulnerabilitySweepPlugin, VulnerabilitySweepScanCommand
+from sslyze.server_connectivity import ServerConnectivityInfo
+
+
+class VulnerabilitySweepPluginTestCase(unittest.TestCase):
+
+    def test_vulnerability_sweep(self):
+        server_info = ServerConnectivityInfo(hostname='www.google.com')
+        server_info.test_connectivity_to_server()
+
+        plugin = VulnerabilitySweepPlugin()
+        plugin_result = plugin.process_task(server_info, VulnerabilitySweepScanCommand())
+
+        self.assertIsInstance(plugin_result.heartbleed_result, HeartbleedScanResult)
+        self.assertFalse(plugin_result.heartbleed_result.is_vulnerable_to_heartbleed)
+        self.assertIsInstance(plugin_result.openssl_ccs_result, OpenSslCcsInjectionScanResult)
+        self.assertFalse(plugin_result.openssl_ccs_result.is_vulnerable_to_ccs_injection)
+        self.assertIsInstance(plugin_result.compression_result, CompressionScanResult)
+        self.assertFalse(plugin_result.compression_result.compression_name)
+        self.assertIsInstance(plugin_result.fallback_result, FallbackScsvScanResult)
+        self.assertTrue(plugin_result.fallback_result.supports_fallback_scsv)
+        self.assertIsInstance(plugin_result.reneg_result, SessionRenegotiationScanResult)
+        self.assertFalse(plugin_result.reneg_result.accepts_client_renegotiation)
+        self.assertTrue(plugin_result.reneg_result.supports_secure_renegotiation)
+
+        self.assertTrue(plugin_result.as_text())
+        self.assertTrue(plugin_result.as_xml())
+
+        # Ensure the results are pickable so the ConcurrentScanner can receive them via a Queue
+        self.assertTrue(pickle.dumps(plugin_result))
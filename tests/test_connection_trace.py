@@ -0,0 +1,83 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import threading
+import unittest
+
+from sslyze.utils.connection_trace import ConnectionTraceCollector, ConnectionTrace, ConnectionPhaseEnum
+from sslyze.utils.thread_pool import ThreadPool
+
+
+def _open_traced_connection(hostname):
+    connection_trace = ConnectionTrace(hostname, 443)
+    connection_trace.add_phase(ConnectionPhaseEnum.TLS_HANDSHAKE, 10.0, 10.5)
+    connection_trace.retries_nb = 1
+    connection_trace.bytes_sent = 100
+    connection_trace.bytes_received = 1000
+    trace_collector = ConnectionTraceCollector.get_active_collector()
+    if trace_collector:
+        trace_collector.add_connection_trace(connection_trace)
+
+
+class ConnectionTraceCollectorTestCase(unittest.TestCase):
+
+    def test_summary(self):
+        with ConnectionTraceCollector() as trace_collector:
+            _open_traced_connection('www.google.com')
+            _open_traced_connection('www.google.com')
+        self.assertIsNone(ConnectionTraceCollector.get_active_collector())
+
+        summary = trace_collector.get_summary()
+        self.assertEqual(summary.connections_nb, 2)
+        self.assertAlmostEqual(summary.phase_durations['TLS_HANDSHAKE'], 1.0)
+        self.assertEqual(summary.phase_durations['TCP_CONNECT'], 0.0)
+        self.assertEqual(summary.retries_nb, 2)
+        self.assertEqual(summary.bytes_sent, 200)
+        self.assertEqual(summary.bytes_received, 2000)
+
+    def test_one_collector_per_thread(self):
+        thread_collector_list = []
+        trace_collector_ready = threading.Event()
+        main_thread_done = threading.Event()
+
+        def trace_in_other_thread():
+            with ConnectionTraceCollector() as thread_collector:
+                thread_collector_list.append(thread_collector)
+                trace_collector_ready.set()
+                main_thread_done.wait()
+                _open_traced_connection('other.thread')
+
+        other_thread = threading.Thread(target=trace_in_other_thread)
+        other_thread.start()
+        trace_collector_ready.wait()
+        try:
+            # Another thread's collector neither blocks this one nor receives its connections
+            with ConnectionTraceCollector() as trace_collector:
+                _open_traced_connection('main.thread')
+        finally:
+            main_thread_done.set()
+            other_thread.join()
+
+        self.assertEqual([trace.hostname for trace in trace_collector.connection_traces], ['main.thread'])
+        self.assertEqual([trace.hostname for trace in thread_collector_list[0].connection_traces], ['other.thread'])
+
+    def test_thread_pool_inherits_collector(self):
+        with ConnectionTraceCollector() as trace_collector:
+            thread_pool = ThreadPool()
+            for _ in range(5):
+                thread_pool.add_job((_open_traced_connection, ['www.google.com']))
+            thread_pool.start(3)
+            list(thread_pool.get_result())
+            list(thread_pool.get_error())
+            thread_pool.join()
+
+        self.assertEqual(len(trace_collector.connection_traces), 5)
+
+        # No collector is active in threads started without one
+        thread_pool = ThreadPool()
+        thread_pool.add_job((ConnectionTraceCollector.get_active_collector, []))
+        thread_pool.start(1)
+        self.assertEqual([result for _, result in thread_pool.get_result()], [None])
+        list(thread_pool.get_error())
+        thread_pool.join()
@@ -0,0 +1,96 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import pickle
+import unittest
+
+from nassl.ssl_client import OpenSslVersionEnum
+from sslyze.plugins.compression_plugin import CompressionScanCommand
+from sslyze.plugins.openssl_cipher_suites_plugin import Sslv30ScanCommand
+from sslyze.plugins.session_renegotiation_plugin import SessionRenegotiationScanCommand
+from sslyze.server_connectivity import ServerConnectivityInfo
+from sslyze.synchronous_scanner import SynchronousScanner
+from sslyze.utils.handshake_facts_cache import HandshakeFactsCache
+
+
+class HandshakeFactsCacheTestCase(unittest.TestCase):
+
+    def test_facts_recorded_and_reused(self):
+        server_info = ServerConnectivityInfo(hostname='www.google.com')
+        server_info.test_connectivity_to_server()
+
+        # Connecting with the server's default settings records what was negotiated
+        ssl_connection = server_info.get_preconfigured_ssl_connection()
+        try:
+            ssl_connection.connect()
+        finally:
+            ssl_connection.close()
+
+        handshake_facts = HandshakeFactsCache.get_facts_for_server(server_info)
+        self.assertTrue(handshake_facts)
+        self.assertTrue(handshake_facts.cipher_name)
+        self.assertTrue(handshake_facts.certificate_chain_as_pem)
+
+        # The renegotiation plugin's handshakes with the legacy client then answer the compression scan
+        sync_scanner = SynchronousScanner()
+        reneg_result = sync_scanner.run_scan_command(server_info, SessionRenegotiationScanCommand())
+        self.assertTrue(handshake_facts.are_legacy_client_facts_known)
+        self.assertEqual(reneg_result.supports_secure_renegotiation, handshake_facts.supports_secure_renegotiation)
+
+        compression_result = sync_scanner.run_scan_command(server_info, CompressionScanCommand())
+        self.assertEqual(compression_result.compression_name, handshake_facts.compression_name)
+
+    def test_facts_not_recorded_with_override_ssl_version(self):
+        server_info = ServerConnectivityInfo(hostname='www.google.com')
+        server_info.test_connectivity_to_server()
+
+        ssl_connection = server_info.get_preconfigured_ssl_connection(
+            override_ssl_version=server_info.highest_ssl_version_supported
+        )
+        self.assertIsNone(ssl_connection.handshake_facts_key)
+
+    def test_facts_seeded_from_connectivity_snapshot(self):
+        server_info = ServerConnectivityInfo(hostname='www.google.com')
+        server_info.test_connectivity_to_server()
+
+        snapshot = server_info.connectivity_snapshot
+        self.assertEqual(snapshot.ssl_version, server_info.highest_ssl_version_supported)
+        self.assertEqual(snapshot.cipher_name, server_info.ssl_cipher_supported)
+        self.assertTrue(snapshot.certificate_chain_as_pem)
+
+        # The snapshot must survive being sent to a worker process
+        unpickled_snapshot = pickle.loads(pickle.dumps(snapshot))
+        self.assertEqual(unpickled_snapshot.certificate_chain_as_pem, snapshot.certificate_chain_as_pem)
+
+        handshake_facts = HandshakeFactsCache.get_facts_for_server(server_info)
+        self.assertEqual(handshake_facts.certificate_chain_as_pem, snapshot.certificate_chain_as_pem)
+
+    def test_ssl_versions_support_recorded(self):
+        server_info = ServerConnectivityInfo(hostname='www.google.com')
+        server_info.test_connectivity_to_server()
+
+        # Only the version found by the connectivity test is known at first
+        ssl_versions_support = HandshakeFactsCache.get_ssl_versions_support(server_info)
+        self.assertEqual(ssl_versions_support, {server_info.highest_ssl_version_supported: True})
+
+        # Scanning the cipher suites of a version reveals whether it is supported
+        SynchronousScanner().run_scan_command(server_info, Sslv30ScanCommand())
+        ssl_versions_support = HandshakeFactsCache.get_ssl_versions_support(server_info)
+        self.assertFalse(ssl_versions_support[OpenSslVersionEnum.SSLV3])
+
+    def test_facts_forgotten_after_new_connectivity_test(self):
+        server_info = ServerConnectivityInfo(hostname='www.google.com')
+        server_info.test_connectivity_to_server()
+        SynchronousScanner().run_scan_command(server_info, Sslv30ScanCommand())
+        handshake_facts = HandshakeFactsCache.get_facts_for_server(server_info)
+        handshake_facts.compression_name = 'stale'
+
+        # Testing the connectivity again discards what was learnt about the server until then
+        server_info.test_connectivity_to_server()
+        ssl_versions_support = HandshakeFactsCache.get_ssl_versions_support(server_info)
+        self.assertEqual(ssl_versions_support, {server_info.highest_ssl_version_supported: True})
+
+        new_handshake_facts = HandshakeFactsCache.get_facts_for_server(server_info)
+        self.assertIsNot(new_handshake_facts, handshake_facts)
+        self.assertNotEqual(new_handshake_facts.compression_name, 'stale')
@@ -6,6 +6,8 @@
 from sslyze.plugins.certificate_info_plugin import CertificateInfoPlugin, CertificateInfoScanCommand
 from sslyze.server_connectivity import ServerConnectivityInfo, ServerConnectivityError
 from sslyze.ssl_settings import HttpConnectTunnelingSettings
+from sslyze.ssl_settings import HttpConnectProxyPoolSettings
+from sslyze.utils.http_connect_proxy_pool import HttpConnectProxyPool
 from tests.tiny_proxy import ProxyHandler
 from tests.tiny_proxy import ThreadingHTTPServer
 import multiprocessing
@@ -63,3 +65,61 @@ def test_https_tunneling(self):
         finally:
             # Kill the local proxy - unclean
             p.terminate()
+
+    def test_proxy_pool_load_balancing(self):
+        pool = HttpConnectProxyPool(HttpConnectProxyPoolSettings(
+            [HttpConnectTunnelingSettings('proxy1', 8080), HttpConnectTunnelingSettings('proxy2', 8080)],
+            max_connections_per_proxy=2
+        ))
+
+        # Connections get spread across both proxies
+        first_proxy = pool.acquire()
+        second_proxy = pool.acquire()
+        self.assertNotEqual(first_proxy.hostname, second_proxy.hostname)
+
+        # A proxy that could not be reached is not used anymore
+        pool.release(first_proxy, is_healthy=False)
+        self.assertEqual(pool.get_healthy_proxies_count(), 1)
+        self.assertEqual(pool.acquire(), second_proxy)
+
+        pool.release(second_proxy, is_healthy=False)
+        self.assertIsNone(pool.acquire())
+
+    def test_https_tunneling_proxy_pool(self):
+        # Start two local proxies; the third proxy of the pool is offline
+        proxy_ports = [8001, 8002]
+        processes = [multiprocessing.Process(target=proxy_worker, args=(proxy_port, )) for proxy_port in proxy_ports]
+        for p in processes:
+            p.start()
+
+        try:
+            # Do not put aside proxies which could not be reached, as the proxy subprocesses may not be ready yet
+            pool_settings = HttpConnectProxyPoolSettings(
+                [HttpConnectTunnelingSettings('localhost', port) for port in [8001, 8002, 8003]],
+                max_connections_per_proxy=2,
+                unhealthy_proxy_cooldown=0
+            )
+            server_info = ServerConnectivityInfo(hostname='www.google.com', http_tunneling_settings=pool_settings)
+
+            # Try to connect to the proxies - retry if the proxy subprocesses weren't ready
+            proxy_connection_attempts = 0
+            while True:
+                try:
+                    server_info.test_connectivity_to_server()
+                    break
+                except ServerConnectivityError:
+                    if proxy_connection_attempts > 3:
+                        raise
+                    proxy_connection_attempts += 1
+
+            plugin = CertificateInfoPlugin()
+            plugin_result = plugin.process_task(server_info, CertificateInfoScanCommand())
+
+            self.assertTrue(plugin_result.certificate_chain)
+
+            self.assertTrue(plugin_result.as_text())
+            self.assertTrue(plugin_result.as_xml())
+        finally:
+            # Kill the local proxies - unclean
+            for p in processes:
+                p.terminate()
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import socket
+import unittest
+
+from sslyze.utils.socket_line_reader import SocketLineReader
+
+
+class SocketLineReaderTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.server_sock, self.client_sock = socket.socketpair()
+        self.reader = SocketLineReader(self.client_sock)
+
+    def tearDown(self):
+        self.server_sock.close()
+        self.client_sock.close()
+
+    def test_pipelined_replies(self):
+        # Two SMTP replies received in the same segment
+        self.server_sock.sendall(b'250-smtp.example.com\r\n250-PIPELINING\r\n250 STARTTLS\r\n220 Ready to start TLS\r\n')
+
+        ehlo_reply = self.reader.read_multiline_reply()
+        self.assertEqual(ehlo_reply, [b'250-smtp.example.com', b'250-PIPELINING', b'250 STARTTLS'])
+
+        starttls_reply = self.reader.read_multiline_reply()
+        self.assertEqual(starttls_reply, [b'220 Ready to start TLS'])
+        self.assertEqual(self.reader.pending_bytes, b'')
+
+    def test_line_split_across_segments(self):
+        self.server_sock.sendall(b'* OK IMAP4rev1 ')
+        self.server_sock.sendall(b'ready\r\nsslyze1 OK Begin TLS\r\n')
+
+        self.assertEqual(self.reader.read_line(), b'* OK IMAP4rev1 ready')
+        self.assertEqual(self.reader.read_lines_until(lambda line: line.startswith(b'sslyze1 ')),
+                         [b'sslyze1 OK Begin TLS'])
+
+    def test_read_until(self):
+        self.server_sock.sendall(b"<stream:features><starttls/></stream:features><proceed xmlns='tls'/>")
+
+        features = self.reader.read_until((b'</stream:features>', b'</stream:error>'))
+        self.assertEqual(features, b'<stream:features><starttls/></stream:features>')
+        self.assertEqual(self.reader.read_until((b'proceed',)), b'<proceed')
+        self.assertEqual(self.reader.read_until((b'>',)), b" xmlns='tls'/>")
+
+    def test_read_bytes(self):
+        self.server_sock.sendall(b'S')
+        self.assertEqual(self.reader.read_bytes(1), b'S')
+
+    def test_connection_closed(self):
+        self.server_sock.sendall(b'421 Service not available')
+        self.server_sock.close()
+
+        self.assertEqual(self.reader.read_multiline_reply(), [b'421 Service not available'])
+        self.assertEqual(self.reader.read_line(), b'')
@@ -0,0 +1,87 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import unittest
+
+from sslyze.utils.ssl_session_info import SslSessionInfo
+
+
+class SslSessionInfoTestCase(unittest.TestCase):
+
+    SESSION_WITH_TICKET = '''SSL-Session:
+    Protocol  : TLSv1.2
+    Cipher    : ECDHE-RSA-AES128-GCM-SHA256
+    Session-ID: 
+    Session-ID-ctx: 
+    Master-Key: 5D4E1B3F0C9A8B7E6D5C4B3A29181706F5E4D3C2B1A09F8E7D6C5B4A39281706
+    Key-Arg   : None
+    PSK identity: None
+    PSK identity hint: None
+    SRP username: None
+    TLS session ticket lifetime hint: 100800 (seconds)
+    TLS session ticket:
+    0000 - 9c 2f 0d 3a 5b 71 84 03-8c 6e 2b ee 0e 8f 25 91   ./.:[q...n+...%.
+    0010 - 01 02 03 04 05 06 07 08-09 0a 0b 0c 0d 0e 0f 10   ................
+    0020 - ff ee                                             ..
+
+    Start Time: 1500000000
+    Timeout   : 300 (sec)
+    Verify return code: 0 (ok)
+'''
+
+    SESSION_WITH_TRUNCATED_TICKET = '''SSL-Session:
+    Protocol  : TLSv1.2
+    Cipher    : ECDHE-RSA-AES256-GCM-SHA384
+    Session-ID: 
+    Session-ID-ctx: 
+    Master-Key: 5D4E1B3F0C9A8B7E6D5C4B3A29181706F5E4D3C2B1A09F8E7D6C5B4A39281706
+    TLS session ticket lifetime hint: 300 (seconds)
+    TLS session ticket:
+    0000 - 9c 2f 0d 3a 5b 71 84 03-8c 6e 2b ee 0e 8f 25 91   ./.:[q...n+...%.
+    0010 - 01 02 03                                          ...
+    0020 - <SPACES/NULS>
+
+    Start Time: 1500000000
+    Timeout   : 300 (sec)
+    Verify return code: 0 (ok)
+'''
+
+    SESSION_WITH_SESSION_ID = '''SSL-Session:
+    Protocol  : TLSv1
+    Cipher    : AES256-SHA
+    Session-ID: 3C2B1A09F8E7D6C5B4A392817065D4E1B3F0C9A8B7E6D5C4B3A29181706F5E4D
+    Session-ID-ctx: 
+    Master-Key: 5D4E1B3F0C9A8B7E6D5C4B3A29181706F5E4D3C2B1A09F8E7D6C5B4A39281706
+    Key-Arg   : None
+    Start Time: 1500000000
+    Timeout   : 300 (sec)
+    Verify return code: 0 (ok)
+'''
+
+    def test_session_with_ticket(self):
+        session_info = SslSessionInfo.from_text(self.SESSION_WITH_TICKET)
+        self.assertEqual(session_info.protocol, 'TLSv1.2')
+        self.assertEqual(session_info.cipher, 'ECDHE-RSA-AES128-GCM-SHA256')
+        self.assertEqual(session_info.session_id, '')
+        self.assertEqual(session_info.tls_ticket_lifetime_hint, 100800)
+        self.assertEqual(len(session_info.tls_ticket), 34)
+        self.assertEqual(session_info.tls_ticket[-2:], b'\xff\xee')
+        self.assertEqual(session_info.tls_ticket_key_name, '9c2f0d3a5b7184038c6e2bee0e8f2591')
+
+    def test_session_with_truncated_ticket(self):
+        # OpenSSL 1.0.2 does not print the trailing NUL bytes of the ticket
+        session_info = SslSessionInfo.from_text(self.SESSION_WITH_TRUNCATED_TICKET)
+        self.assertEqual(session_info.tls_ticket_lifetime_hint, 300)
+        self.assertEqual(len(session_info.tls_ticket), 32)
+        self.assertEqual(session_info.tls_ticket[16:], b'\x01\x02\x03' + b'\x00' * 13)
+        self.assertEqual(session_info.tls_ticket_key_name, '9c2f0d3a5b7184038c6e2bee0e8f2591')
+
+    def test_session_with_session_id(self):
+        session_info = SslSessionInfo.from_text(self.SESSION_WITH_SESSION_ID)
+        self.assertEqual(session_info.protocol, 'TLSv1')
+        self.assertEqual(session_info.session_id,
+                         '3C2B1A09F8E7D6C5B4A392817065D4E1B3F0C9A8B7E6D5C4B3A29181706F5E4D')
+        self.assertIsNone(session_info.tls_ticket)
+        self.assertIsNone(session_info.tls_ticket_lifetime_hint)
+        self.assertIsNone(session_info.tls_ticket_key_name)
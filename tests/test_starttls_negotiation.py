@@ -0,0 +1,123 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import select
+import socket
+import threading
+import unittest
+
+from nassl.ssl_client import OpenSslVersionEnum
+from sslyze.utils.socket_line_reader import SocketLineReader
+from sslyze.utils.ssl_connection import IMAPConnection
+from sslyze.utils.ssl_connection import SMTPConnection
+
+
+class ScriptedServer(object):
+    """Local TCP server which runs one handler for each connection it receives, in order.
+    """
+
+    def __init__(self, connection_handlers):
+        self._connection_handlers = connection_handlers
+        self._server_sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self._server_sock.bind(('127.0.0.1', 0))
+        self._server_sock.listen(5)
+        self.port = self._server_sock.getsockname()[1]
+        self.errors = []
+        self._thread = threading.Thread(target=self._run)
+        self._thread.daemon = True
+
+    def _run(self):
+        for handler in self._connection_handlers:
+            client_sock, _ = self._server_sock.accept()
+            try:
+                handler(client_sock, SocketLineReader(client_sock))
+            except Exception as e:
+                self.errors.append(e)
+            finally:
+                client_sock.close()
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self._thread.join(5)
+        self._server_sock.close()
+
+
+def did_client_send_before_banner(client_sock):
+    # Wait a bit to see if the client sends its command without waiting for the banner
+    readable_socks, _, _ = select.select([client_sock], [], [], 0.5)
+    return bool(readable_socks)
+
+
+class SmtpStartTlsTestCase(unittest.TestCase):
+
+    def test_ehlo_and_starttls_sent_separately(self):
+        received_commands = []
+
+        def smtp_handler(client_sock, reader):
+            client_sock.sendall(b'220 smtp.example.com ESMTP\r\n')
+            received_commands.append(reader.read_line())
+            # Nothing else should have been sent with EHLO
+            received_commands.append(reader.pending_bytes)
+            client_sock.sendall(b'250-smtp.example.com\r\n250-PIPELINING\r\n250 STARTTLS\r\n')
+            received_commands.append(reader.read_line())
+            client_sock.sendall(b'220 Ready to start TLS\r\n')
+
+        # The second connection must not pipeline STARTTLS after EHLO either
+        with ScriptedServer([smtp_handler, smtp_handler]) as server:
+            for _ in range(2):
+                smtp_connection = SMTPConnection('localhost', '127.0.0.1', server.port, OpenSslVersionEnum.TLSV1_2)
+                sock = smtp_connection.do_pre_handshake(network_timeout=5)
+                sock.close()
+
+        self.assertFalse(server.errors)
+        self.assertEqual(received_commands, [b'EHLO sslyze.scan', b'', b'STARTTLS'] * 2)
+
+
+class ImapStartTlsTestCase(unittest.TestCase):
+
+    def test_starttls_pipelined_after_first_connection(self):
+        were_pipelined = []
+
+        def imap_handler(client_sock, reader):
+            were_pipelined.append(did_client_send_before_banner(client_sock))
+            client_sock.sendall(b'* OK IMAP4rev1 ready\r\n')
+            self.assertEqual(reader.read_line(), b'sslyze1 STARTTLS')
+            client_sock.sendall(b'sslyze1 OK Begin TLS negotiation now\r\n')
+
+        with ScriptedServer([imap_handler, imap_handler]) as server:
+            for _ in range(2):
+                imap_connection = IMAPConnection('localhost', '127.0.0.1', server.port, OpenSslVersionEnum.TLSV1_2)
+                sock = imap_connection.do_pre_handshake(network_timeout=5)
+                sock.close()
+
+        self.assertFalse(server.errors)
+        # The server accepted STARTTLS on the first connection so the second one did not wait for the banner
+        self.assertEqual(were_pipelined, [False, True])
+
+    def test_starttls_pipelining_rejected(self):
+        were_pipelined = []
+
+        def imap_handler(client_sock, reader):
+            is_pipelined = did_client_send_before_banner(client_sock)
+            were_pipelined.append(is_pipelined)
+            client_sock.sendall(b'* OK IMAP4rev1 ready\r\n')
+            self.assertEqual(reader.read_line(), b'sslyze1 STARTTLS')
+            if is_pipelined:
+                # Strict server which does not accept commands sent before its greeting
+                client_sock.sendall(b'sslyze1 BAD Command received before greeting\r\n')
+            else:
+                client_sock.sendall(b'sslyze1 OK Begin TLS negotiation now\r\n')
+
+        with ScriptedServer([imap_handler, imap_handler, imap_handler, imap_handler]) as server:
+            for _ in range(3):
+                imap_connection = IMAPConnection('localhost', '127.0.0.1', server.port, OpenSslVersionEnum.TLSV1_2)
+                sock = imap_connection.do_pre_handshake(network_timeout=5)
+                sock.close()
+
+        self.assertFalse(server.errors)
+        # The pipelined attempt was rejected, so the client retried step by step and then stopped pipelining
+        self.assertEqual(were_pipelined, [False, True, False, False])
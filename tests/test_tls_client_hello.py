@@ -0,0 +1,71 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import struct
+import unittest
+
+from sslyze.utils.tls_client_hello import ClientHelloCache, ClientHelloSpec
+from tls_parser.cipher_suites import CipherSuites
+from tls_parser.handshake_protocol import TlsHandshakeRecord, TlsHandshakeTypeByte
+from tls_parser.parser import TlsRecordParser
+from tls_parser.tls_version import TlsVersionEnum
+
+
+class ClientHelloSpecTestCase(unittest.TestCase):
+
+    @staticmethod
+    def _parse_client_hello(client_hello):
+        tls_record, len_consumed = TlsRecordParser.parse_bytes(client_hello)
+        return tls_record, len_consumed
+
+    def test_client_hello(self):
+        spec = ClientHelloSpec(TlsVersionEnum.TLSV1_2, server_name='www.google.com', should_include_heartbeat=True)
+        client_hello = spec.to_bytes()
+
+        tls_record, len_consumed = self._parse_client_hello(client_hello)
+        self.assertIsInstance(tls_record, TlsHandshakeRecord)
+        self.assertEqual(len_consumed, len(client_hello))
+        hello_message = tls_record.subprotocol_messages[0]
+        self.assertEqual(hello_message.handshake_type, TlsHandshakeTypeByte.CLIENT_HELLO)
+
+        hello_data = hello_message.handshake_data
+        self.assertEqual(hello_data[0:2], b'\x03\x03')
+        # The extensions are at the end of the message
+        cipher_suites_size = struct.unpack('!H', hello_data[35:37])[0]
+        self.assertEqual(cipher_suites_size, 2 * len(ClientHelloSpec.DEFAULT_CIPHER_SUITES))
+        extensions_start = 37 + cipher_suites_size + 2
+        extensions_size = struct.unpack('!H', hello_data[extensions_start:extensions_start + 2])[0]
+        self.assertEqual(extensions_start + 2 + extensions_size, len(hello_data))
+
+        self.assertIn(b'www.google.com', hello_data)
+        # Heartbeat extension
+        self.assertIn(b'\x00\x0f\x00\x01\x01', hello_data)
+
+    def test_default_cipher_suites(self):
+        # Legacy cipher suites are offered too
+        self.assertIn(CipherSuites.TLS_RSA_EXPORT_WITH_DES40_CBC_SHA.value, ClientHelloSpec.DEFAULT_CIPHER_SUITES)
+        self.assertIn(CipherSuites.TLS_DHE_DSS_WITH_CAMELLIA_128_CBC_SHA.value, ClientHelloSpec.DEFAULT_CIPHER_SUITES)
+        self.assertNotIn(CipherSuites.TLS_EMPTY_RENEGOTIATION_INFO_SCSV.value, ClientHelloSpec.DEFAULT_CIPHER_SUITES)
+
+        # The cipher suite the server is known to accept is offered first
+        cipher_suites = ClientHelloSpec.get_default_cipher_suites('TLS_RSA_WITH_IDEA_CBC_SHA')
+        self.assertEqual(cipher_suites[0], CipherSuites.TLS_RSA_WITH_IDEA_CBC_SHA.value)
+        self.assertEqual(sorted(cipher_suites), sorted(ClientHelloSpec.DEFAULT_CIPHER_SUITES))
+        self.assertEqual(ClientHelloSpec.get_default_cipher_suites('ALL:COMPLEMENTOFALL'),
+                         ClientHelloSpec.DEFAULT_CIPHER_SUITES)
+
+    def test_fallback_scsv(self):
+        spec = ClientHelloSpec(TlsVersionEnum.TLSV1_1, cipher_suites=[0x002f], should_include_fallback_scsv=True)
+        hello_data = self._parse_client_hello(spec.to_bytes())[0].subprotocol_messages[0].handshake_data
+        self.assertEqual(hello_data[0:2], b'\x03\x02')
+        self.assertEqual(hello_data[35:41], b'\x00\x04\x00\x2f\x56\x00')
+
+    def test_client_hello_cache(self):
+        client_hello = ClientHelloCache.get_client_hello(ClientHelloSpec(TlsVersionEnum.TLSV1, server_name='a.com'))
+        self.assertEqual(ClientHelloCache.get_client_hello(ClientHelloSpec(TlsVersionEnum.TLSV1, server_name='a.com')),
+                         client_hello)
+        other_client_hello = ClientHelloCache.get_client_hello(
+            ClientHelloSpec(TlsVersionEnum.TLSV1, server_name='b.com')
+        )
+        self.assertNotEqual(other_client_hello, client_hello)
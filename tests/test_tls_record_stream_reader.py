@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+from __future__ import absolute_import
+from __future__ import unicode_literals
+
+import socket
+import threading
+import unittest
+
+from sslyze.utils.tls_record_stream_reader import TlsRecordStreamReader
+from tls_parser.alert_protocol import TlsAlertRecord
+from tls_parser.application_data_protocol import TlsApplicationDataRecord
+from tls_parser.tls_version import TlsVersionEnum
+
+
+class TlsRecordStreamReaderTestCase(unittest.TestCase):
+
+    def setUp(self):
+        self.server_sock, self.client_sock = socket.socketpair()
+        self.reader = TlsRecordStreamReader(self.client_sock)
+
+    def tearDown(self):
+        self.server_sock.close()
+        self.client_sock.close()
+
+    @staticmethod
+    def _get_record_bytes(data_size):
+        return TlsApplicationDataRecord.from_parameters(tls_version=TlsVersionEnum.TLSV1_2,
+                                                        application_data=b'\x01' * data_size).to_bytes()
+
+    def test_records_received_at_once(self):
+        alert_bytes = b'\x15\x03\x03\x00\x02\x02\x28'
+        self.server_sock.sendall(self._get_record_bytes(10) + alert_bytes)
+
+        tls_record = self.reader.read_record()
+        self.assertEqual(tls_record.header.length, 10)
+        tls_record = self.reader.read_record()
+        self.assertIsInstance(tls_record, TlsAlertRecord)
+        self.assertEqual(self.reader.pending_bytes, b'')
+
+    def test_record_split_across_segments(self):
+        record_bytes = self._get_record_bytes(100)
+        self.server_sock.sendall(record_bytes[:3])
+        self.server_sock.sendall(record_bytes[3:50])
+        self.server_sock.sendall(record_bytes[50:] + b'\x17\x03')
+
+        tls_record = self.reader.read_record()
+        self.assertEqual(tls_record.header.length, 100)
+        self.assertEqual(self.reader.pending_bytes, b'\x17\x03')
+
+    def test_records_larger_than_buffer(self):
+        # Enough data for the buffer to be compacted and then to grow
+        records_bytes = self._get_record_bytes(16000) * 3 + self._get_record_bytes(60000)
+
+        def send_records():
+            self.server_sock.sendall(records_bytes)
+            self.server_sock.close()
+
+        # Send from another thread as the data may not fit in the socket's buffer
+        sender_thread = threading.Thread(target=send_records)
+        sender_thread.start()
+        records = list(self.reader.iter_records())
+        sender_thread.join()
+        self.assertEqual([tls_record.header.length for tls_record in records], [16000, 16000, 16000, 60000])
+
+    def test_connection_closed(self):
+        self.server_sock.sendall(self._get_record_bytes(10)[:8])
+        self.server_sock.close()
+
+        self.assertIsNone(self.reader.read_record())
+        self.assertEqual(len(self.reader.pending_bytes), 8)